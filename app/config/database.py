@@ -0,0 +1,51 @@
+import os
+
+def _env_bool(nome, padrao):
+    valor = os.getenv(nome)
+    if valor is None:
+        return padrao
+    return valor.strip().lower() in ('1', 'true', 'yes', 'sim')
+
+def get_engine_options(database_uri):
+    """
+    Monta o SQLALCHEMY_ENGINE_OPTIONS a partir das variáveis de ambiente
+    :param database_uri: URI do banco, usada para aplicar só as opções suportadas pelo driver
+    :return: Dicionário de opções do engine
+    """
+    opcoes = {'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True)}
+
+    # O SQLite usa pools próprios (sem fila de conexões), então só o pre-ping se aplica
+    if database_uri.startswith('sqlite'):
+        return opcoes
+
+    opcoes.update({
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800))
+    })
+
+    if database_uri.startswith('postgresql'):
+        connect_args = {'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 10))}
+        statement_timeout = os.getenv('DB_STATEMENT_TIMEOUT_MS')
+        if statement_timeout:
+            connect_args['options'] = f"-c statement_timeout={int(statement_timeout)}"
+        opcoes['connect_args'] = connect_args
+
+    return opcoes
+
+def get_pool_status(engine):
+    """Retorna as estatísticas atuais do pool de conexões do engine"""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+
+    for metrica in ('size', 'checkedin', 'checkedout', 'overflow'):
+        metodo = getattr(pool, metrica, None)
+        if callable(metodo):
+            status[metrica] = metodo()
+
+    if 'size' in status and hasattr(pool, '_max_overflow'):
+        status['max_overflow'] = pool._max_overflow
+        status['timeout'] = pool.timeout()
+
+    return status
@@ -0,0 +1,59 @@
+import os
+import threading
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+MB = 1024 * 1024
+
+_clientes = {}
+_lock = threading.Lock()
+
+def get_client_config():
+    """
+    Monta o botocore Config a partir das variáveis de ambiente
+    :return: Config com pool de conexões, timeouts e política de retentativas
+    """
+    return Config(
+        max_pool_connections=int(os.getenv('S3_MAX_POOL_CONNECTIONS', 50)),
+        connect_timeout=float(os.getenv('S3_CONNECT_TIMEOUT', 5)),
+        read_timeout=float(os.getenv('S3_READ_TIMEOUT', 30)),
+        retries={
+            'max_attempts': int(os.getenv('S3_MAX_ATTEMPTS', 5)),
+            'mode': os.getenv('S3_RETRY_MODE', 'standard')
+        }
+    )
+
+def get_transfer_config():
+    """Configuração de multipart usada por upload_fileobj"""
+    return TransferConfig(
+        multipart_threshold=int(os.getenv('S3_MULTIPART_THRESHOLD_MB', 8)) * MB,
+        multipart_chunksize=int(os.getenv('S3_MULTIPART_CHUNKSIZE_MB', 8)) * MB,
+        max_concurrency=int(os.getenv('S3_MAX_CONCURRENCY', 4)),
+        use_threads=True
+    )
+
+def get_s3_client(endpoint_url=None):
+    """
+    Retorna o cliente S3 compartilhado pelo processo para o endpoint informado.
+    Clientes do boto3 são thread-safe, então todas as threads (requisições, pools de
+    variantes e fila de exclusão) reutilizam o mesmo pool de conexões HTTP.
+    :param endpoint_url: Endpoint do S3 (None usa o endpoint padrão da AWS)
+    :return: boto3 S3 client
+    """
+    cliente = _clientes.get(endpoint_url)
+    if cliente is not None:
+        return cliente
+    
+    with _lock:
+        if endpoint_url not in _clientes:
+            # A criação de clientes no boto3 não é thread-safe: usa uma sessão própria sob o lock
+            _clientes[endpoint_url] = boto3.session.Session().client(
+                's3',
+                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+                region_name=os.getenv('AWS_DEFAULT_REGION'),
+                endpoint_url=endpoint_url,
+                config=get_client_config()
+            )
+        return _clientes[endpoint_url]
\ No newline at end of file
@@ -0,0 +1,28 @@
+import os
+from passlib.context import CryptContext
+
+ESQUEMAS_SENHA = ('argon2', 'bcrypt', 'pbkdf2_sha256')
+
+def get_contexto_senha():
+    """
+    Monta o CryptContext a partir das variáveis de ambiente. O esquema configurado em
+    SENHA_ESQUEMA é usado para novos hashes; os demais continuam aceitos no login,
+    mas ficam marcados como obsoletos (needs_update) para serem refeitos.
+    :return: CryptContext do passlib
+    """
+    esquema = os.getenv('SENHA_ESQUEMA', 'pbkdf2_sha256')
+    if esquema not in ESQUEMAS_SENHA:
+        raise ValueError(f"Esquema de senha não suportado: {esquema}. Use: {', '.join(ESQUEMAS_SENHA)}")
+    
+    return CryptContext(
+        schemes=[esquema] + [outro for outro in ESQUEMAS_SENHA if outro != esquema],
+        default=esquema,
+        deprecated='auto',
+        pbkdf2_sha256__rounds=int(os.getenv('SENHA_PBKDF2_ROUNDS', 29000)),
+        bcrypt__rounds=int(os.getenv('SENHA_BCRYPT_ROUNDS', 12)),
+        argon2__time_cost=int(os.getenv('SENHA_ARGON2_TIME_COST', 2)),
+        argon2__memory_cost=int(os.getenv('SENHA_ARGON2_MEMORY_KB', 65536)),
+        argon2__parallelism=int(os.getenv('SENHA_ARGON2_PARALLELISM', 1))
+    )
+
+contexto_senha = get_contexto_senha()
\ No newline at end of file
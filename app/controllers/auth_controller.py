@@ -1,10 +1,16 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app import jwt
 from app.services.auth_service import AuthService
+from app.controllers.contexto_auth import usuario_atual
 
 bp = Blueprint('auth', __name__, url_prefix='/auth')
 auth_service = AuthService()
 
+@jwt.token_in_blocklist_loader
+def verificar_token_revogado(jwt_header, jwt_payload):
+    return auth_service.token_revogado(jwt_payload)
+
 @bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -37,14 +43,29 @@ def login():
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 401
+    except TimeoutError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+
+@bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    try:
+        result = auth_service.renovar_tokens(get_jwt_identity(), get_jwt())
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 401
+
+@bp.route('/logout', methods=['POST'])
+@jwt_required(refresh=True)
+def logout():
+    result = auth_service.encerrar_sessao(get_jwt_identity(), get_jwt())
+    return jsonify(result), 200
 
 @bp.route('/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
-    current_user = get_jwt_identity()
-    
     try:
-        result = auth_service.get_usuario_atual(current_user['id'])
+        result = auth_service.get_usuario_atual(usuario_atual().id)
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 404 
\ No newline at end of file
@@ -1,19 +1,12 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app.services.cliente_service import ClienteService
-from app.models.usuario import PerfilUsuario
+from app.controllers.contexto_auth import usuario_atual, verificar_perfil_admin
+from app.controllers.resposta_condicional import resposta_condicional, etag_versao
 
 bp = Blueprint('clientes', __name__, url_prefix='/clientes')
 cliente_service = ClienteService()
 
-def verificar_perfil_admin():
-    current_user = get_jwt_identity()
-    return current_user['perfil'] == PerfilUsuario.ADMIN.value
-
-def recuperar_usuario():
-    current_user = get_jwt_identity()
-    return current_user  
-
 @bp.route('', methods=['POST'])
 @jwt_required()
 def criar_cliente():
@@ -22,12 +15,12 @@ def criar_cliente():
     if not data or not data.get('nome') or not data.get('email'):
         return jsonify({'error': 'Nome e email são obrigatórios'}), 400
 
-    usuario_logado = recuperar_usuario()
+    usuario_logado = usuario_atual()
     
-    if not usuario_logado or not usuario_logado.get('id'):
+    if not usuario_logado:
         return jsonify({'error': 'Usuário não identificado'}), 401
 
-    if not usuario_logado.get('perfil') == PerfilUsuario.CLIENTE.value:
+    if not usuario_logado.cliente:
         return jsonify({'error': 'Apenas clientes podem se cadastrar como cliente'}), 403
 
     try:
@@ -36,7 +29,7 @@ def criar_cliente():
             email=data['email'],
             telefone=data.get('telefone'),
             endereco=data.get('endereco'),
-            usuario_id=usuario_logado.get('id')
+            usuario_id=usuario_logado.id
         )
         return jsonify(result), 201
     except ValueError as e:
@@ -46,7 +39,10 @@ def criar_cliente():
 @jwt_required()
 def listar_clientes():
     try:
-        result = cliente_service.listar_clientes()
+        result = cliente_service.listar_clientes(
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int)
+        )
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -55,8 +51,11 @@ def listar_clientes():
 @jwt_required()
 def obter_cliente(id):
     try:
-        result = cliente_service.obter_cliente(id)
-        return jsonify(result), 200
+        versao = cliente_service.obter_versao_cliente(id)
+        return resposta_condicional(
+            lambda: cliente_service.obter_cliente(id),
+            etag=etag_versao('cliente', id, versao)
+        )
     except ValueError as e:
         return jsonify({'error': str(e)}), 404
 
@@ -64,7 +63,11 @@ def obter_cliente(id):
 @jwt_required()
 def buscar_por_nome(nome):
     try:
-        result = cliente_service.buscar_por_nome(nome)
+        result = cliente_service.buscar_por_nome(
+            nome,
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int)
+        )
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -73,7 +76,7 @@ def buscar_por_nome(nome):
 @jwt_required()
 def contar_clientes():
     try:
-        result = cliente_service.contar_clientes()
+        result = cliente_service.contar_clientes(modo=request.args.get('modo'))
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
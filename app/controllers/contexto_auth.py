@@ -0,0 +1,37 @@
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from app.models.usuario import PerfilUsuario
+from typing import Optional
+
+class UsuarioAutenticado:
+    """Identidade do usuário extraída do JWT da requisição atual"""
+    def __init__(self, id: int, email: str, perfil: PerfilUsuario):
+        self.id = id
+        self.email = email
+        self.perfil = perfil
+    
+    @property
+    def admin(self) -> bool:
+        return self.perfil == PerfilUsuario.ADMIN
+    
+    @property
+    def cliente(self) -> bool:
+        return self.perfil == PerfilUsuario.CLIENTE
+
+def usuario_atual() -> Optional[UsuarioAutenticado]:
+    """
+    Retorna o usuário autenticado, lendo a identidade do JWT só uma vez por requisição (guardada em flask.g).
+    Deve ser chamada dentro de uma rota protegida por jwt_required.
+    """
+    if 'usuario_autenticado' not in g:
+        identidade = get_jwt_identity()
+        g.usuario_autenticado = UsuarioAutenticado(
+            id=identidade['id'],
+            email=identidade['email'],
+            perfil=PerfilUsuario(identidade['perfil'])
+        ) if identidade and identidade.get('id') else None
+    return g.usuario_autenticado
+
+def verificar_perfil_admin() -> bool:
+    usuario = usuario_atual()
+    return usuario is not None and usuario.admin
\ No newline at end of file
@@ -0,0 +1,11 @@
+from flask import Blueprint, jsonify
+from app.services.health_service import HealthService
+
+bp = Blueprint('health', __name__, url_prefix='/health')
+health_service = HealthService()
+
+@bp.route('/db', methods=['GET'])
+def verificar_banco():
+    result = health_service.verificar_banco()
+    status_code = 200 if result['status'] == 'ok' else 503
+    return jsonify(result), status_code
\ No newline at end of file
@@ -1,14 +1,23 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app.services.pedido_service import PedidoService
-from app.models.usuario import PerfilUsuario
+from app.controllers.contexto_auth import verificar_perfil_admin
+from app.controllers.resposta_condicional import resposta_condicional
+from app.repositories.pedido_repository import RELACOES, INCLUDE_PADRAO
 
 bp = Blueprint('pedidos', __name__, url_prefix='/pedidos')
 pedido_service = PedidoService()
 
-def verificar_perfil_admin():
-    current_user = get_jwt_identity()
-    return current_user['perfil'] == PerfilUsuario.ADMIN.value
+def recuperar_include():
+    valor = request.args.get('include')
+    if valor is None:
+        return INCLUDE_PADRAO
+    
+    include = tuple(relacao.strip() for relacao in valor.split(',') if relacao.strip())
+    invalidas = [relacao for relacao in include if relacao not in RELACOES]
+    if invalidas:
+        raise ValueError(f"Relações inválidas em include: {', '.join(invalidas)}")
+    return include
 
 @bp.route('', methods=['POST'])
 @jwt_required()
@@ -31,7 +40,11 @@ def criar_pedido():
 @jwt_required()
 def listar_pedidos():
     try:
-        result = pedido_service.listar_pedidos()
+        result = pedido_service.listar_pedidos(
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int),
+            include=recuperar_include()
+        )
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -40,8 +53,13 @@ def listar_pedidos():
 @jwt_required()
 def obter_pedido(id):
     try:
-        result = pedido_service.obter_pedido(id)
-        return jsonify(result), 200
+        include = recuperar_include()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        # Pedido não tem coluna de versão (e pode incluir cliente e produtos): a ETag é o hash do corpo
+        return resposta_condicional(lambda: pedido_service.obter_pedido(id, include=include))
     except ValueError as e:
         return jsonify({'error': str(e)}), 404
 
@@ -49,7 +67,7 @@ def obter_pedido(id):
 @jwt_required()
 def buscar_por_cliente(cliente_id):
     try:
-        result = pedido_service.buscar_por_cliente(cliente_id)
+        result = pedido_service.buscar_por_cliente(cliente_id, include=recuperar_include())
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -58,7 +76,7 @@ def buscar_por_cliente(cliente_id):
 @jwt_required()
 def contar_pedidos():
     try:
-        result = pedido_service.contar_pedidos()
+        result = pedido_service.contar_pedidos(modo=request.args.get('modo'))
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -1,18 +1,34 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, Response, redirect, current_app
+from flask_jwt_extended import jwt_required
 from app.services.produto_service import ProdutoService
-from app.services.s3_service import S3Service
-from app.models.usuario import PerfilUsuario
+from app.services.importacao_produtos_service import ImportacaoProdutosService, detectar_formato
+from app.services.imagem_variantes_service import TAMANHOS_IMAGEM, chave_variante
+from app.controllers.contexto_auth import verificar_perfil_admin
+from app.controllers.resposta_condicional import resposta_condicional, etag_versao
+from botocore.exceptions import BotoCoreError, ClientError
+from werkzeug.http import http_date, unquote_etag
 import os
-from botocore.exceptions import ClientError
 
 bp = Blueprint('produtos', __name__, url_prefix='/produtos')
 produto_service = ProdutoService()
-s3_service = S3Service()
+s3_service = produto_service.s3_service
+imagem_cache_service = produto_service.imagem_cache_service
+importacao_service = ImportacaoProdutosService(produto_service.autocomplete_service)
 
-def verificar_perfil_admin():
-    current_user = get_jwt_identity()
-    return current_user['perfil'] == PerfilUsuario.ADMIN.value
+IMAGEM_CHUNK_SIZE = 64 * 1024
+IMAGEM_CACHE_CONTROL = f"private, max-age={int(os.getenv('IMAGEM_CACHE_MAX_AGE', 86400))}"
+IMAGEM_ENTREGA = os.getenv('IMAGEM_ENTREGA', 'proxy')
+MODOS_ENTREGA = ('proxy', 'redirect')
+
+@bp.before_app_first_request
+def iniciar_exclusoes_s3():
+    # Processa as exclusões que ficaram pendentes de execuções anteriores
+    produto_service.exclusao_s3_service.iniciar(current_app._get_current_object())
+
+@bp.before_app_first_request
+def iniciar_autocomplete():
+    # No gunicorn o índice já foi montado em post_worker_init; aqui só cobre o flask run
+    produto_service.autocomplete_service.iniciar(current_app._get_current_object())
 
 @bp.route('', methods=['POST'])
 @jwt_required()
@@ -44,11 +60,39 @@ def criar_produto():
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
 
+@bp.route('/importar', methods=['POST'])
+@jwt_required()
+def importar_produtos():
+    if not verificar_perfil_admin():
+        return jsonify({'error': 'Acesso negado'}), 403
+    
+    # Upload multipart (campo 'arquivo') ou o arquivo como corpo da requisição, lido em streaming
+    if request.mimetype == 'multipart/form-data':
+        if 'arquivo' not in request.files:
+            return jsonify({'error': 'Envie o arquivo no campo arquivo'}), 400
+        arquivo = request.files['arquivo']
+        stream, formato = arquivo.stream, detectar_formato(arquivo.filename, arquivo.mimetype)
+    else:
+        stream, formato = request.stream, detectar_formato(content_type=request.mimetype)
+    
+    try:
+        result = importacao_service.importar(
+            stream,
+            request.args.get('formato') or formato,
+            tamanho_lote=request.args.get('lote', type=int)
+        )
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
 @bp.route('', methods=['GET'])
 @jwt_required()
 def listar_produtos():
     try:
-        result = produto_service.listar_produtos()
+        result = produto_service.listar_produtos(
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int)
+        )
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -57,8 +101,12 @@ def listar_produtos():
 @jwt_required()
 def obter_produto(id):
     try:
-        result = produto_service.obter_produto(id)
-        return jsonify(result), 200
+        # A versão vem do banco: o cache de outro worker pode ainda ter a anterior
+        versao = produto_service.obter_versao_produto(id)
+        return resposta_condicional(
+            lambda: produto_service.obter_produto(id, versao=versao),
+            etag=etag_versao('produto', id, versao)
+        )
     except ValueError as e:
         return jsonify({'error': str(e)}), 404
 
@@ -66,16 +114,40 @@ def obter_produto(id):
 @jwt_required()
 def buscar_por_nome(nome):
     try:
-        result = produto_service.buscar_por_nome(nome)
+        result = produto_service.buscar_por_nome(
+            nome,
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int)
+        )
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/autocomplete', methods=['GET'])
+@jwt_required()
+def autocomplete():
+    try:
+        result = produto_service.autocomplete(
+            request.args.get('q', ''),
+            limit=request.args.get('limit', type=int)
+        )
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
 
+@bp.route('/cache', methods=['GET'])
+@jwt_required()
+def estatisticas_cache_catalogo():
+    if not verificar_perfil_admin():
+        return jsonify({'error': 'Acesso negado'}), 403
+    
+    return jsonify(produto_service.estatisticas_cache()), 200
+
 @bp.route('/contar', methods=['GET'])
 @jwt_required()
 def contar_produtos():
     try:
-        result = produto_service.contar_produtos()
+        result = produto_service.contar_produtos(modo=request.args.get('modo'))
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -125,38 +197,145 @@ def deletar_produto(id):
     except ValueError as e:
         return jsonify({'error': str(e)}), 404
     
+@bp.route('/imagem/upload-url', methods=['POST'])
+@jwt_required()
+def gerar_upload_imagem():
+    if not verificar_perfil_admin():
+        return jsonify({'error': 'Acesso negado'}), 403
+    
+    data = request.get_json()
+    
+    if not data or not data.get('filename'):
+        return jsonify({'error': 'Nome do arquivo é obrigatório'}), 400
+    
+    try:
+        result = s3_service.gerar_upload_imagem(data['filename'])
+        return jsonify(result), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/<int:id>/imagem', methods=['PUT'])
+@jwt_required()
+def confirmar_upload_imagem(id):
+    if not verificar_perfil_admin():
+        return jsonify({'error': 'Acesso negado'}), 403
+    
+    data = request.get_json()
+    
+    if not data or not data.get('key'):
+        return jsonify({'error': 'Chave da imagem é obrigatória'}), 400
+    
+    try:
+        produto_service.obter_produto(id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    try:
+        s3_service.confirmar_upload_imagem(data['key'])
+        result = produto_service.atualizar_produto(id, imagem_url=data['key'])
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+def _resposta_imagem_em_memoria(imagem, filename):
+    ext = filename.split('.')[-1].lower()
+    response = Response(imagem.conteudo, content_type=imagem.content_type or f'image/{ext}')
+    response.set_etag(unquote_etag(imagem.etag)[0])
+    response.last_modified = imagem.last_modified
+    response.headers['Cache-Control'] = IMAGEM_CACHE_CONTROL
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(imagem.conteudo))
+
 @bp.route('/imagem/<string:filename>', methods=['GET'])
 @jwt_required()
 def buscar_imagem(filename):
-    try:
-        print(f"Tentando buscar imagem: {filename}")  # Log para debug
+    entrega = request.args.get('entrega', IMAGEM_ENTREGA)
+    if entrega not in MODOS_ENTREGA:
+        return jsonify({'error': f"Modo de entrega inválido. Use: {', '.join(MODOS_ENTREGA)}"}), 400
+    
+    size = request.args.get('size', 'original')
+    if size not in TAMANHOS_IMAGEM:
+        return jsonify({'error': f"Tamanho de imagem inválido. Use: {', '.join(TAMANHOS_IMAGEM)}"}), 400
+    chave = chave_variante(filename, size) if size != 'original' and '.' in filename else filename
+    
+    if entrega == 'redirect':
+        try:
+            url, validade = s3_service.get_url_imagem(chave)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 500
         
-        if not filename:
-            return jsonify({'error': 'Nome do arquivo não fornecido'}), 400
-            
+        # O navegador pode reaproveitar o redirect enquanto a URL assinada ainda for válida
+        response = redirect(url, 302)
+        response.headers['Cache-Control'] = f'private, max-age={max(validade - s3_service.presigned_url_margem, 0)}'
+        return response
+    
+    range_bytes = request.headers.get('Range')
+    if range_bytes and not range_bytes.startswith('bytes='):
+        range_bytes = None
+    
+    # Enquanto a variante não foi gerada pelo pipeline em segundo plano, serve a original
+    for chave in dict.fromkeys([chave, filename]):
         try:
-            s3_service.s3_client.head_object(
-                Bucket=s3_service.bucket_name,
-                Key=filename
+            imagem = imagem_cache_service.get(chave)
+            if imagem:
+                return _resposta_imagem_em_memoria(imagem, chave)
+            
+            objeto = s3_service.abrir_imagem(
+                chave,
+                range_bytes,
+                if_none_match=request.headers.get('If-None-Match'),
+                if_modified_since=request.if_modified_since
             )
+            break
         except ClientError as e:
-            print(f"Erro ao verificar arquivo no S3: {str(e)}")  # Log para debug
-            return jsonify({'error': f'Arquivo não encontrado: {filename}'}), 404
-            
-        temp_path = s3_service.download_imagem(filename)
-        
-        ext = filename.split('.')[-1].lower()
-        mime_type = f'image/{ext}'
-        
-        with open(temp_path, 'rb') as f:
-            content = f.read()
-        
-        os.remove(temp_path)
-        
-        return content, 200, {'Content-Type': mime_type}
-    except ValueError as e:
-        print(f"Erro ao processar imagem: {str(e)}")  # Log para debug
-        return jsonify({'error': str(e)}), 404
-    except Exception as e:
-        print(f"Erro inesperado: {str(e)}")  # Log para debug
-        return jsonify({'error': f'Erro ao processar imagem: {str(e)}'}), 500
+            codigo = e.response.get('Error', {}).get('Code')
+            if codigo == '304':
+                return '', 304, {'Cache-Control': IMAGEM_CACHE_CONTROL}
+            if codigo in ('NoSuchKey', 'NotFound', '404'):
+                if chave != filename:
+                    continue
+                return jsonify({'error': f'Arquivo não encontrado: {filename}'}), 404
+            if codigo == 'InvalidRange':
+                return jsonify({'error': 'Intervalo solicitado inválido'}), 416
+            return jsonify({'error': f'Erro ao processar imagem: {str(e)}'}), 500
+        except BotoCoreError as e:
+            # Falhas de conexão/timeout com o S3 não trazem resposta HTTP, mas seguem o mesmo formato de erro
+            return jsonify({'error': f'Erro ao processar imagem: {str(e)}'}), 500
+    
+    if not objeto.get('ContentRange') and imagem_cache_service.cabe(objeto['ContentLength']):
+        imagem = imagem_cache_service.put(chave, objeto)
+        return _resposta_imagem_em_memoria(imagem, chave)
+    
+    corpo = objeto['Body']
+    
+    def gerar_chunks():
+        try:
+            for chunk in corpo.iter_chunks(IMAGEM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            corpo.close()
+    
+    headers = {
+        'Content-Length': str(objeto['ContentLength']),
+        'Accept-Ranges': 'bytes',
+        'ETag': objeto['ETag'],
+        'Last-Modified': http_date(objeto['LastModified']),
+        'Cache-Control': IMAGEM_CACHE_CONTROL
+    }
+    if objeto.get('ContentRange'):
+        headers['Content-Range'] = objeto['ContentRange']
+    
+    ext = chave.split('.')[-1].lower()
+    return Response(
+        gerar_chunks(),
+        status=206 if objeto.get('ContentRange') else 200,
+        headers=headers,
+        content_type=objeto.get('ContentType') or f'image/{ext}'
+    )
+
+@bp.route('/imagem/cache', methods=['GET'])
+@jwt_required()
+def estatisticas_cache_imagens():
+    if not verificar_perfil_admin():
+        return jsonify({'error': 'Acesso negado'}), 403
+    
+    return jsonify(imagem_cache_service.estatisticas()), 200
\ No newline at end of file
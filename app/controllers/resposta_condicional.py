@@ -0,0 +1,35 @@
+import hashlib
+from flask import request, jsonify, make_response
+
+# Respostas autenticadas: só o cliente guarda, e sempre revalida com If-None-Match
+CACHE_CONTROL_RECURSO = 'private, no-cache'
+
+def etag_versao(*partes) -> str:
+    """ETag forte derivada da coluna de versão do recurso (ex: 'produto', id, updated_at)"""
+    return hashlib.sha1('|'.join(str(parte) for parte in partes).encode()).hexdigest()
+
+def nao_modificado(etag: str):
+    response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL_RECURSO
+    return response
+
+def resposta_condicional(gerar, etag=None):
+    """
+    Responde 304 Not Modified quando o If-None-Match da requisição já tem a versão atual do recurso.
+    Com a ETag da coluna de versão, o recurso nem chega a ser serializado; sem ela, a ETag é o hash do corpo.
+    :param gerar: Função que retorna os dados do recurso (só é chamada se a ETag informada não bater)
+    :param etag: ETag (sem aspas) calculada com etag_versao, ou None para usar o hash do JSON gerado
+    :return: Resposta 200 com ETag e Cache-Control, ou 304
+    """
+    if etag is not None and request.if_none_match.contains(etag):
+        return nao_modificado(etag)
+    
+    response = jsonify(gerar())
+    if etag is None:
+        etag = hashlib.sha1(response.get_data()).hexdigest()
+        if request.if_none_match.contains(etag):
+            return nao_modificado(etag)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL_RECURSO
+    return response
\ No newline at end of file
@@ -0,0 +1,13 @@
+from app import db
+
+class Contador(db.Model):
+    """
+    Total de linhas de uma tabela, mantido por triggers (migration 0006) em vez de COUNT(*).
+    No PostgreSQL o total é dividido em fatias, somadas na leitura, para que inserções
+    concorrentes não fiquem todas esperando o lock da mesma linha.
+    """
+    __tablename__ = 'contadores'
+    
+    tabela = db.Column(db.String(50), primary_key=True)
+    fatia = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    total = db.Column(db.BigInteger, nullable=False, default=0)
\ No newline at end of file
@@ -0,0 +1,26 @@
+from app import db
+from datetime import datetime
+
+class ExclusaoS3(db.Model):
+    """Chave do S3 aguardando exclusão pelo worker em segundo plano"""
+    __tablename__ = 'exclusoes_s3'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    chave = db.Column(db.String(255), nullable=False)
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    proxima_tentativa = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    ultimo_erro = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __init__(self, chave):
+        self.chave = chave
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'chave': self.chave,
+            'tentativas': self.tentativas,
+            'proxima_tentativa': self.proxima_tentativa.isoformat() if self.proxima_tentativa else None,
+            'ultimo_erro': self.ultimo_erro,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
\ No newline at end of file
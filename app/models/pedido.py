@@ -12,14 +12,17 @@ class ItemPedido(db.Model):
     
     produto = db.relationship('Produto')
     
-    def to_dict(self):
-        return {
+    def to_dict(self, incluir_produto=False):
+        data = {
             'id': self.id,
             'produto_id': self.produto_id,
             'quantidade': self.quantidade,
             'preco_unitario': self.preco_unitario,
             'subtotal': self.quantidade * self.preco_unitario
         }
+        if incluir_produto:
+            data['produto'] = self.produto.to_dict() if self.produto else None
+        return data
 
 class Pedido(db.Model):
     __tablename__ = 'pedidos'
@@ -39,12 +42,20 @@ class Pedido(db.Model):
     def calcular_total(self):
         self.total = sum(item.quantidade * item.preco_unitario for item in self.itens)
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include=('itens',)):
+        """
+        Serializa o pedido
+        :param include: Relações a expandir ('itens', 'cliente', 'produto'); 'produto' implica 'itens'
+        """
+        data = {
             'id': self.id,
             'cliente_id': self.cliente_id,
             'data_pedido': self.data_pedido.isoformat(),
             'status': self.status,
-            'total': self.total,
-            'itens': [item.to_dict() for item in self.itens]
-        } 
\ No newline at end of file
+            'total': self.total
+        }
+        if 'itens' in include or 'produto' in include:
+            data['itens'] = [item.to_dict(incluir_produto='produto' in include) for item in self.itens]
+        if 'cliente' in include:
+            data['cliente'] = self.cliente.to_dict() if self.cliente else None
+        return data 
\ No newline at end of file
@@ -1,5 +1,4 @@
 from app import db
-from datetime import datetime
 from sqlalchemy import CheckConstraint
 
 class Produto(db.Model):
@@ -11,6 +10,7 @@ class Produto(db.Model):
     preco = db.Column(db.Float, nullable=False)
     quantidade_estoque = db.Column(db.Integer, default=0)
     imagem_url = db.Column(db.String(255))
+    imagem_variantes = db.Column(db.JSON)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     
@@ -36,6 +36,7 @@ class Produto(db.Model):
             'preco': self.preco,
             'quantidade_estoque': self.quantidade_estoque,
             'imagem_url': self.imagem_url,
+            'imagem_variantes': self.imagem_variantes,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         } 
\ No newline at end of file
@@ -0,0 +1,16 @@
+from app import db
+from datetime import datetime
+
+class TokenRevogado(db.Model):
+    """Refresh token já usado (rotação) ou encerrado no logout; removido depois que expira"""
+    __tablename__ = 'tokens_revogados'
+    
+    jti = db.Column(db.String(36), primary_key=True)
+    usuario_id = db.Column(db.Integer, nullable=False)
+    expira_em = db.Column(db.DateTime, nullable=False, index=True)
+    revogado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __init__(self, jti, usuario_id, expira_em):
+        self.jti = jti
+        self.usuario_id = usuario_id
+        self.expira_em = expira_em
\ No newline at end of file
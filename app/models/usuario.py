@@ -1,5 +1,5 @@
 from app import db
-from passlib.hash import pbkdf2_sha256
+from app.config.senha import contexto_senha
 from enum import Enum
 
 class PerfilUsuario(Enum):
@@ -24,10 +24,10 @@ class Usuario(db.Model):
         self.cliente_id = cliente_id
     
     def set_senha(self, senha):
-        self.senha_hash = pbkdf2_sha256.hash(senha)
+        self.senha_hash = contexto_senha.hash(senha)
     
     def verificar_senha(self, senha):
-        return pbkdf2_sha256.verify(senha, self.senha_hash)
+        return contexto_senha.verify(senha, self.senha_hash)
     
     def to_dict(self):
         return {
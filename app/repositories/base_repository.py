@@ -1,8 +1,53 @@
-from typing import List, TypeVar, Type, Optional
+from typing import Callable, Dict, List, TypeVar, Type, Optional, Tuple
+from sqlalchemy import and_, or_, func, cast, select, bindparam, REAL
 from app import db
+from app.repositories.busca_textual import escapar_like, relevancia
+from app.repositories.contadores import MODOS_CONTAGEM, contar_exato, contar_estimado
+from app.repositories.unidade_de_trabalho import confirmar
+from datetime import datetime
+import base64
+import json
 
 T = TypeVar('T', bound=db.Model)
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# IDs por DELETE ... WHERE id IN (...) no delete_where sem RETURNING (abaixo do limite de parâmetros do SQLite)
+MAX_IDS_POR_DELETE = 500
+
+# Os métodos em lote não passam pelos eventos do ORM: quem precisa saber das alterações (ex: cache)
+# se registra aqui e é chamado com (operacao, ids), onde operacao é 'insercao', 'alteracao' ou 'remocao'
+OUVINTES_EM_LOTE: Dict[type, List[Callable]] = {}
+
+def ouvir_alteracoes_em_lote(model_class, ouvinte: Callable) -> None:
+    OUVINTES_EM_LOTE.setdefault(model_class, []).append(ouvinte)
+
+def _encode_cursor(valores: list) -> str:
+    """Serializa as chaves do último item da página em um token opaco"""
+    payload = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in valores])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+    
+    if not isinstance(valores, list) or len(valores) != 2:
+        raise ValueError("Cursor inválido")
+    # O segundo valor é sempre a chave primária, e o primeiro vai direto para a comparação no SQL
+    if isinstance(valores[0], (list, dict)) or not isinstance(valores[1], int) or isinstance(valores[1], bool):
+        raise ValueError("Cursor inválido")
+    return valores
+
+def _normalizar_limit(limit: Optional[int]) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    if limit < 1:
+        raise ValueError("O parâmetro limit deve ser maior que zero")
+    return min(limit, MAX_PAGE_SIZE)
+
 class BaseRepository:
     def __init__(self, model_class: Type[T]):
         self.model_class = model_class
@@ -10,7 +55,7 @@ class BaseRepository:
     def create(self, **kwargs) -> T:
         instance = self.model_class(**kwargs)
         db.session.add(instance)
-        db.session.commit()
+        confirmar()
         return instance
     
     def get_by_id(self, id: int) -> Optional[T]:
@@ -19,15 +64,216 @@ class BaseRepository:
     def get_all(self) -> List[T]:
         return self.model_class.query.all()
     
+    def paginate(self, cursor: Optional[str] = None, limit: Optional[int] = None, order_by=None, query=None) -> Tuple[List[T], Optional[str]]:
+        """
+        Paginação por keyset: filtra a partir da última chave vista em vez de usar OFFSET
+        :param cursor: Token opaco devolvido como next_cursor pela página anterior
+        :param limit: Quantidade de itens por página (limitada a MAX_PAGE_SIZE)
+        :param order_by: Coluna indexada usada na ordenação (padrão: chave primária)
+        :param query: Query base (ex: com opções de carregamento); padrão é model_class.query
+        :return: Itens da página e o cursor da próxima página (None na última)
+        """
+        limit = _normalizar_limit(limit)
+        
+        pk = self.model_class.__mapper__.primary_key[0]
+        coluna = order_by if order_by is not None else pk
+        if query is None:
+            query = self.model_class.query
+        
+        if cursor:
+            valor, ultimo_id = _decode_cursor(cursor)
+            if isinstance(coluna.type, db.DateTime):
+                try:
+                    valor = datetime.fromisoformat(valor)
+                except (TypeError, ValueError):
+                    raise ValueError("Cursor inválido")
+            if coluna is pk:
+                query = query.filter(pk > ultimo_id)
+            else:
+                query = query.filter(or_(coluna > valor, and_(coluna == valor, pk > ultimo_id)))
+        
+        itens = query.order_by(coluna, pk).limit(limit + 1).all()
+        
+        next_cursor = None
+        if len(itens) > limit:
+            itens = itens[:limit]
+            ultimo = itens[-1]
+            next_cursor = _encode_cursor([getattr(ultimo, coluna.key), getattr(ultimo, pk.key)])
+        
+        return itens, next_cursor
+    
+    def buscar_texto(self, termo: str, colunas: list, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[T], Optional[str]]:
+        """
+        Busca textual paginada, ordenada por relevância. Filtra com ILIKE '%termo%' (acelerado no
+        PostgreSQL pelos índices GIN do pg_trgm) e ordena pelo word_similarity do pg_trgm.
+        Em outros bancos (ex: SQLite nos testes) a relevância é calculada em Python.
+        :param termo: Texto buscado
+        :param colunas: Colunas pesquisadas
+        :param cursor: Token opaco devolvido como next_cursor pela página anterior
+        :param limit: Quantidade de itens por página (limitada a MAX_PAGE_SIZE)
+        :return: Itens da página e o cursor da próxima página (None na última)
+        """
+        limit = _normalizar_limit(limit)
+        termo = (termo or '').strip()
+        if not termo:
+            raise ValueError("Informe um termo para a busca")
+        
+        pk = self.model_class.__mapper__.primary_key[0]
+        padrao = f'%{escapar_like(termo)}%'
+        query = self.model_class.query.filter(or_(*[coluna.ilike(padrao, escape='\\') for coluna in colunas]))
+        
+        ultimo = None
+        if cursor:
+            ultimo = _decode_cursor(cursor)
+            if not isinstance(ultimo[0], (int, float)) or isinstance(ultimo[0], bool):
+                raise ValueError("Cursor inválido")
+        
+        if db.engine.dialect.name == 'postgresql':
+            score = func.greatest(*[func.word_similarity(termo, func.coalesce(coluna, '')) for coluna in colunas])
+            if ultimo:
+                # word_similarity devolve real: compara no mesmo tipo para não perder itens empatados
+                valor = cast(ultimo[0], REAL)
+                query = query.filter(or_(score < valor, and_(score == valor, pk > ultimo[1])))
+            linhas = query.add_columns(score).order_by(score.desc(), pk).limit(limit + 1).all()
+        else:
+            linhas = sorted(
+                ((item, relevancia(termo, [getattr(item, coluna.key) for coluna in colunas])) for item in query.all()),
+                key=lambda linha: (-linha[1], getattr(linha[0], pk.key))
+            )
+            if ultimo:
+                linhas = [
+                    (item, pontuacao) for item, pontuacao in linhas
+                    if pontuacao < ultimo[0] or (pontuacao == ultimo[0] and getattr(item, pk.key) > ultimo[1])
+                ]
+            linhas = linhas[:limit + 1]
+        
+        next_cursor = None
+        if len(linhas) > limit:
+            linhas = linhas[:limit]
+            item, pontuacao = linhas[-1]
+            next_cursor = _encode_cursor([pontuacao, getattr(item, pk.key)])
+        
+        return [item for item, _ in linhas], next_cursor
+    
     def update(self, instance: T, **kwargs) -> T:
         for key, value in kwargs.items():
             setattr(instance, key, value)
-        db.session.commit()
+        confirmar()
         return instance
     
     def delete(self, instance: T) -> None:
         db.session.delete(instance)
-        db.session.commit()
+        confirmar()
+    
+    def _notificar_em_lote(self, operacao: str, ids: Optional[List] = None) -> None:
+        for ouvinte in OUVINTES_EM_LOTE.get(self.model_class, []):
+            ouvinte(operacao, ids)
+    
+    def _validar_colunas(self, colunas) -> None:
+        tabela = self.model_class.__table__
+        invalidas = [coluna for coluna in colunas if coluna not in tabela.c]
+        if invalidas:
+            raise ValueError(f"Colunas inexistentes em {tabela.name}: {', '.join(invalidas)}")
+    
+    def bulk_create(self, linhas: List[Dict]) -> int:
+        """
+        Insere os registros com um único INSERT executado em lote (executemany), sem criar entidades
+        :param linhas: Valores das colunas de cada registro
+        :return: Quantidade de registros inseridos (os IDs gerados não são retornados)
+        """
+        if not linhas:
+            return 0
+        db.session.execute(self.model_class.__table__.insert(), linhas)
+        self._notificar_em_lote('insercao')
+        confirmar()
+        return len(linhas)
+    
+    def bulk_update(self, linhas: List[Dict]) -> int:
+        """
+        Atualiza registros pela chave primária com um UPDATE executado em lote (executemany) para cada
+        conjunto de colunas alteradas, sem carregar as entidades
+        :param linhas: Dicts com a chave primária e as colunas a alterar (ex: {'id': 1, 'preco': 9.9})
+        :return: Quantidade de linhas enviadas
+        """
+        tabela = self.model_class.__table__
+        pk = list(tabela.primary_key.columns)[0]
+        
+        grupos = {}
+        for linha in linhas:
+            if pk.key not in linha:
+                raise ValueError(f"Informe a chave primária ({pk.key}) de cada registro")
+            colunas = tuple(sorted(coluna for coluna in linha if coluna != pk.key))
+            self._validar_colunas(colunas)
+            if colunas:
+                grupos.setdefault(colunas, []).append(linha)
+        
+        for colunas, grupo in grupos.items():
+            # Parâmetros com prefixo: o nome da coluna é reservado para o SET gerado pelo SQLAlchemy
+            stmt = tabela.update().where(pk == bindparam('_pk')).values(
+                {coluna: bindparam(f'_{coluna}') for coluna in colunas}
+            )
+            db.session.execute(stmt, [
+                {'_pk': linha[pk.key], **{f'_{coluna}': linha[coluna] for coluna in colunas}}
+                for linha in grupo
+            ])
+            self._notificar_em_lote('alteracao', [linha[pk.key] for linha in grupo])
+        confirmar()
+        return sum(len(grupo) for grupo in grupos.values())
+    
+    def delete_where(self, *condicoes, **filtros) -> int:
+        """
+        Remove com um único DELETE os registros que atendem às condições, sem carregá-los
+        :param condicoes: Expressões do SQLAlchemy (ex: Produto.preco < 1)
+        :param filtros: Igualdades por coluna (ex: pedido_id=10)
+        :return: Quantidade de registros removidos
+        """
+        tabela = self.model_class.__table__
+        self._validar_colunas(filtros)
+        criterios = list(condicoes) + [tabela.c[coluna] == valor for coluna, valor in filtros.items()]
+        if not criterios:
+            raise ValueError("Informe ao menos uma condição para o delete_where")
+        stmt = tabela.delete().where(and_(*criterios))
+        
+        if not OUVINTES_EM_LOTE.get(self.model_class):
+            removidos = db.session.execute(stmt).rowcount
+        elif db.engine.dialect.full_returning:
+            # Os ouvintes precisam dos IDs removidos
+            pk = list(tabela.primary_key.columns)[0]
+            ids = db.session.execute(stmt.returning(pk)).scalars().all()
+            removidos = len(ids)
+            self._notificar_em_lote('remocao', ids)
+        else:
+            # Sem RETURNING, os IDs vêm de um SELECT antes, e só eles são removidos: uma linha que passasse a
+            # atender às condições entre o SELECT e o DELETE seria removida sem que os ouvintes soubessem
+            pk = list(tabela.primary_key.columns)[0]
+            ids = db.session.execute(select(pk).where(and_(*criterios))).scalars().all()
+            removidos = 0
+            for inicio in range(0, len(ids), MAX_IDS_POR_DELETE):
+                faixa = ids[inicio:inicio + MAX_IDS_POR_DELETE]
+                removidos += db.session.execute(tabela.delete().where(pk.in_(faixa), *criterios)).rowcount
+            self._notificar_em_lote('remocao', ids)
+        confirmar()
+        return removidos
+    
+    def contar_total(self) -> int:
+        """Total exato de registros pelo contador da tabela (COUNT(*) se ela não tiver contador)"""
+        total = contar_exato(self.model_class.__tablename__)
+        return total if total is not None else self.model_class.query.count()
+    
+    def contar(self, modo: Optional[str] = None) -> Tuple[int, str]:
+        """
+        :param modo: 'exato' (padrão) ou 'estimado'; sem estatísticas do planejador, a estimativa cai no exato
+        :return: Total de registros e o modo efetivamente usado
+        """
+        modo = modo or 'exato'
+        if modo not in MODOS_CONTAGEM:
+            raise ValueError(f"Modo de contagem inválido: {modo}. Use: {', '.join(MODOS_CONTAGEM)}")
+        
+        if modo == 'estimado':
+            total = contar_estimado(self.model_class.__tablename__)
+            if total is not None:
+                return total, 'estimado'
+        return self.contar_total(), 'exato'
     
     def filter_by(self, **kwargs) -> List[T]:
         return self.model_class.query.filter_by(**kwargs).all()
@@ -0,0 +1,45 @@
+import re
+
+PALAVRA_REGEX = re.compile(r'\w+', re.UNICODE)
+
+def escapar_like(termo: str) -> str:
+    """Escapa os curingas do LIKE para que o termo seja buscado literalmente"""
+    return termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _trigramas(texto: str) -> list:
+    trigramas = []
+    for palavra in PALAVRA_REGEX.findall(texto.lower()):
+        # Mesmo preenchimento do pg_trgm: dois espaços antes e um depois de cada palavra
+        palavra = f'  {palavra} '
+        trigramas.extend(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return trigramas
+
+def relevancia(termo: str, textos) -> float:
+    """
+    Versão em Python puro do word_similarity do pg_trgm, usada quando o banco não é o PostgreSQL
+    (ex: SQLite nos testes): maior similaridade entre os trigramas do termo e os de qualquer
+    trecho contínuo de trigramas dos textos.
+    :param termo: Termo buscado
+    :param textos: Valores das colunas pesquisadas (None é ignorado)
+    :return: Relevância entre 0 e 1, arredondada para ser estável no cursor
+    """
+    trigramas_termo = set(_trigramas(termo))
+    if not trigramas_termo:
+        return 0.0
+    
+    melhor = 0.0
+    for texto in textos:
+        trigramas = _trigramas(texto or '')
+        # Um trecho só pode ser o melhor se começar e terminar em trigramas do termo
+        posicoes = [i for i, trigrama in enumerate(trigramas) if trigrama in trigramas_termo]
+        for inicio in posicoes:
+            trecho = set()
+            fim = inicio
+            for posicao in posicoes:
+                if posicao < inicio:
+                    continue
+                trecho.update(trigramas[fim:posicao + 1])
+                fim = posicao + 1
+                comuns = len(trecho & trigramas_termo)
+                melhor = max(melhor, comuns / (len(trecho) + len(trigramas_termo) - comuns))
+    return round(melhor, 6)
\ No newline at end of file
@@ -1,18 +1,15 @@
+from app import db
 from app.repositories.base_repository import BaseRepository
 from app.models.cliente import Cliente
-from sqlalchemy import or_
+from typing import List, Optional, Tuple
 
 class ClienteRepository(BaseRepository):
     def __init__(self):
         super().__init__(Cliente)
     
-    def buscar_por_nome(self, nome: str) -> list[Cliente]:
-        return self.model_class.query.filter(
-            or_(
-                Cliente.nome.ilike(f'%{nome}%'),
-                Cliente.email.ilike(f'%{nome}%')
-            )
-        ).all()
+    def buscar_por_nome(self, nome: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[Cliente], Optional[str]]:
+        return self.buscar_texto(nome, [Cliente.nome, Cliente.email], cursor=cursor, limit=limit)
     
-    def contar_total(self) -> int:
-        return self.model_class.query.count() 
\ No newline at end of file
+    def obter_data_atualizacao(self, id: int):
+        """data_atualizacao do cliente sem carregar a entidade (None se o cliente não existir)"""
+        return db.session.query(Cliente.data_atualizacao).filter(Cliente.id == id).first()
\ No newline at end of file
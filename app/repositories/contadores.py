@@ -0,0 +1,36 @@
+from typing import Optional
+from sqlalchemy import func, text
+from app import db
+from app.models.contador import Contador
+
+MODOS_CONTAGEM = ('exato', 'estimado')
+
+# Mesma conta do planejador: densidade da última análise (reltuples/relpages) vezes o tamanho atual da tabela.
+# Sem análise (reltuples = -1 a partir do PostgreSQL 14, ou relpages = 0 com a tabela já populada) não há estimativa.
+SQL_ESTIMATIVA = """
+    SELECT CASE
+        WHEN c.reltuples < 0 THEN NULL
+        WHEN c.relpages = 0 THEN CASE WHEN pg_relation_size(c.oid) = 0 THEN 0 END
+        ELSE c.reltuples / c.relpages * (pg_relation_size(c.oid) / current_setting('block_size')::int)
+    END
+    FROM pg_class c
+    WHERE c.oid = to_regclass(:tabela)
+"""
+
+def contar_exato(tabela: str) -> Optional[int]:
+    """
+    Soma das fatias do contador da tabela
+    :return: Total de linhas, ou None se a tabela não tiver contador (ex: banco sem os triggers)
+    """
+    total, fatias = db.session.query(func.sum(Contador.total), func.count()).filter(Contador.tabela == tabela).one()
+    return int(total) if fatias else None
+
+def contar_estimado(tabela: str) -> Optional[int]:
+    """
+    Estimativa das estatísticas do planejador do PostgreSQL, sem ler a tabela nem o contador
+    :return: Total estimado, ou None em outros bancos ou se a tabela ainda não tiver sido analisada
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return None
+    estimativa = db.session.execute(text(SQL_ESTIMATIVA), {'tabela': tabela}).scalar()
+    return None if estimativa is None else round(estimativa)
\ No newline at end of file
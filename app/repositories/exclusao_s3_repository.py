@@ -0,0 +1,46 @@
+from app.repositories.base_repository import BaseRepository
+from app.repositories.unidade_de_trabalho import confirmar
+from app.models.exclusao_s3 import ExclusaoS3
+from app import db
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+class ExclusaoS3Repository(BaseRepository):
+    def __init__(self):
+        super().__init__(ExclusaoS3)
+    
+    def enfileirar(self, chaves: List[str]) -> None:
+        """
+        Adiciona as chaves à fila de exclusão sem fazer commit: a fila participa da transação
+        de quem chamou, então só é gravada (e vista pelo worker) se a alteração no banco for confirmada
+        """
+        db.session.add_all([ExclusaoS3(chave) for chave in chaves])
+    
+    def buscar_pendentes(self, limite: int) -> List[ExclusaoS3]:
+        """
+        Busca o próximo lote vencido, travando as linhas para que outros workers
+        pulem o mesmo lote (SKIP LOCKED no PostgreSQL; ignorado no SQLite)
+        """
+        return self.model_class.query.filter(
+            ExclusaoS3.proxima_tentativa <= datetime.utcnow()
+        ).order_by(ExclusaoS3.id).limit(limite).with_for_update(skip_locked=True).all()
+    
+    def concluir(self, itens: List[ExclusaoS3], erros: Dict[str, str], backoff: Callable[[int], float]) -> None:
+        """
+        Remove da fila as chaves excluídas e reagenda as que falharam
+        :param itens: Lote retornado por buscar_pendentes
+        :param erros: Mensagem de erro por chave que não pôde ser excluída
+        :param backoff: Função que recebe o número de tentativas e retorna a espera em segundos
+        """
+        agora = datetime.utcnow()
+        for item in itens:
+            if item.chave in erros:
+                item.tentativas += 1
+                item.ultimo_erro = erros[item.chave]
+                item.proxima_tentativa = agora + timedelta(seconds=backoff(item.tentativas))
+            else:
+                db.session.delete(item)
+        confirmar()
+    
+    def contar_pendentes(self) -> int:
+        return self.model_class.query.count()
\ No newline at end of file
@@ -1,51 +1,87 @@
 from app.repositories.base_repository import BaseRepository
+from app.repositories.produto_repository import ProdutoRepository
+from app.repositories.unidade_de_trabalho import unidade_de_trabalho, confirmar
 from app.models.pedido import Pedido, ItemPedido
-from app.models.produto import Produto
 from app import db
-from typing import List, Dict
+from sqlalchemy.orm import joinedload, selectinload
+from typing import List, Dict, Optional, Tuple, Iterable
+
+RELACOES = ('itens', 'cliente', 'produto')
+INCLUDE_PADRAO = ('itens',)
 
 class PedidoRepository(BaseRepository):
     def __init__(self):
         super().__init__(Pedido)
+        self.produto_repository = ProdutoRepository()
+        self.item_repository = BaseRepository(ItemPedido)
+    
+    def _query_com_relacoes(self, include: Iterable[str] = INCLUDE_PADRAO):
+        """Monta a query carregando antecipadamente só as relações que serão serializadas"""
+        opcoes = []
+        if 'itens' in include or 'produto' in include:
+            itens = selectinload(Pedido.itens)
+            if 'produto' in include:
+                itens = itens.joinedload(ItemPedido.produto)
+            opcoes.append(itens)
+        if 'cliente' in include:
+            opcoes.append(joinedload(Pedido.cliente))
+        return self.model_class.query.options(*opcoes)
+    
+    def get_by_id(self, id: int, include: Iterable[str] = INCLUDE_PADRAO) -> Optional[Pedido]:
+        return self._query_com_relacoes(include).get(id)
+    
+    def paginate(self, cursor: Optional[str] = None, limit: Optional[int] = None, order_by=None, query=None, include: Iterable[str] = INCLUDE_PADRAO) -> Tuple[List[Pedido], Optional[str]]:
+        if query is None:
+            query = self._query_com_relacoes(include)
+        return super().paginate(cursor=cursor, limit=limit, order_by=order_by, query=query)
     
     def criar_pedido_com_itens(self, cliente_id: int, itens: List[Dict]) -> Pedido:
-        pedido = self.create(cliente_id=cliente_id)
-        
+        """
+        Cria o pedido e seus itens em uma única transação (a de uma unidade de trabalho já aberta, se houver)
+        :param cliente_id: ID do cliente
+        :param itens: Lista de itens com produto_id e quantidade
+        :return: Pedido criado
+        """
+        quantidades = {}
         for item in itens:
-            produto = Produto.query.get(item['produto_id'])
-            if not produto or produto.quantidade_estoque < item['quantidade']:
-                raise ValueError(f"Produto {item['produto_id']} não disponível em estoque")
+            quantidades[item['produto_id']] = quantidades.get(item['produto_id'], 0) + item['quantidade']
+        
+        with unidade_de_trabalho():
+            precos = self.produto_repository.reservar_estoque(quantidades)
+            
+            pedido = Pedido(cliente_id=cliente_id)
+            db.session.add(pedido)
+            db.session.flush()
             
-            item_pedido = ItemPedido(
-                pedido=pedido,
-                produto_id=produto.id,
-                quantidade=item['quantidade'],
-                preco_unitario=produto.preco
-            )
+            linhas = [
+                {
+                    'pedido_id': pedido.id,
+                    'produto_id': item['produto_id'],
+                    'quantidade': item['quantidade'],
+                    'preco_unitario': precos[item['produto_id']]
+                }
+                for item in itens
+            ]
+            self.item_repository.bulk_create(linhas)
             
-            produto.quantidade_estoque -= item['quantidade']
-            db.session.add(item_pedido)
+            pedido.total = sum(linha['quantidade'] * linha['preco_unitario'] for linha in linhas)
         
-        pedido.calcular_total()
-        db.session.commit()
         return pedido
     
-    def buscar_por_cliente(self, cliente_id: int) -> List[Pedido]:
-        return self.filter_by(cliente_id=cliente_id)
-    
-    def contar_total(self) -> int:
-        return self.model_class.query.count()
+    def buscar_por_cliente(self, cliente_id: int, include: Iterable[str] = INCLUDE_PADRAO) -> List[Pedido]:
+        return self._query_com_relacoes(include).filter_by(cliente_id=cliente_id).all()
     
     def atualizar_status(self, pedido_id: int, status: str) -> Pedido:
         pedido = self.get_by_id(pedido_id)
         if pedido:
             pedido.status = status
-            db.session.commit()
+            confirmar()
         return pedido
     
     def delete(self, pedido: Pedido) -> None:
-        for item in pedido.itens:
-            db.session.delete(item)
-        
-        db.session.delete(pedido)
-        db.session.commit() 
\ No newline at end of file
+        """Remove os itens com um único DELETE e depois o pedido, na mesma transação"""
+        with unidade_de_trabalho():
+            self.item_repository.delete_where(pedido_id=pedido.id)
+            # Os itens carregados não existem mais: sem isso o ORM tentaria desvinculá-los do pedido
+            db.session.expire(pedido, ['itens'])
+            super().delete(pedido) 
\ No newline at end of file
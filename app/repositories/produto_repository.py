@@ -1,22 +1,105 @@
 from app.repositories.base_repository import BaseRepository
 from app.models.produto import Produto
-from sqlalchemy import or_
+from app import db
+from sqlalchemy import func
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import csv
+import io
 
 class ProdutoRepository(BaseRepository):
     def __init__(self):
         super().__init__(Produto)
     
-    def buscar_por_nome(self, nome: str) -> list[Produto]:
-        return self.model_class.query.filter(
-            or_(
-                Produto.nome.ilike(f'%{nome}%'),
-                Produto.descricao.ilike(f'%{nome}%')
-            )
-        ).all()
+    def buscar_por_nome(self, nome: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[Produto], Optional[str]]:
+        return self.buscar_texto(nome, [Produto.nome, Produto.descricao], cursor=cursor, limit=limit)
+    
+    def buscar_por_ids(self, ids: List[int]) -> List[Produto]:
+        return self.model_class.query.filter(Produto.id.in_(ids)).all()
+    
+    def obter_data_atualizacao(self, id: int):
+        """updated_at do produto sem carregar a entidade (None se o produto não existir)"""
+        return db.session.query(Produto.updated_at).filter(Produto.id == id).first()
     
-    def contar_total(self) -> int:
-        return self.model_class.query.count()
+    def listar_nomes(self, desde: Optional[datetime] = None, limite: Optional[int] = None) -> List[Tuple[int, str, Optional[datetime]]]:
+        """
+        ID, nome e updated_at dos produtos, sem carregar as entidades (usado pelo índice de autocomplete)
+        :param desde: Se informado, apenas os produtos alterados a partir desse instante
+        :param limite: Quantidade máxima de linhas (sem ordem definida)
+        """
+        query = db.session.query(Produto.id, Produto.nome, Produto.updated_at)
+        if desde is not None:
+            query = query.filter(Produto.updated_at >= desde)
+        if limite is not None:
+            query = query.limit(limite)
+        return query.all()
+    
+    def inserir_em_lote(self, linhas: List[Dict]) -> None:
+        """
+        Insere os produtos em um único comando, sem criar entidades nem fazer commit:
+        COPY no PostgreSQL e INSERT com executemany nos demais bancos
+        :param linhas: Dicts com nome, descricao, preco e quantidade_estoque
+        """
+        if not linhas:
+            return
+        if db.engine.dialect.name != 'postgresql':
+            db.session.execute(Produto.__table__.insert(), linhas)
+            return
+        
+        # COPY não aplica os defaults do modelo: as datas vêm do relógio do banco, como no INSERT
+        agora = db.session.execute(func.localtimestamp()).scalar()
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for linha in linhas:
+            escritor.writerow([linha['nome'], linha['descricao'], linha['preco'], linha['quantidade_estoque'], agora, agora])
+        buffer.seek(0)
+        
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                "COPY produtos (nome, descricao, preco, quantidade_estoque, created_at, updated_at) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
     
     def verificar_estoque(self, produto_id: int, quantidade: int) -> bool:
         produto = self.get_by_id(produto_id)
-        return produto and produto.quantidade_estoque >= quantidade 
\ No newline at end of file
+        return produto and produto.quantidade_estoque >= quantidade
+    
+    def reservar_estoque(self, quantidades: Dict[int, int]) -> Dict[int, float]:
+        """
+        Baixa o estoque com UPDATE condicional atômico, sem ler o produto antes
+        (UPDATE ... SET quantidade_estoque = quantidade_estoque - q WHERE id = :id AND quantidade_estoque >= q).
+        Não faz commit: a reserva participa da transação de quem chamou, e os ouvintes de alterações em lote
+        são notificados dos produtos reservados (o cache do catálogo os invalida após o commit).
+        :param quantidades: Quantidade a reservar por produto_id
+        :return: Preço unitário de cada produto reservado
+        :raises ValueError: Se algum produto não existir ou não tiver estoque suficiente
+        """
+        tabela = Produto.__table__
+        returning = db.engine.dialect.full_returning
+        precos = {}
+        
+        # Ordem de ID fixa para que reservas concorrentes travem as linhas na mesma sequência
+        for produto_id in sorted(quantidades):
+            quantidade = quantidades[produto_id]
+            stmt = tabela.update().where(
+                tabela.c.id == produto_id,
+                tabela.c.quantidade_estoque >= quantidade
+            ).values(quantidade_estoque=tabela.c.quantidade_estoque - quantidade)
+            
+            if returning:
+                linha = db.session.execute(stmt.returning(tabela.c.preco)).first()
+                if linha is None:
+                    raise ValueError(f"Produto {produto_id} não disponível em estoque")
+                precos[produto_id] = linha.preco
+            elif db.session.execute(stmt).rowcount != 1:
+                raise ValueError(f"Produto {produto_id} não disponível em estoque")
+        
+        if not returning:
+            consulta = db.session.query(Produto.id, Produto.preco).filter(Produto.id.in_(quantidades.keys()))
+            precos = {produto_id: preco for produto_id, preco in consulta}
+        
+        self._notificar_em_lote('alteracao', sorted(quantidades))
+        return precos 
\ No newline at end of file
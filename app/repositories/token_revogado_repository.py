@@ -0,0 +1,30 @@
+from app.repositories.base_repository import BaseRepository
+from app.repositories.unidade_de_trabalho import unidade_de_trabalho
+from app.models.token_revogado import TokenRevogado
+from app import db
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+
+class TokenRevogadoRepository(BaseRepository):
+    def __init__(self):
+        super().__init__(TokenRevogado)
+    
+    def revogar(self, jti: str, usuario_id: int, expira_em: datetime) -> bool:
+        """
+        Revoga o token com um único INSERT; a chave primária no jti garante que só uma
+        requisição consegue revogar (e portanto rotacionar) o mesmo refresh token
+        :return: False se o token já estava revogado
+        """
+        try:
+            # Savepoint: dentro de uma unidade de trabalho maior, a falha desfaz só este INSERT
+            with unidade_de_trabalho(savepoint=True):
+                self.create(jti=jti, usuario_id=usuario_id, expira_em=expira_em)
+            return True
+        except IntegrityError:
+            return False
+    
+    def esta_revogado(self, jti: str) -> bool:
+        return db.session.query(TokenRevogado.jti).filter_by(jti=jti).first() is not None
+    
+    def remover_expirados(self) -> int:
+        return self.delete_where(TokenRevogado.expira_em < datetime.utcnow())
\ No newline at end of file
@@ -0,0 +1,45 @@
+from contextlib import contextmanager
+from app import db
+
+# Profundidade de unidades de trabalho abertas, guardada na sessão (que já é por thread)
+CHAVE_PROFUNDIDADE = 'unidade_de_trabalho'
+
+def em_unidade_de_trabalho() -> bool:
+    return db.session.info.get(CHAVE_PROFUNDIDADE, 0) > 0
+
+def confirmar():
+    """
+    Encerra uma escrita dos repositórios: commit imediato ou, dentro de uma unidade de trabalho,
+    apenas flush (gera os IDs e antecipa erros de constraint), deixando o commit para o fim da unidade
+    """
+    if em_unidade_de_trabalho():
+        db.session.flush()
+    else:
+        db.session.commit()
+
+@contextmanager
+def unidade_de_trabalho(savepoint: bool = False):
+    """
+    Agrupa várias escritas dos repositórios em uma só transação, com um único commit na saída do
+    bloco mais externo. Se o bloco levantar uma exceção, a transação é desfeita e a exceção propagada.
+    Blocos aninhados participam da unidade externa.
+    :param savepoint: Em um bloco aninhado, abre um SAVEPOINT: uma exceção dentro dele desfaz só
+        as escritas do bloco, e quem está na unidade externa pode tratá-la e continuar
+    """
+    sessao = db.session
+    profundidade = sessao.info.get(CHAVE_PROFUNDIDADE, 0)
+    sessao.info[CHAVE_PROFUNDIDADE] = profundidade + 1
+    try:
+        if savepoint and profundidade:
+            with sessao.begin_nested():
+                yield sessao
+        else:
+            yield sessao
+        if not profundidade:
+            sessao.commit()
+    except BaseException:
+        if not profundidade:
+            sessao.rollback()
+        raise
+    finally:
+        sessao.info[CHAVE_PROFUNDIDADE] = profundidade
\ No newline at end of file
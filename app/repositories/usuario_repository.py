@@ -1,5 +1,7 @@
 from app.repositories.base_repository import BaseRepository
+from app.repositories.unidade_de_trabalho import unidade_de_trabalho, confirmar
 from app.models.usuario import Usuario
+from sqlalchemy.exc import IntegrityError
 
 class UsuarioRepository(BaseRepository):
     def __init__(self):
@@ -8,8 +10,26 @@ class UsuarioRepository(BaseRepository):
     def get_by_email(self, email: str) -> Usuario:
         return self.first(email=email)
     
-    def verificar_senha(self, email: str, senha: str) -> bool:
-        usuario = self.get_by_email(email)
-        if usuario:
-            return usuario.verificar_senha(senha)
-        return False 
\ No newline at end of file
+    def create(self, **kwargs) -> Usuario:
+        """
+        Insere o usuário direto, sem SELECT prévio: a constraint UNIQUE do email detecta a duplicidade
+        """
+        try:
+            with unidade_de_trabalho(savepoint=True):
+                return super().create(**kwargs)
+        except IntegrityError as e:
+            if 'email' in str(e.orig):
+                raise ValueError("Email já cadastrado")
+            raise
+    
+    def atualizar_senha_hash(self, usuario_id: int, senha_hash_antigo: str, senha_hash_novo: str) -> bool:
+        """
+        Troca o hash da senha só se ele não mudou desde a leitura (evita sobrescrever uma troca de senha concorrente)
+        :return: True se o hash foi atualizado
+        """
+        atualizados = self.model_class.query.filter_by(
+            id=usuario_id,
+            senha_hash=senha_hash_antigo
+        ).update({'senha_hash': senha_hash_novo}, synchronize_session=False)
+        confirmar()
+        return atualizados == 1
\ No newline at end of file
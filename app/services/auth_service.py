@@ -1,15 +1,50 @@
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, create_refresh_token
 from app.repositories.usuario_repository import UsuarioRepository
-from app.models.usuario import PerfilUsuario
+from app.repositories.token_revogado_repository import TokenRevogadoRepository
+from app.models.usuario import Usuario, PerfilUsuario
+from app.services.senha_service import SenhaService
+from app.services.cache_service import CacheTTL
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from app import db
+from datetime import datetime
+import os
+import time
+
+# Cache dos dados do usuário para o /auth/me, único por processo e compartilhado pelas instâncias do serviço
+cache_usuarios = CacheTTL(
+    max_itens=int(os.getenv('USUARIO_CACHE_ITENS', 10000)),
+    ttl=float(os.getenv('USUARIO_CACHE_TTL', 30))
+)
+
+def _registrar_usuario_alterado(mapper, connection, usuario):
+    object_session(usuario).info.setdefault('cache_usuarios', set()).add(usuario.id)
+
+def _invalidar_usuarios(sessao):
+    for usuario_id in sessao.info.pop('cache_usuarios', ()):
+        cache_usuarios.invalidar(usuario_id)
+
+def _descartar_usuarios(sessao):
+    sessao.info.pop('cache_usuarios', None)
+
+# Qualquer alteração de usuário feita pelo ORM neste processo descarta a entrada em cache depois do commit:
+# no flush, um /auth/me concorrente ainda leria a linha antiga e a guardaria de novo por USUARIO_CACHE_TTL.
+# Nos demais workers a entrada só expira pelo TTL: uma mudança de perfil pode levar até USUARIO_CACHE_TTL para aparecer lá
+for evento in ('after_update', 'after_delete'):
+    event.listen(Usuario, evento, _registrar_usuario_alterado)
+event.listen(db.session, 'after_commit', _invalidar_usuarios)
+event.listen(db.session, 'after_rollback', _descartar_usuarios)
 
 class AuthService:
     def __init__(self):
         self.usuario_repository = UsuarioRepository()
+        self.senha_service = SenhaService()
+        self.token_revogado_repository = TokenRevogadoRepository()
+        self.intervalo_limpeza = float(os.getenv('TOKENS_REVOGADOS_LIMPEZA', 3600))
+        self._ultima_limpeza = time.monotonic()
+        self.cache_usuarios = cache_usuarios
     
     def registrar_usuario(self, nome: str, email: str, senha: str) -> dict:
-        if self.usuario_repository.get_by_email(email):
-            raise ValueError("Email já cadastrado")
-        
         usuario = self.usuario_repository.create(
             nome=nome,
             email=email,
@@ -23,23 +58,79 @@ class AuthService:
         }
     
     def autenticar_usuario(self, email: str, senha: str) -> dict:
-        if not self.usuario_repository.verificar_senha(email, senha):
+        usuario = self.usuario_repository.get_by_email(email)
+        if not usuario or not self.senha_service.verificar(usuario, senha):
             raise ValueError("Credenciais inválidas")
         
-        usuario = self.usuario_repository.get_by_email(email)
-        access_token = create_access_token(identity={
+        return {
+            **self._gerar_tokens(self._identidade(usuario)),
+            'usuario': usuario.to_dict()
+        }
+    
+    def _identidade(self, usuario: Usuario) -> dict:
+        return {
             'id': usuario.id,
             'email': usuario.email,
             'perfil': usuario.perfil.value
-        })
-        
+        }
+    
+    def _gerar_tokens(self, identidade: dict) -> dict:
         return {
-            'access_token': access_token,
-            'usuario': usuario.to_dict()
+            'access_token': create_access_token(identity=identidade),
+            'refresh_token': create_refresh_token(identity=identidade)
         }
     
+    def _revogar(self, identidade: dict, payload: dict) -> bool:
+        self._remover_revogados_expirados()
+        return self.token_revogado_repository.revogar(
+            jti=payload['jti'],
+            usuario_id=identidade['id'],
+            expira_em=datetime.utcfromtimestamp(payload['exp'])
+        )
+    
+    def renovar_tokens(self, identidade: dict, payload: dict) -> dict:
+        """
+        Troca um refresh token válido por um novo par de tokens, sem verificar a senha.
+        O refresh token usado é revogado (rotação): reapresentá-lo falha.
+        A nova identidade vem do usuário atual no banco, e não da gravada no refresh token,
+        para que mudanças de perfil e remoções valham a partir da próxima renovação.
+        :param identidade: Identidade gravada no refresh token
+        :param payload: Claims do refresh token (jti e exp)
+        """
+        usuario = self.usuario_repository.get_by_id(identidade['id'])
+        if not self._revogar(identidade, payload):
+            raise ValueError("Refresh token já utilizado")
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+        return self._gerar_tokens(self._identidade(usuario))
+    
+    def encerrar_sessao(self, identidade: dict, payload: dict) -> dict:
+        self._revogar(identidade, payload)
+        return {'message': 'Sessão encerrada com sucesso'}
+    
+    def token_revogado(self, payload: dict) -> bool:
+        # Só refresh tokens são revogáveis: access tokens têm vida curta e não consultam o banco
+        if payload.get('type') != 'refresh':
+            return False
+        return self.token_revogado_repository.esta_revogado(payload['jti'])
+    
+    def _remover_revogados_expirados(self):
+        """Descarta, no máximo uma vez por intervalo, os tokens revogados que já expiraram"""
+        agora = time.monotonic()
+        if agora - self._ultima_limpeza < self.intervalo_limpeza:
+            return
+        self._ultima_limpeza = agora
+        self.token_revogado_repository.remover_expirados()
+    
     def get_usuario_atual(self, usuario_id: int) -> dict:
+        dados = self.cache_usuarios.get(usuario_id)
+        if dados is not None:
+            return dados
+        
         usuario = self.usuario_repository.get_by_id(usuario_id)
         if not usuario:
             raise ValueError("Usuário não encontrado")
-        return usuario.to_dict() 
\ No newline at end of file
+        
+        dados = usuario.to_dict()
+        self.cache_usuarios.set(usuario_id, dados)
+        return dados 
\ No newline at end of file
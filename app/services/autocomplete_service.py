@@ -0,0 +1,320 @@
+import os
+import sys
+import heapq
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from itertools import chain, islice
+from datetime import timedelta
+from flask import current_app
+from app import db
+from app.repositories.produto_repository import ProdutoRepository
+from app.repositories.busca_textual import PALAVRA_REGEX
+
+AUTOCOMPLETE_LIMITE_PADRAO = 10
+AUTOCOMPLETE_LIMITE_MAX = 50
+# Prefixos com mais termos que isso (ex: uma letra só) são amplos: só filtram os candidatos com startswith
+MAX_TERMOS_FILTRO = 1024
+# IDs testados um a um antes de recorrer à interseção de conjuntos
+MAX_VARREDURA = 1000
+# Palavras com até essa quantidade de IDs entram na interseção de conjuntos
+MAX_ESTIMATIVA = 100000
+
+def normalizar(texto: str) -> list:
+    """Palavras do texto em minúsculas e sem acentos ("Café Solúvel" -> ['cafe', 'soluvel'])"""
+    sem_acentos = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode()
+    return PALAVRA_REGEX.findall(sem_acentos.lower())
+
+def termos_nome(nome: str) -> tuple:
+    # Termos internados: o mesmo objeto str é compartilhado entre os nomes e as chaves do índice
+    return tuple(sys.intern(termo) for termo in normalizar(nome))
+
+class AutocompleteService:
+    """
+    Índice invertido em memória (por processo) dos nomes dos produtos para o autocomplete.
+    Os termos ficam em uma lista ordenada, de modo que a busca por prefixo é um bisect seguido
+    de uma varredura curta, e cada termo aponta para um array compacto com os IDs dos produtos.
+    Um segundo índice, com o primeiro termo de cada nome e os IDs ordenados pelo tamanho do nome,
+    encontra os nomes que começam com o texto digitado, que vêm primeiro nas sugestões.
+    As escritas feitas por este processo atualizam o índice na hora; as dos demais workers
+    chegam pela atualização periódica, que relê os produtos alterados desde o último updated_at
+    visto e reconstrói o índice quando a contagem diverge (produtos removidos em outro worker).
+    """
+    def __init__(self):
+        self.produto_repository = ProdutoRepository()
+        self.intervalo = float(os.getenv('AUTOCOMPLETE_INTERVALO', 30))
+        # Margem para alcançar transações que gravaram updated_at antes do último visto, mas commitaram depois
+        self.margem = timedelta(seconds=float(os.getenv('AUTOCOMPLETE_MARGEM', 5)))
+        self.max_candidatos = int(os.getenv('AUTOCOMPLETE_MAX_CANDIDATOS', 100))
+        self.max_incremental = int(os.getenv('AUTOCOMPLETE_MAX_INCREMENTAL', 1000))
+        self._termos = []
+        self._postagens = {}
+        self._primeiros_termos = []
+        self._primeiros = {}
+        self._nomes = {}
+        self._ultima_atualizacao = None
+        self._carregado = False
+        self._lock = threading.Lock()
+        self._lock_thread = threading.Lock()
+        self._thread = None
+    
+    @property
+    def carregado(self) -> bool:
+        """Se o índice já foi montado neste processo"""
+        return self._carregado
+    
+    def iniciar(self, app):
+        """Carrega o índice e inicia a thread de atualização neste processo, se ainda não estiver rodando"""
+        with self._lock_thread:
+            if not self._carregado:
+                self.carregar()
+            if self.intervalo > 0 and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._executar, args=(app,), name='autocomplete', daemon=True)
+                self._thread.start()
+    
+    def carregar(self, linhas=None):
+        """
+        Reconstrói o índice inteiro e troca o atual de uma vez
+        :param linhas: Tuplas (id, nome, updated_at) já lidas; por padrão lê todos os produtos do banco
+        """
+        if linhas is None:
+            linhas = self.produto_repository.listar_nomes()
+        
+        postagens, primeiros, nomes = {}, {}, {}
+        ultima_atualizacao = None
+        for id, nome, updated_at in linhas:
+            nomes[id] = (nome, termos_nome(nome))
+            for termo in set(nomes[id][1]):
+                postagens.setdefault(termo, array('i')).append(id)
+            if nomes[id][1]:
+                primeiros.setdefault(nomes[id][1][0], array('i')).append(id)
+            if updated_at and (ultima_atualizacao is None or updated_at > ultima_atualizacao):
+                ultima_atualizacao = updated_at
+        for termo, postagem in primeiros.items():
+            primeiros[termo] = array('i', sorted(postagem, key=lambda id: (len(nomes[id][0]), id)))
+        
+        with self._lock:
+            self._termos = sorted(postagens)
+            self._postagens = postagens
+            self._primeiros_termos = sorted(primeiros)
+            self._primeiros = primeiros
+            self._nomes = nomes
+            self._ultima_atualizacao = ultima_atualizacao
+            self._carregado = True
+    
+    def atualizar(self):
+        """Aplica os produtos alterados desde a última atualização (inclusive por outros workers)"""
+        desde = self._ultima_atualizacao - self.margem if self._ultima_atualizacao else None
+        alterados = self.produto_repository.listar_nomes(desde, limite=self.max_incremental + 1)
+        # Cada termo novo é um insort na lista ordenada: deltas grandes (ex: importação) saem mais baratos reconstruindo
+        if len(alterados) > self.max_incremental:
+            self.carregar()
+            return
+        
+        for id, nome, updated_at in alterados:
+            self.indexar(id, nome)
+            if updated_at and (self._ultima_atualizacao is None or updated_at > self._ultima_atualizacao):
+                self._ultima_atualizacao = updated_at
+        
+        if self.produto_repository.contar_total() != len(self._nomes):
+            self.carregar()
+    
+    def indexar(self, id: int, nome: str):
+        """Inclui ou atualiza o nome de um produto no índice"""
+        termos = termos_nome(nome)
+        with self._lock:
+            atual = self._nomes.get(id)
+            if atual is not None and atual[0] == nome:
+                return
+            if atual is not None:
+                self._remover_termos(id, atual[1])
+            self._nomes[id] = (nome, termos)
+            for termo in set(termos):
+                self._incluir(self._termos, self._postagens, termo, id)
+            if termos:
+                self._incluir(self._primeiros_termos, self._primeiros, termos[0], id, self._ordem_tamanho)
+    
+    def remover(self, id: int):
+        """Retira um produto do índice"""
+        with self._lock:
+            atual = self._nomes.pop(id, None)
+            if atual is not None:
+                self._remover_termos(id, atual[1])
+    
+    def _remover_termos(self, id, termos):
+        for termo in set(termos):
+            self._retirar(self._termos, self._postagens, termo, id)
+        if termos:
+            self._retirar(self._primeiros_termos, self._primeiros, termos[0], id)
+    
+    def _ordem_tamanho(self, id):
+        return len(self._nomes[id][0]), id
+    
+    @staticmethod
+    def _incluir(termos, postagens, termo, id, ordem=None):
+        postagem = postagens.get(termo)
+        if postagem is None:
+            postagem = postagens[termo] = array('i')
+            insort(termos, termo)
+        if ordem is None:
+            postagem.append(id)
+        else:
+            insort(postagem, id, key=ordem)
+    
+    @staticmethod
+    def _retirar(termos, postagens, termo, id):
+        postagem = postagens[termo]
+        postagem.remove(id)
+        if not postagem:
+            del postagens[termo]
+            del termos[bisect_left(termos, termo)]
+    
+    def _faixa(self, prefixo, termos=None):
+        """Posições em termos (por padrão _termos) dos termos que começam com o prefixo"""
+        if termos is None:
+            termos = self._termos
+        # '{' vem depois de qualquer caractere possível nos termos normalizados ([0-9_a-z])
+        return bisect_left(termos, prefixo), bisect_left(termos, prefixo + '{')
+    
+    def _tamanho(self, inicio, fim, maximo):
+        """
+        Quantidade de IDs nos termos da faixa, parando assim que passar de maximo. Faixas com muitos
+        termos (prefixos curtos) não são somadas: elas só são varridas quando todas as palavras são amplas.
+        """
+        if fim - inicio > min(maximo, MAX_TERMOS_FILTRO):
+            return fim - inicio
+        total = 0
+        for posicao in range(inicio, fim):
+            total += len(self._postagens[self._termos[posicao]])
+            if total > maximo:
+                break
+        return total
+    
+    def buscar(self, q: str, limit=None) -> list:
+        """
+        Sugestões de produtos cujo nome tem palavras começando com cada palavra digitada.
+        Nomes que começam com o texto digitado vêm primeiro, seguidos dos mais curtos.
+        :param q: Texto digitado
+        :param limit: Quantidade máxima de sugestões (limitada a AUTOCOMPLETE_LIMITE_MAX)
+        :return: Lista de {'id', 'nome'}
+        """
+        if limit is None:
+            limit = AUTOCOMPLETE_LIMITE_PADRAO
+        if limit < 1:
+            raise ValueError("O parâmetro limit deve ser maior que zero")
+        limit = min(limit, AUTOCOMPLETE_LIMITE_MAX)
+        
+        palavras = normalizar(q)
+        if not palavras:
+            return []
+        if not self._carregado:
+            self.iniciar(current_app._get_current_object())
+        
+        with self._lock:
+            faixas = []
+            for palavra in set(palavras):
+                inicio, fim = self._faixa(palavra)
+                if inicio == fim:
+                    return []
+                tamanho = self._tamanho(inicio, fim, MAX_ESTIMATIVA) if len(palavras) > 1 else 0
+                faixas.append((fim - inicio > MAX_TERMOS_FILTRO, tamanho, -len(palavra), palavra, inicio, fim))
+            faixas.sort()
+            filtros = [
+                frozenset(self._termos[primeiro:ultimo]) if ultimo - primeiro <= MAX_TERMOS_FILTRO else palavra
+                for _, _, _, palavra, primeiro, ultimo in faixas
+            ]
+            melhores = []
+            vistos = set()
+            
+            # Os nomes que começam com o texto digitado vêm do índice de primeiros termos, e não da varredura
+            # abaixo, que segue a ordem dos IDs e pode não chegar a eles. Com várias palavras, o primeiro termo
+            # é a primeira palavra, e a varredura já vê todos eles quando a palavra mais seletiva cabe nela.
+            if len(palavras) == 1:
+                primeiros = self._primeiros_termos[slice(*self._faixa(palavras[0], self._primeiros_termos))]
+            elif faixas[0][1] > MAX_VARREDURA and palavras[0] in self._primeiros:
+                primeiros = [palavras[0]]
+            else:
+                primeiros = []
+            orcamento = MAX_VARREDURA
+            for termo in primeiros:
+                if orcamento <= 0:
+                    break
+                orcamento -= self._filtrar(islice(self._primeiros[termo], orcamento), filtros, palavras, vistos, melhores, limit, ordenados=True)
+            # A varredura abaixo só traria outros nomes que começam com o texto, por acaso e também na ordem dos IDs
+            if len(melhores) == limit and melhores[0][0]:
+                return self._sugestoes(melhores)
+            
+            # Varre os IDs da palavra mais seletiva testando as demais pelos termos de cada nome. Se o
+            # orçamento de varredura acabar sem sugestões suficientes (palavras que quase nunca aparecem
+            # juntas), o restante é reduzido por interseção de conjuntos antes de testar.
+            _, _, _, _, inicio, fim = faixas[0]
+            ids = chain.from_iterable(self._postagens[termo] for termo in self._termos[inicio:fim])
+            self._filtrar(islice(ids, MAX_VARREDURA), filtros[1:], palavras, vistos, melhores, limit)
+            proximo = next(ids, None) if len(melhores) < limit else None
+            if proximo is not None:
+                restantes = chain((proximo,), ids)
+                intersecoes = [
+                    (primeiro, ultimo) for ampla, tamanho, _, _, primeiro, ultimo in faixas[1:]
+                    if not ampla and tamanho <= MAX_ESTIMATIVA
+                ]
+                if intersecoes:
+                    restantes = set(restantes)
+                    for primeiro, ultimo in intersecoes:
+                        restantes.intersection_update(chain.from_iterable(self._postagens[termo] for termo in self._termos[primeiro:ultimo]))
+                    restantes = sorted(restantes)
+                self._filtrar(restantes, filtros[1:], palavras, vistos, melhores, limit, self.max_candidatos - len(melhores))
+        
+        return self._sugestoes(melhores)
+    
+    @staticmethod
+    def _sugestoes(melhores):
+        return [{'id': -id, 'nome': nome} for _, _, id, nome in sorted(melhores, reverse=True)]
+    
+    def _filtrar(self, ids, filtros, palavras, vistos, melhores, limit, maximo=None, ordenados=False):
+        """
+        Mantém em melhores as limit melhores sugestões entre os produtos cujo nome satisfaz todos os filtros.
+        melhores é um heap com a pior sugestão no topo: (começa com o texto, -tamanho do nome, -id, nome).
+        :param maximo: Para depois de encontrar essa quantidade de produtos
+        :param ordenados: Os IDs vêm ordenados pelo tamanho do nome, então para quando nenhum seguinte entraria no heap
+        :return: Quantidade de IDs examinados
+        """
+        inicio_nome, ultima = tuple(palavras[:-1]), palavras[-1]
+        encontrados = examinados = 0
+        for id in ids:
+            examinados += 1
+            if id in vistos:
+                continue
+            vistos.add(id)
+            nome, termos = self._nomes[id]
+            comeca = termos[:len(inicio_nome)] == inicio_nome and len(termos) > len(inicio_nome) and termos[len(inicio_nome)].startswith(ultima)
+            sugestao = (comeca, -len(nome), -id, nome)
+            # Com o heap cheio, só vale testar os filtros de quem entraria nele (sem maximo, a contagem não importa)
+            if maximo is None and len(melhores) == limit and sugestao < melhores[0]:
+                if ordenados and (True,) + sugestao[1:] < melhores[0]:
+                    break
+                continue
+            for filtro in filtros:
+                if filtro.isdisjoint(termos) if isinstance(filtro, frozenset) else not any(termo.startswith(filtro) for termo in termos):
+                    break
+            else:
+                if len(melhores) < limit:
+                    heapq.heappush(melhores, sugestao)
+                elif sugestao > melhores[0]:
+                    heapq.heapreplace(melhores, sugestao)
+                encontrados += 1
+                if maximo is not None and encontrados >= maximo:
+                    break
+        return examinados
+    
+    def _executar(self, app):
+        while True:
+            time.sleep(self.intervalo)
+            with app.app_context():
+                try:
+                    self.atualizar()
+                except Exception as e:
+                    print(f"Erro ao atualizar o índice de autocomplete: {str(e)}")
+                finally:
+                    db.session.remove()
\ No newline at end of file
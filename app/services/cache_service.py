@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+class CacheTTL:
+    """
+    Cache LRU em memória (por processo) com expiração por TTL e contadores de acerto.
+    Com ttl <= 0 o cache fica desligado e todas as leituras são misses.
+    """
+    def __init__(self, max_itens=10000, ttl=30):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._contadores = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    @property
+    def ativo(self):
+        return self.ttl > 0 and self.max_itens > 0
+    
+    def get(self, chave):
+        """
+        :param chave: Chave do item
+        :return: Valor em cache, ou None se ausente ou expirado
+        """
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[1] > time.monotonic():
+                self._entradas.move_to_end(chave)
+                self._contadores['hits'] += 1
+                return entrada[0]
+            
+            if entrada is not None:
+                del self._entradas[chave]
+            self._contadores['misses'] += 1
+            return None
+    
+    def set(self, chave, valor):
+        if not self.ativo:
+            return
+        with self._lock:
+            self._entradas[chave] = (valor, time.monotonic() + self.ttl)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_itens:
+                self._entradas.popitem(last=False)
+                self._contadores['evictions'] += 1
+    
+    def invalidar(self, chave):
+        with self._lock:
+            self._entradas.pop(chave, None)
+    
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+    
+    def estatisticas(self):
+        with self._lock:
+            total = self._contadores['hits'] + self._contadores['misses']
+            return {
+                **self._contadores,
+                'hit_ratio': round(self._contadores['hits'] / total, 4) if total else 0.0,
+                'itens': len(self._entradas),
+                'max_itens': self.max_itens,
+                'ttl': self.ttl
+            }
+
+class BackendCache(ABC):
+    """
+    Interface de um cache compartilhado entre os processos (ex: Redis). Os valores precisam ser
+    serializáveis em JSON.
+    """
+    nome = None
+    
+    @abstractmethod
+    def get_many(self, chaves) -> dict:
+        """:return: Valores encontrados, por chave (chaves ausentes ou expiradas ficam de fora)"""
+    
+    @abstractmethod
+    def set_many(self, valores: dict, ttl: float):
+        pass
+    
+    @abstractmethod
+    def delete(self, chaves):
+        pass
+
+class BackendCacheMemoria(BackendCache):
+    """
+    Implementação em memória do BackendCache, para testes e instalações com um único processo
+    (não é compartilhada entre workers). Serializa os valores em JSON como um backend remoto faria.
+    """
+    nome = 'memoria'
+    
+    def __init__(self):
+        self._entradas = {}
+        self._lock = threading.Lock()
+    
+    def get_many(self, chaves) -> dict:
+        agora = time.monotonic()
+        with self._lock:
+            entradas = {chave: self._entradas.get(chave) for chave in chaves}
+        return {chave: json.loads(entrada[0]) for chave, entrada in entradas.items() if entrada and entrada[1] > agora}
+    
+    def set_many(self, valores: dict, ttl: float):
+        expira_em = time.monotonic() + ttl
+        serializados = {chave: (json.dumps(valor), expira_em) for chave, valor in valores.items()}
+        with self._lock:
+            self._entradas.update(serializados)
+    
+    def delete(self, chaves):
+        with self._lock:
+            for chave in chaves:
+                self._entradas.pop(chave, None)
+
+class BackendCacheRedis(BackendCache):
+    """BackendCache sobre o Redis (pacote redis)"""
+    nome = 'redis'
+    
+    def __init__(self, url: str, prefixo: str = 'api:'):
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("CACHE_BACKEND=redis requer o pacote redis (pip install -r requirements.txt)")
+        self.cliente = redis.Redis.from_url(url)
+        self.prefixo = prefixo
+    
+    def get_many(self, chaves) -> dict:
+        chaves = list(chaves)
+        if not chaves:
+            return {}
+        valores = self.cliente.mget([self.prefixo + chave for chave in chaves])
+        return {chave: json.loads(valor) for chave, valor in zip(chaves, valores) if valor is not None}
+    
+    def set_many(self, valores: dict, ttl: float):
+        pipeline = self.cliente.pipeline(transaction=False)
+        for chave, valor in valores.items():
+            pipeline.set(self.prefixo + chave, json.dumps(valor), px=int(ttl * 1000))
+        pipeline.execute()
+    
+    def delete(self, chaves):
+        chaves = [self.prefixo + chave for chave in chaves]
+        if chaves:
+            self.cliente.delete(*chaves)
+
+BACKENDS_CACHE = ('memoria', 'redis')
+
+def criar_backend_cache(nome: str = None):
+    """
+    Cria o backend compartilhado configurado em CACHE_BACKEND
+    :param nome: 'memoria', 'redis' ou vazio para não usar cache compartilhado
+    :return: BackendCache ou None
+    """
+    nome = os.getenv('CACHE_BACKEND', '') if nome is None else nome
+    if not nome:
+        return None
+    if nome == 'memoria':
+        return BackendCacheMemoria()
+    if nome == 'redis':
+        return BackendCacheRedis(os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+    raise ValueError(f"Backend de cache não suportado: {nome}. Use: {', '.join(BACKENDS_CACHE)}")
\ No newline at end of file
@@ -0,0 +1,200 @@
+import os
+import threading
+import uuid
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from app import db
+from app.models.produto import Produto
+from app.repositories.base_repository import ouvir_alteracoes_em_lote
+from app.repositories.produto_repository import ProdutoRepository
+from app.services.cache_service import CacheTTL, criar_backend_cache
+
+CHAVE_VERSAO = 'produtos:versao'
+
+def chave_produto(id: int) -> str:
+    return f'produto:{id}'
+
+def chave_pagina(cursor, limit) -> str:
+    return f'produtos:pagina:{cursor or ""}:{"" if limit is None else limit}'
+
+class CatalogoCacheService:
+    """
+    Cache read-through do catálogo de produtos: um BackendCache compartilhado entre os workers
+    (CACHE_BACKEND) ou, sem ele, um CacheTTL local de vida curta em cada processo.
+    
+    Cada produto fica em uma entrada própria, e as páginas da listagem guardam apenas os IDs,
+    montando os itens a partir das entradas dos produtos. Assim, alterar um produto (inclusive a
+    baixa de estoque de um pedido) invalida só a entrada dele. Remoções são percebidas quando uma
+    página aponta para um produto que não existe mais, e a última página de cada listagem é
+    associada a uma versão trocada a cada produto criado, já que é a única que muda com inserções.
+    """
+    def __init__(self, compartilhado=None):
+        self.produto_repository = ProdutoRepository()
+        self.compartilhado = compartilhado if compartilhado is not None else criar_backend_cache()
+        # As invalidações só alcançam o cache local do worker que fez a escrita. Com um backend compartilhado,
+        # que todos invalidam, o nível local fica desligado; sem ele, os demais workers podem servir um
+        # produto desatualizado por até CATALOGO_CACHE_TTL segundos, por isso o padrão é curto
+        self.local = CacheTTL(
+            max_itens=int(os.getenv('CATALOGO_CACHE_ITENS', 10000)),
+            ttl=0 if self.compartilhado is not None else float(os.getenv('CATALOGO_CACHE_TTL', 1))
+        )
+        self.ttl_compartilhado = float(os.getenv('CATALOGO_CACHE_TTL_COMPARTILHADO', 300))
+        self._contadores = {'hits': 0, 'misses': 0, 'erros': 0}
+        self._lock = threading.Lock()
+        
+        # As alterações de produtos (pelo ORM ou pelos métodos em lote) são invalidadas depois do commit que as gravou
+        event.listen(Produto, 'after_insert', self._registrar_insercao)
+        for evento in ('after_update', 'after_delete'):
+            event.listen(Produto, evento, self._registrar_alteracao)
+        event.listen(db.session, 'after_commit', self._aplicar_invalidacoes)
+        event.listen(db.session, 'after_rollback', self._descartar_invalidacoes)
+        ouvir_alteracoes_em_lote(Produto, self._registrar_em_lote)
+    
+    def _pendentes(self, sessao) -> dict:
+        # Cada instância guarda as suas pendências na sessão (em produção há uma só, mas os testes criam outras)
+        return sessao.info.setdefault(('catalogo_cache', id(self)), {'alterados': set(), 'inserido': False})
+    
+    def _registrar_insercao(self, mapper, connection, produto):
+        self._pendentes(object_session(produto))['inserido'] = True
+    
+    def _registrar_alteracao(self, mapper, connection, produto):
+        self._pendentes(object_session(produto))['alterados'].add(produto.id)
+    
+    def _registrar_em_lote(self, operacao, ids):
+        pendentes = self._pendentes(db.session)
+        if operacao == 'insercao':
+            pendentes['inserido'] = True
+        else:
+            pendentes['alterados'].update(ids)
+    
+    def _aplicar_invalidacoes(self, sessao):
+        pendentes = sessao.info.pop(('catalogo_cache', id(self)), None)
+        if pendentes is None:
+            return
+        if pendentes['alterados']:
+            self.invalidar_produtos(pendentes['alterados'])
+        if pendentes['inserido']:
+            self.nova_versao()
+    
+    def _descartar_invalidacoes(self, sessao):
+        sessao.info.pop(('catalogo_cache', id(self)), None)
+    
+    def _ler(self, chaves) -> dict:
+        valores = {}
+        faltando = []
+        for chave in chaves:
+            # Com o nível local desligado, nem consulta (as leituras não contam como misses locais)
+            valor = self.local.get(chave) if self.local.ativo else None
+            if valor is not None:
+                valores[chave] = valor
+            else:
+                faltando.append(chave)
+        
+        if faltando and self.compartilhado is not None:
+            try:
+                remotos = self.compartilhado.get_many(faltando)
+            except Exception as e:
+                print(f"Erro ao ler o cache compartilhado: {str(e)}")
+                remotos = {}
+                self._contar('erros')
+            self._contar('hits', len(remotos))
+            self._contar('misses', len(faltando) - len(remotos))
+            for chave, valor in remotos.items():
+                self.local.set(chave, valor)
+                valores[chave] = valor
+        return valores
+    
+    def _gravar(self, valores: dict):
+        for chave, valor in valores.items():
+            self.local.set(chave, valor)
+        if self.compartilhado is not None and valores:
+            try:
+                self.compartilhado.set_many(valores, self.ttl_compartilhado)
+            except Exception as e:
+                print(f"Erro ao gravar no cache compartilhado: {str(e)}")
+                self._contar('erros')
+    
+    def _contar(self, contador, quantidade=1):
+        with self._lock:
+            self._contadores[contador] += quantidade
+    
+    def invalidar_produtos(self, ids):
+        """Descarta as entradas dos produtos (as páginas que os contêm passam a buscá-los de novo)"""
+        chaves = [chave_produto(id) for id in ids]
+        for chave in chaves:
+            self.local.invalidar(chave)
+        if self.compartilhado is not None:
+            try:
+                self.compartilhado.delete(chaves)
+            except Exception as e:
+                print(f"Erro ao invalidar o cache compartilhado: {str(e)}")
+                self._contar('erros')
+    
+    def nova_versao(self):
+        """Invalida as últimas páginas das listagens, que passam a incluir os produtos criados"""
+        self._gravar({CHAVE_VERSAO: uuid.uuid4().hex})
+    
+    def _versao(self):
+        versao = self._ler([CHAVE_VERSAO]).get(CHAVE_VERSAO)
+        if versao is None:
+            versao = uuid.uuid4().hex
+            self._gravar({CHAVE_VERSAO: versao})
+        return versao
+    
+    def obter_produtos(self, ids) -> dict:
+        """
+        :param ids: IDs dos produtos
+        :return: to_dict() de cada produto encontrado, por ID (no cache ou, para os que faltarem, no banco)
+        """
+        encontrados = self._ler([chave_produto(id) for id in ids])
+        produtos = {id: encontrados[chave_produto(id)] for id in ids if chave_produto(id) in encontrados}
+        
+        faltando = [id for id in ids if id not in produtos]
+        if faltando:
+            carregados = {produto.id: produto.to_dict() for produto in self.produto_repository.buscar_por_ids(faltando)}
+            self._gravar({chave_produto(id): produto for id, produto in carregados.items()})
+            produtos.update(carregados)
+        return produtos
+    
+    def obter_produto(self, id: int):
+        """:return: to_dict() do produto, ou None se não existir"""
+        return self.obter_produtos([id]).get(id)
+    
+    def listar_produtos(self, cursor=None, limit=None) -> dict:
+        """
+        Página da listagem de produtos (mesmo formato de BaseRepository.paginate)
+        :return: {'itens': [...], 'next_cursor': ...}
+        """
+        chave = chave_pagina(cursor, limit)
+        pagina = self._ler([chave]).get(chave)
+        if pagina is not None and (pagina['next_cursor'] or pagina['versao'] == self._versao()):
+            produtos = self.obter_produtos(pagina['ids'])
+            # Algum produto da página foi removido: a página é recalculada
+            if len(produtos) == len(pagina['ids']):
+                return {'itens': [produtos[id] for id in pagina['ids']], 'next_cursor': pagina['next_cursor']}
+        
+        versao = self._versao()
+        produtos, next_cursor = self.produto_repository.paginate(cursor=cursor, limit=limit)
+        itens = [produto.to_dict() for produto in produtos]
+        self._gravar({
+            chave: {
+                'ids': [item['id'] for item in itens],
+                'next_cursor': next_cursor,
+                'versao': None if next_cursor else versao
+            },
+            **{chave_produto(item['id']): item for item in itens}
+        })
+        return {'itens': itens, 'next_cursor': next_cursor}
+    
+    def estatisticas(self):
+        with self._lock:
+            total = self._contadores['hits'] + self._contadores['misses']
+            compartilhado = {
+                'backend': self.compartilhado.nome if self.compartilhado is not None else None,
+                **self._contadores,
+                'hit_ratio': round(self._contadores['hits'] / total, 4) if total else 0.0,
+                'ttl': self.ttl_compartilhado
+            }
+        return {'local': self.local.estatisticas(), 'compartilhado': compartilhado}
+
+catalogo_cache = CatalogoCacheService()
\ No newline at end of file
@@ -1,5 +1,5 @@
 from app.repositories.cliente_repository import ClienteRepository
-from typing import List, Dict, Optional
+from typing import Dict, Optional
 
 class ClienteService:
     def __init__(self):
@@ -22,9 +22,12 @@ class ClienteService:
         
         return cliente.to_dict()
     
-    def listar_clientes(self) -> List[Dict]:
-        clientes = self.cliente_repository.get_all()
-        return [cliente.to_dict() for cliente in clientes]
+    def listar_clientes(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        clientes, next_cursor = self.cliente_repository.paginate(cursor=cursor, limit=limit)
+        return {
+            'itens': [cliente.to_dict() for cliente in clientes],
+            'next_cursor': next_cursor
+        }
     
     def obter_cliente(self, id: int) -> Dict:
         cliente = self.cliente_repository.get_by_id(id)
@@ -32,13 +35,26 @@ class ClienteService:
             raise ValueError("Cliente não encontrado")
         return cliente.to_dict()
     
-    def buscar_por_nome(self, nome: str) -> List[Dict]:
-        clientes = self.cliente_repository.buscar_por_nome(nome)
-        return [cliente.to_dict() for cliente in clientes]
+    def obter_versao_cliente(self, id: int) -> str:
+        """
+        Versão atual do cliente (data_atualizacao), usada na ETag sem carregar nem serializar o cliente
+        :raises ValueError: Se o cliente não existir
+        """
+        linha = self.cliente_repository.obter_data_atualizacao(id)
+        if not linha:
+            raise ValueError("Cliente não encontrado")
+        return linha.data_atualizacao.isoformat() if linha.data_atualizacao else ''
+    
+    def buscar_por_nome(self, nome: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        clientes, next_cursor = self.cliente_repository.buscar_por_nome(nome, cursor=cursor, limit=limit)
+        return {
+            'itens': [cliente.to_dict() for cliente in clientes],
+            'next_cursor': next_cursor
+        }
     
-    def contar_clientes(self) -> Dict:
-        total = self.cliente_repository.contar_total()
-        return {'total': total}
+    def contar_clientes(self, modo: Optional[str] = None) -> Dict:
+        total, modo = self.cliente_repository.contar(modo)
+        return {'total': total, 'modo': modo}
     
     def atualizar_cliente(self, id: int, **kwargs) -> Dict:
         cliente = self.cliente_repository.get_by_id(id)
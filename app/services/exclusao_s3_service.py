@@ -0,0 +1,91 @@
+import os
+import threading
+from flask import current_app
+from app import db
+from app.repositories.exclusao_s3_repository import ExclusaoS3Repository
+
+# Limite de chaves por chamada do delete_objects no S3
+MAX_CHAVES_POR_LOTE = 1000
+
+class ExclusaoS3Service:
+    """
+    Fila de exclusões no S3 gravada no banco. As chaves entram na fila na mesma transação
+    que deixa de referenciá-las, e uma thread em segundo plano (uma por processo) as exclui
+    em lotes com delete_objects, reagendando as falhas com backoff exponencial.
+    As chaves também saem do cache de imagens do processo ao entrar na fila e depois de excluídas.
+    """
+    def __init__(self, s3_service, imagem_cache_service=None):
+        self.s3_service = s3_service
+        self.imagem_cache_service = imagem_cache_service
+        self.exclusao_repository = ExclusaoS3Repository()
+        self.intervalo = float(os.getenv('EXCLUSAO_S3_INTERVALO', 30))
+        self.tamanho_lote = min(int(os.getenv('EXCLUSAO_S3_LOTE', MAX_CHAVES_POR_LOTE)), MAX_CHAVES_POR_LOTE)
+        self.backoff_base = float(os.getenv('EXCLUSAO_S3_BACKOFF_BASE', 5))
+        self.backoff_max = float(os.getenv('EXCLUSAO_S3_BACKOFF_MAX', 3600))
+        self._evento = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def backoff(self, tentativas):
+        return min(self.backoff_base * 2 ** (tentativas - 1), self.backoff_max)
+    
+    def enfileirar(self, urls):
+        """
+        Adiciona as imagens à fila de exclusão na transação atual (sem commit)
+        :param urls: URLs ou chaves das imagens no S3
+        """
+        chaves = [self.s3_service.extrair_chave(url) for url in urls if url]
+        if chaves:
+            self.exclusao_repository.enfileirar(chaves)
+            self._invalidar_cache(chaves)
+    
+    def _invalidar_cache(self, chaves):
+        if self.imagem_cache_service is not None:
+            for chave in chaves:
+                self.imagem_cache_service.invalidar(chave)
+    
+    def notificar(self):
+        """Acorda o worker depois do commit que gravou novas chaves na fila"""
+        self.iniciar(current_app._get_current_object())
+        self._evento.set()
+    
+    def iniciar(self, app):
+        """Inicia a thread do worker neste processo, se ainda não estiver rodando"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, args=(app,), name='exclusao-s3', daemon=True)
+                self._thread.start()
+    
+    def processar_lote(self):
+        """
+        Exclui do S3 o próximo lote vencido da fila
+        :return: Quantidade de chaves processadas no lote
+        """
+        itens = self.exclusao_repository.buscar_pendentes(self.tamanho_lote)
+        if not itens:
+            db.session.commit()
+            return 0
+        
+        chaves = list(dict.fromkeys(item.chave for item in itens))
+        try:
+            erros = self.s3_service.deletar_imagens(chaves)
+        except Exception as e:
+            erros = {chave: str(e) for chave in chaves}
+        
+        self.exclusao_repository.concluir(itens, erros, self.backoff)
+        # Uma requisição entre o enfileiramento e a exclusão pode ter colocado a imagem de volta no cache
+        self._invalidar_cache([chave for chave in chaves if chave not in erros])
+        return len(itens)
+    
+    def _executar(self, app):
+        while True:
+            self._evento.wait(self.intervalo)
+            self._evento.clear()
+            with app.app_context():
+                try:
+                    while self.processar_lote() == self.tamanho_lote:
+                        pass
+                except Exception as e:
+                    print(f"Erro ao processar fila de exclusão do S3: {str(e)}")
+                finally:
+                    db.session.remove()
\ No newline at end of file
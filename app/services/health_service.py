@@ -0,0 +1,28 @@
+from app import db
+from app.config.database import get_pool_status
+from sqlalchemy import text
+import time
+
+class HealthService:
+    def verificar_banco(self) -> dict:
+        """Executa um SELECT 1 e retorna a latência junto com as estatísticas do pool"""
+        inicio = time.perf_counter()
+        try:
+            db.session.execute(text('SELECT 1'))
+            status = 'ok'
+            erro = None
+        except Exception as e:
+            db.session.rollback()
+            # A rota é pública: o detalhe do driver (host, usuário, banco) fica só no log do servidor
+            print(f"Erro no health check do banco: {str(e)}")
+            status = 'indisponivel'
+            erro = 'Banco de dados indisponível'
+        
+        resultado = {
+            'status': status,
+            'latencia_ms': round((time.perf_counter() - inicio) * 1000, 2),
+            'pool': get_pool_status(db.engine)
+        }
+        if erro:
+            resultado['error'] = erro
+        return resultado
\ No newline at end of file
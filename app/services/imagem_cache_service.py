@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from botocore.exceptions import ClientError
+
+class ImagemCacheada:
+    def __init__(self, conteudo, etag, last_modified, content_type):
+        self.conteudo = conteudo
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_type = content_type
+        self.validado_em = time.monotonic()
+
+class ImagemCacheService:
+    """
+    Cache LRU em memória, limitado por tamanho total em bytes, na frente do S3Service.
+    Entradas mais antigas que o TTL são revalidadas no S3 por ETag (get_object com IfNoneMatch).
+    """
+    def __init__(self, s3_service):
+        self.s3_service = s3_service
+        self.max_bytes = int(os.getenv('IMAGEM_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+        self.max_item_bytes = int(os.getenv('IMAGEM_CACHE_MAX_ITEM_BYTES', s3_service.MAX_FILE_SIZE))
+        self.ttl = float(os.getenv('IMAGEM_CACHE_TTL', 300))
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._contadores = {'hits': 0, 'misses': 0, 'revalidacoes': 0, 'evictions': 0}
+
+    def _contar(self, contador):
+        with self._lock:
+            self._contadores[contador] += 1
+
+    def _remover(self, filename):
+        entrada = self._entradas.pop(filename, None)
+        if entrada:
+            self._bytes -= len(entrada.conteudo)
+
+    def cabe(self, tamanho):
+        return self.max_bytes > 0 and tamanho <= min(self.max_item_bytes, self.max_bytes)
+
+    def get(self, filename):
+        """
+        Busca a imagem no cache, revalidando no S3 se a entrada estiver vencida
+        :param filename: Chave da imagem no bucket
+        :return: ImagemCacheada ou None se não estiver em cache
+        """
+        with self._lock:
+            entrada = self._entradas.get(filename)
+            if entrada is not None:
+                self._entradas.move_to_end(filename)
+
+        if entrada is None:
+            self._contar('misses')
+            return None
+
+        if time.monotonic() - entrada.validado_em > self.ttl:
+            self._contar('revalidacoes')
+            try:
+                objeto = self.s3_service.abrir_imagem(filename, if_none_match=entrada.etag)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != '304':
+                    with self._lock:
+                        self._remover(filename)
+                    raise
+                entrada.validado_em = time.monotonic()
+            else:
+                # A imagem mudou no S3: substitui (ou descarta, se não couber mais)
+                with self._lock:
+                    self._remover(filename)
+                if not self.cabe(objeto['ContentLength']):
+                    objeto['Body'].close()
+                    self._contar('misses')
+                    return None
+                entrada = self.put(filename, objeto)
+
+        self._contar('hits')
+        return entrada
+
+    def put(self, filename, objeto):
+        """
+        Lê o corpo de uma resposta get_object e guarda no cache, descartando as entradas menos usadas
+        :param filename: Chave da imagem no bucket
+        :param objeto: Resposta do get_object (o Body é consumido)
+        :return: ImagemCacheada
+        """
+        entrada = ImagemCacheada(
+            conteudo=objeto['Body'].read(),
+            etag=objeto['ETag'],
+            last_modified=objeto['LastModified'],
+            content_type=objeto.get('ContentType')
+        )
+
+        with self._lock:
+            self._remover(filename)
+            self._entradas[filename] = entrada
+            self._bytes += len(entrada.conteudo)
+            while self._bytes > self.max_bytes and self._entradas:
+                antigo, _ = next(iter(self._entradas.items()))
+                self._remover(antigo)
+                self._contadores['evictions'] += 1
+
+        return entrada
+
+    def invalidar(self, filename):
+        with self._lock:
+            self._remover(filename)
+
+    def estatisticas(self):
+        with self._lock:
+            total = self._contadores['hits'] + self._contadores['misses']
+            return {
+                **self._contadores,
+                'hit_ratio': round(self._contadores['hits'] / total, 4) if total else 0.0,
+                'itens': len(self._entradas),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
@@ -0,0 +1,141 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from PIL import Image, ImageOps
+from app import db
+from app.repositories.produto_repository import ProdutoRepository
+from app.services.s3_service import CHAVE_IMAGEM_REGEX
+
+# Lado maior (px) e formato de cada variante; formato None mantém o formato da original
+VARIANTES = {
+    'thumb': {'lado': 200, 'formato': None},
+    'medium': {'lado': 800, 'formato': None},
+    'webp': {'lado': 800, 'formato': 'webp'}
+}
+TAMANHOS_IMAGEM = ('original',) + tuple(VARIANTES)
+
+FORMATOS_PIL = {'jpg': 'JPEG', 'jpeg': 'JPEG', 'png': 'PNG', 'webp': 'WEBP'}
+OPCOES_SALVAR = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {},
+    'WEBP': {'quality': 80, 'method': 4}
+}
+
+def chave_variante(chave, variante):
+    """
+    Monta a chave da variante ao lado da original (ex: <uuid>.png -> <uuid>_thumb.png)
+    :param chave: Chave da imagem original no bucket
+    :param variante: Nome da variante (thumb, medium, webp)
+    :return: Chave da variante no bucket
+    """
+    base, ext = chave.rsplit('.', 1)
+    return f"{base}_{variante}.{VARIANTES[variante]['formato'] or ext.lower()}"
+
+def gerar_variantes(conteudo, ext):
+    """
+    Redimensiona a imagem em memória para todas as variantes
+    :param conteudo: Bytes da imagem original
+    :param ext: Extensão da imagem original
+    :return: Dicionário {variante: (bytes, content_type)}
+    """
+    maior_lado = max(config['lado'] for config in VARIANTES.values())
+    
+    with Image.open(io.BytesIO(conteudo)) as original:
+        tamanho_original = original.size
+        # No JPEG o draft decodifica direto numa escala reduzida, bem mais barato que abrir em tamanho cheio
+        original.draft('RGB', (maior_lado, maior_lado))
+        imagem = ImageOps.exif_transpose(original)
+    
+    # Gera das maiores para as menores, reaproveitando o último redimensionamento como fonte
+    redimensionadas = {}
+    fonte = imagem
+    for lado in sorted({config['lado'] for config in VARIANTES.values()}, reverse=True):
+        if max(fonte.size) > lado:
+            fonte = fonte.copy()
+            fonte.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+        redimensionadas[lado] = fonte
+    
+    arquivos = {}
+    for nome, config in VARIANTES.items():
+        formato = FORMATOS_PIL[config['formato'] or ext.lower()]
+        variante = redimensionadas[config['lado']]
+        # Imagem original já menor que a variante e no mesmo formato: grava os bytes originais
+        if variante is imagem and imagem.size == tamanho_original and formato == FORMATOS_PIL[ext.lower()]:
+            arquivos[nome] = (conteudo, Image.MIME[formato])
+            continue
+        
+        if formato == 'JPEG' and variante.mode not in ('RGB', 'L'):
+            variante = variante.convert('RGB')
+        
+        buffer = io.BytesIO()
+        variante.save(buffer, format=formato, **OPCOES_SALVAR[formato])
+        arquivos[nome] = (buffer.getvalue(), Image.MIME[formato])
+    
+    return arquivos
+
+class ImagemVariantesService:
+    """
+    Gera as variantes redimensionadas das imagens de produto em um pool de threads,
+    fora do ciclo da requisição. O Pillow libera o GIL ao decodificar, redimensionar
+    e codificar, então as threads aproveitam vários núcleos.
+    """
+    def __init__(self, s3_service):
+        self.s3_service = s3_service
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('IMAGEM_VARIANTES_WORKERS', os.cpu_count() or 1)),
+            thread_name_prefix='imagem-variantes'
+        )
+    
+    def suporta(self, chave):
+        return bool(chave) and bool(CHAVE_IMAGEM_REGEX.match(chave))
+    
+    def agendar(self, produto_id, chave):
+        """
+        Agenda a geração das variantes da imagem de um produto já gravado no banco
+        :param produto_id: ID do produto
+        :param chave: Chave da imagem original no bucket
+        :return: Future da geração, ou None se a chave não for de uma imagem gerada pela API
+        """
+        if not self.suporta(chave):
+            return None
+        app = current_app._get_current_object()
+        return self.executor.submit(self._processar, app, produto_id, chave)
+    
+    def gerar_e_enviar(self, chave):
+        """
+        Baixa a original, gera as variantes e envia cada uma ao S3
+        :param chave: Chave da imagem original no bucket
+        :return: Dicionário {variante: chave da variante}
+        """
+        objeto = self.s3_service.abrir_imagem(chave)
+        try:
+            conteudo = objeto['Body'].read()
+        finally:
+            objeto['Body'].close()
+        
+        variantes = {}
+        for nome, (dados, content_type) in gerar_variantes(conteudo, chave.rsplit('.', 1)[1]).items():
+            variantes[nome] = chave_variante(chave, nome)
+            self.s3_service.upload_variante(variantes[nome], dados, content_type)
+        return variantes
+    
+    def _processar(self, app, produto_id, chave):
+        try:
+            variantes = self.gerar_e_enviar(chave)
+            with app.app_context():
+                try:
+                    repository = ProdutoRepository()
+                    produto = repository.get_by_id(produto_id)
+                    if produto and produto.imagem_url == chave:
+                        repository.update(produto, imagem_variantes=variantes)
+                        return variantes
+                finally:
+                    db.session.remove()
+            
+            # A imagem foi trocada (ou o produto removido) enquanto as variantes eram geradas
+            for variante in variantes.values():
+                self.s3_service.deletar_imagem(variante)
+        except Exception as e:
+            print(f"Erro ao gerar variantes da imagem {chave}: {str(e)}")
+        return None
\ No newline at end of file
@@ -0,0 +1,203 @@
+import csv
+import io
+import json
+import math
+import os
+from typing import Dict, Optional
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.produto import Produto
+from app.repositories.produto_repository import ProdutoRepository
+from app.services.catalogo_cache_service import catalogo_cache
+
+FORMATOS_IMPORTACAO = ('csv', 'jsonl')
+EXTENSOES_IMPORTACAO = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+CONTENT_TYPES_IMPORTACAO = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'application/x-jsonlines': 'jsonl',
+}
+TAMANHO_MAX_NOME = Produto.__table__.c.nome.type.length
+
+class _LeitorBinario(io.RawIOBase):
+    """
+    Adapta ao TextIOWrapper streams que só oferecem read(), como o corpo da requisição no gunicorn
+    (sem Content-Length o werkzeug repassa o wsgi.input dele direto, que não é um io.IOBase)
+    """
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        dados = self.stream.read(len(buffer))
+        buffer[:len(dados)] = dados
+        return len(dados)
+
+def detectar_formato(nome_arquivo: Optional[str] = None, content_type: Optional[str] = None) -> Optional[str]:
+    """Formato da importação pela extensão do arquivo ou, na falta dela, pelo Content-Type"""
+    extensao = os.path.splitext(nome_arquivo or '')[1].lower()
+    return EXTENSOES_IMPORTACAO.get(extensao) or CONTENT_TYPES_IMPORTACAO.get(content_type)
+
+class ImportacaoProdutosService:
+    """
+    Importação de produtos em lote a partir de CSV (com cabeçalho) ou JSON Lines. O arquivo é lido
+    linha a linha e as linhas válidas são inseridas em lotes de IMPORTACAO_LOTE (um comando e um commit
+    por lote), então a memória usada depende do tamanho do lote e não do arquivo. Linhas inválidas não
+    interrompem a importação: são relatadas com o número da linha e o motivo.
+    """
+    def __init__(self, autocomplete_service=None):
+        self.produto_repository = ProdutoRepository()
+        self.autocomplete_service = autocomplete_service
+        self.tamanho_lote = int(os.getenv('IMPORTACAO_LOTE', 5000))
+        self.tamanho_lote_max = int(os.getenv('IMPORTACAO_LOTE_MAX', 50000))
+        self.max_erros = int(os.getenv('IMPORTACAO_MAX_ERROS', 1000))
+    
+    def importar(self, arquivo, formato: str, tamanho_lote: Optional[int] = None) -> Dict:
+        """
+        :param arquivo: Arquivo binário (upload, request.stream ou arquivo local), lido sob demanda
+        :param formato: 'csv' ou 'jsonl'
+        :param tamanho_lote: Linhas por comando/commit (padrão IMPORTACAO_LOTE, limitado a IMPORTACAO_LOTE_MAX)
+        :return: {'importados', 'total_erros', 'erros'}, com no máximo IMPORTACAO_MAX_ERROS erros listados
+        :raises ValueError: Formato ou lote inválido, cabeçalho sem as colunas obrigatórias ou arquivo ilegível
+        """
+        if formato not in FORMATOS_IMPORTACAO:
+            raise ValueError(f"Formato de importação não suportado. Use: {', '.join(FORMATOS_IMPORTACAO)}")
+        tamanho_lote = tamanho_lote if tamanho_lote is not None else self.tamanho_lote
+        if tamanho_lote < 1:
+            raise ValueError("O tamanho do lote deve ser maior que zero")
+        # O lote pode vir do cliente (?lote=): sem teto, uma requisição anularia o limite de memória
+        tamanho_lote = min(tamanho_lote, self.tamanho_lote_max)
+        
+        resultado = {'importados': 0, 'total_erros': 0, 'erros': []}
+        lote = []
+        if not isinstance(arquivo, io.IOBase):
+            arquivo = io.BufferedReader(_LeitorBinario(arquivo))
+        texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+        try:
+            for numero, registro in self._ler(texto, formato):
+                try:
+                    lote.append((numero, self._validar(registro)))
+                except ValueError as e:
+                    self._registrar_erro(resultado, numero, str(e))
+                    continue
+                
+                if len(lote) >= tamanho_lote:
+                    self._gravar(lote, resultado)
+                    lote = []
+            self._gravar(lote, resultado)
+        except (UnicodeDecodeError, csv.Error) as e:
+            db.session.rollback()
+            raise ValueError(f"Arquivo ilegível após {resultado['importados']} produtos importados: {str(e)}")
+        finally:
+            # Devolve o arquivo a quem o abriu: fechar o TextIOWrapper fecharia o stream também
+            texto.detach()
+            # Inserções em lote não passam pelos eventos do ORM: só as últimas páginas da listagem mudam
+            if resultado['importados']:
+                catalogo_cache.nova_versao()
+                self._reindexar_autocomplete(resultado['importados'])
+        
+        return resultado
+    
+    def _reindexar_autocomplete(self, importados: int):
+        """
+        Leva os produtos importados ao índice de autocomplete deste processo, se ele já estiver carregado:
+        até AUTOCOMPLETE_MAX_INCREMENTAL produtos pela atualização incremental (que relê os alterados
+        desde o último updated_at visto), acima disso reconstruindo o índice de uma vez. Os demais
+        workers os recebem na próxima atualização periódica.
+        """
+        if self.autocomplete_service is None or not self.autocomplete_service.carregado:
+            return
+        try:
+            if importados > self.autocomplete_service.max_incremental:
+                self.autocomplete_service.carregar()
+            else:
+                self.autocomplete_service.atualizar()
+        except Exception as e:
+            print(f"Erro ao atualizar o índice de autocomplete após a importação: {str(e)}")
+    
+    def _ler(self, texto, formato):
+        """Gera (número da linha, registro) um de cada vez"""
+        if formato == 'csv':
+            leitor = csv.DictReader(texto)
+            faltando = [coluna for coluna in ('nome', 'preco') if coluna not in (leitor.fieldnames or [])]
+            if faltando:
+                raise ValueError(f"Cabeçalho do CSV sem as colunas obrigatórias: {', '.join(faltando)}")
+            for registro in leitor:
+                yield leitor.line_num, registro
+            return
+        
+        for numero, linha in enumerate(texto, start=1):
+            if not linha.strip():
+                continue
+            try:
+                yield numero, json.loads(linha)
+            except ValueError:
+                yield numero, None
+    
+    def _validar(self, registro) -> Dict:
+        """
+        :return: Colunas do produto prontas para o INSERT
+        :raises ValueError: Com o motivo pelo qual a linha foi recusada
+        """
+        if not isinstance(registro, dict):
+            raise ValueError("Linha não é um objeto JSON válido")
+        
+        nome = str(registro.get('nome') or '').strip()
+        if not nome:
+            raise ValueError("Nome é obrigatório")
+        if len(nome) > TAMANHO_MAX_NOME:
+            raise ValueError(f"Nome deve ter no máximo {TAMANHO_MAX_NOME} caracteres")
+        
+        try:
+            preco = float(registro.get('preco'))
+        except (TypeError, ValueError):
+            raise ValueError("Preço é obrigatório e deve ser numérico")
+        if not math.isfinite(preco) or preco < 0:
+            raise ValueError("Preço deve ser um número não negativo")
+        
+        quantidade_estoque = registro.get('quantidade_estoque')
+        try:
+            quantidade_estoque = int(quantidade_estoque) if quantidade_estoque not in (None, '') else 0
+        except (TypeError, ValueError):
+            raise ValueError("Quantidade em estoque deve ser um número inteiro")
+        if quantidade_estoque < 0:
+            raise ValueError("Quantidade em estoque não pode ser negativa")
+        
+        descricao = registro.get('descricao')
+        return {
+            'nome': nome,
+            'descricao': str(descricao) if descricao not in (None, '') else None,
+            'preco': preco,
+            'quantidade_estoque': quantidade_estoque
+        }
+    
+    def _gravar(self, lote, resultado):
+        if not lote:
+            return
+        
+        erros_banco = (SQLAlchemyError, db.engine.dialect.dbapi.Error)
+        try:
+            self.produto_repository.inserir_em_lote([linha for _, linha in lote])
+            db.session.commit()
+            resultado['importados'] += len(lote)
+            return
+        except erros_banco:
+            db.session.rollback()
+        
+        # O banco recusou o lote: insere linha a linha para gravar as demais e relatar a que falhou
+        for numero, linha in lote:
+            try:
+                self.produto_repository.inserir_em_lote([linha])
+                db.session.commit()
+                resultado['importados'] += 1
+            except erros_banco as e:
+                db.session.rollback()
+                self._registrar_erro(resultado, numero, str(getattr(e, 'orig', e)).strip().split('\n')[0])
+    
+    def _registrar_erro(self, resultado, numero, mensagem):
+        resultado['total_erros'] += 1
+        if len(resultado['erros']) < self.max_erros:
+            resultado['erros'].append({'linha': numero, 'erro': mensagem})
\ No newline at end of file
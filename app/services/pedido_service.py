@@ -1,7 +1,7 @@
-from app.repositories.pedido_repository import PedidoRepository
+from app.repositories.pedido_repository import PedidoRepository, INCLUDE_PADRAO
 from app.repositories.cliente_repository import ClienteRepository
 from app.repositories.produto_repository import ProdutoRepository
-from typing import List, Dict
+from typing import List, Dict, Optional, Iterable
 
 class PedidoService:
     def __init__(self):
@@ -14,32 +14,37 @@ class PedidoService:
             raise ValueError("Cliente não encontrado")
         
         for item in itens:
-            if not self.produto_repository.verificar_estoque(item['produto_id'], item['quantidade']):
-                raise ValueError(f"Produto {item['produto_id']} não disponível em estoque")
+            quantidade = item.get('quantidade')
+            # bool é subclasse de int: true/false do JSON não são quantidades
+            if not isinstance(quantidade, int) or isinstance(quantidade, bool) or quantidade < 1:
+                raise ValueError(f"Quantidade inválida para o produto {item.get('produto_id')}")
         
         pedido = self.pedido_repository.criar_pedido_com_itens(cliente_id, itens)
         return pedido.to_dict()
     
-    def listar_pedidos(self) -> List[Dict]:
-        pedidos = self.pedido_repository.get_all()
-        return [pedido.to_dict() for pedido in pedidos]
+    def listar_pedidos(self, cursor: Optional[str] = None, limit: Optional[int] = None, include: Iterable[str] = INCLUDE_PADRAO) -> Dict:
+        pedidos, next_cursor = self.pedido_repository.paginate(cursor=cursor, limit=limit, include=include)
+        return {
+            'itens': [pedido.to_dict(include) for pedido in pedidos],
+            'next_cursor': next_cursor
+        }
     
-    def obter_pedido(self, id: int) -> Dict:
-        pedido = self.pedido_repository.get_by_id(id)
+    def obter_pedido(self, id: int, include: Iterable[str] = INCLUDE_PADRAO) -> Dict:
+        pedido = self.pedido_repository.get_by_id(id, include=include)
         if not pedido:
             raise ValueError("Pedido não encontrado")
-        return pedido.to_dict()
+        return pedido.to_dict(include)
     
-    def buscar_por_cliente(self, cliente_id: int) -> List[Dict]:
+    def buscar_por_cliente(self, cliente_id: int, include: Iterable[str] = INCLUDE_PADRAO) -> List[Dict]:
         if not self.cliente_repository.get_by_id(cliente_id):
             raise ValueError("Cliente não encontrado")
         
-        pedidos = self.pedido_repository.buscar_por_cliente(cliente_id)
-        return [pedido.to_dict() for pedido in pedidos]
+        pedidos = self.pedido_repository.buscar_por_cliente(cliente_id, include=include)
+        return [pedido.to_dict(include) for pedido in pedidos]
     
-    def contar_pedidos(self) -> Dict:
-        total = self.pedido_repository.contar_total()
-        return {'total': total}
+    def contar_pedidos(self, modo: Optional[str] = None) -> Dict:
+        total, modo = self.pedido_repository.contar(modo)
+        return {'total': total, 'modo': modo}
     
     def atualizar_status(self, id: int, status: str) -> Dict:
         pedido = self.pedido_repository.get_by_id(id)
@@ -1,11 +1,28 @@
 from app.repositories.produto_repository import ProdutoRepository
 from app.services.s3_service import S3Service
-from typing import List, Dict, Optional
+from app.services.imagem_variantes_service import ImagemVariantesService
+from app.services.exclusao_s3_service import ExclusaoS3Service
+from app.services.imagem_cache_service import ImagemCacheService
+from app.services.autocomplete_service import AutocompleteService
+from app.services.catalogo_cache_service import catalogo_cache
+from typing import Dict, Optional
 
 class ProdutoService:
     def __init__(self):
         self.produto_repository = ProdutoRepository()
         self.s3_service = S3Service()
+        self.imagem_variantes_service = ImagemVariantesService(self.s3_service)
+        self.imagem_cache_service = ImagemCacheService(self.s3_service)
+        self.exclusao_s3_service = ExclusaoS3Service(self.s3_service, self.imagem_cache_service)
+        self.autocomplete_service = AutocompleteService()
+        self.catalogo_cache = catalogo_cache
+    
+    def _enfileirar_exclusao_imagens(self, produto):
+        """
+        Coloca a imagem original do produto e as suas variantes na fila de exclusão do S3.
+        A fila é gravada no mesmo commit da alteração do produto; a exclusão em si acontece depois, em segundo plano.
+        """
+        self.exclusao_s3_service.enfileirar([produto.imagem_url] + list((produto.imagem_variantes or {}).values()))
     
     def criar_produto(self, nome: str, descricao: str, preco: float, quantidade_estoque: int = 0, imagem_url: Optional[str] = None) -> Dict:
         produto = self.produto_repository.create(
@@ -15,25 +32,53 @@ class ProdutoService:
             quantidade_estoque=quantidade_estoque,
             imagem_url=imagem_url
         )
+        self.autocomplete_service.indexar(produto.id, produto.nome)
+        if imagem_url:
+            self.imagem_variantes_service.agendar(produto.id, imagem_url)
         return produto.to_dict()
     
-    def listar_produtos(self) -> List[Dict]:
-        produtos = self.produto_repository.get_all()
-        return [produto.to_dict() for produto in produtos]
+    def listar_produtos(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        return self.catalogo_cache.listar_produtos(cursor=cursor, limit=limit)
     
-    def obter_produto(self, id: int) -> Dict:
-        produto = self.produto_repository.get_by_id(id)
+    def obter_produto(self, id: int, versao: Optional[str] = None) -> Dict:
+        """
+        :param versao: Versão lida do banco com obter_versao_produto; se a entrada do cache for de outra
+                       versão (alteração feita por outro worker), ela é descartada e o produto é relido
+        """
+        produto = self.catalogo_cache.obter_produto(id)
+        if produto and versao is not None and (produto['updated_at'] or '') != versao:
+            self.catalogo_cache.invalidar_produtos([id])
+            produto = self.catalogo_cache.obter_produto(id)
         if not produto:
             raise ValueError("Produto não encontrado")
-        return produto.to_dict()
+        return produto
+    
+    def obter_versao_produto(self, id: int) -> str:
+        """
+        Versão atual do produto (updated_at), lida do banco e não do cache, usada na ETag
+        :raises ValueError: Se o produto não existir
+        """
+        linha = self.produto_repository.obter_data_atualizacao(id)
+        if not linha:
+            raise ValueError("Produto não encontrado")
+        return linha.updated_at.isoformat() if linha.updated_at else ''
+    
+    def estatisticas_cache(self) -> Dict:
+        return self.catalogo_cache.estatisticas()
+    
+    def buscar_por_nome(self, nome: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        produtos, next_cursor = self.produto_repository.buscar_por_nome(nome, cursor=cursor, limit=limit)
+        return {
+            'itens': [produto.to_dict() for produto in produtos],
+            'next_cursor': next_cursor
+        }
     
-    def buscar_por_nome(self, nome: str) -> List[Dict]:
-        produtos = self.produto_repository.buscar_por_nome(nome)
-        return [produto.to_dict() for produto in produtos]
+    def autocomplete(self, q: str, limit: Optional[int] = None) -> Dict:
+        return {'itens': self.autocomplete_service.buscar(q, limit=limit)}
     
-    def contar_produtos(self) -> Dict:
-        total = self.produto_repository.contar_total()
-        return {'total': total}
+    def contar_produtos(self, modo: Optional[str] = None) -> Dict:
+        total, modo = self.produto_repository.contar(modo)
+        return {'total': total, 'modo': modo}
     
     def atualizar_produto(self, id: int, **kwargs) -> Dict:
         produto = self.produto_repository.get_by_id(id)
@@ -43,13 +88,21 @@ class ProdutoService:
         if 'quantidade_estoque' in kwargs and kwargs['quantidade_estoque'] < 0:
             raise ValueError("Quantidade em estoque não pode ser negativa")
         
-        if 'imagem_url' in kwargs and produto.imagem_url:
-            try:
-                self.s3_service.delete_file(produto.imagem_url)
-            except ValueError:
-                pass
+        nova_imagem = 'imagem_url' in kwargs and kwargs['imagem_url'] != produto.imagem_url
+        imagem_antiga = nova_imagem and bool(produto.imagem_url)
+        if imagem_antiga:
+            self._enfileirar_exclusao_imagens(produto)
+        if nova_imagem:
+            # As variantes da nova imagem são gravadas pelo pipeline em segundo plano
+            kwargs['imagem_variantes'] = None
         
         produto = self.produto_repository.update(produto, **kwargs)
+        if 'nome' in kwargs:
+            self.autocomplete_service.indexar(produto.id, produto.nome)
+        if imagem_antiga:
+            self.exclusao_s3_service.notificar()
+        if nova_imagem and produto.imagem_url:
+            self.imagem_variantes_service.agendar(produto.id, produto.imagem_url)
         return produto.to_dict()
     
     def deletar_produto(self, id: int) -> Dict:
@@ -57,13 +110,14 @@ class ProdutoService:
         if not produto:
             raise ValueError("Produto não encontrado")
         
-        if produto.imagem_url:
-            try:
-                self.s3_service.delete_file(produto.imagem_url)
-            except ValueError:
-                pass
+        possui_imagem = bool(produto.imagem_url)
+        if possui_imagem:
+            self._enfileirar_exclusao_imagens(produto)
         
         self.produto_repository.delete(produto)
+        self.autocomplete_service.remover(id)
+        if possui_imagem:
+            self.exclusao_s3_service.notificar()
         return {'message': 'Produto deletado com sucesso'}
     
     def verificar_estoque(self, produto_id: int, quantidade: int) -> bool:
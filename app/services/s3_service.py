@@ -1,10 +1,17 @@
 import os
+import re
 import uuid
+import time
+import threading
+from collections import OrderedDict
 from werkzeug.utils import secure_filename
-import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
+from app.config.s3 import get_s3_client, get_transfer_config
 from datetime import datetime
 
+EXTENSOES_PERMITIDAS = ['jpg', 'jpeg', 'png']
+CHAVE_IMAGEM_REGEX = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.(jpg|jpeg|png)$')
+
 class S3Service:
     def __init__(self):
         required_env_vars = {
@@ -18,15 +25,20 @@ class S3Service:
         if missing_vars:
             raise ValueError(f"Variáveis de ambiente do S3 não configuradas: {', '.join(missing_vars)}")
 
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=required_env_vars['AWS_ACCESS_KEY_ID'],
-            aws_secret_access_key=required_env_vars['AWS_SECRET_ACCESS_KEY'],
-            region_name=required_env_vars['AWS_REGION'],
-            endpoint_url=os.getenv('S3_ENDPOINT_URL')
-        )
+        # Cliente compartilhado pelo processo, com pool de conexões e retentativas configuráveis
+        self.s3_client = get_s3_client(os.getenv('S3_ENDPOINT_URL'))
+        self.transfer_config = get_transfer_config()
         self.bucket_name = required_env_vars['AWS_S3_BUCKET']
         self.MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB em bytes
+        
+        # URLs pré-assinadas precisam ser geradas com o endpoint que o navegador acessa
+        public_endpoint_url = os.getenv('S3_PUBLIC_ENDPOINT_URL')
+        self.presign_client = get_s3_client(public_endpoint_url) if public_endpoint_url else self.s3_client
+        self.presigned_url_expires = int(os.getenv('S3_PRESIGNED_URL_EXPIRES', 3600))
+        self.presigned_url_margem = min(int(os.getenv('S3_PRESIGNED_URL_MARGEM', 300)), self.presigned_url_expires // 2)
+        self.presigned_url_max_itens = int(os.getenv('S3_PRESIGNED_URL_CACHE_ITENS', 10000))
+        self._presigned_urls = OrderedDict()
+        self._presigned_lock = threading.Lock()
     
     def _gerar_nome_arquivo(self, filename):
         """Gera um nome único para o arquivo"""
@@ -50,7 +62,7 @@ class S3Service:
             raise ValueError(f"Arquivo muito grande. Tamanho máximo permitido é {self.MAX_FILE_SIZE / (1024 * 1024)}MB")
         
         ext = filename.rsplit('.', 1)[1].lower()
-        if ext not in ['jpg', 'jpeg', 'png']:
+        if ext not in EXTENSOES_PERMITIDAS:
             raise ValueError("Formato de arquivo não permitido. Use apenas JPG, JPEG ou PNG")
         
         return filename
@@ -72,29 +84,34 @@ class S3Service:
                 file,
                 self.bucket_name,
                 s3_key,
-                ExtraArgs={'ContentType': file.content_type}
+                ExtraArgs={'ContentType': file.content_type},
+                Config=self.transfer_config
             )
 
             url = f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
             return url
 
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             print(f"Erro ao fazer upload para o S3: {e}")
             raise
 
+    def extrair_chave(self, url):
+        """Aceita tanto a URL completa quanto a chave gravada por upload_imagem"""
+        return url.split(f"{self.bucket_name}.s3.amazonaws.com/")[-1]
+    
     def delete_file(self, url):
         """
         Deleta um arquivo do S3
         :param url: URL do arquivo no S3
         """
         try:
-            key = url.split(f"{self.bucket_name}.s3.amazonaws.com/")[1]
+            key = self.extrair_chave(url)
             
             self.s3_client.delete_object(
                 Bucket=self.bucket_name,
                 Key=key
             )
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             print(f"Erro ao deletar arquivo do S3: {e}")
             raise
     
@@ -108,47 +125,158 @@ class S3Service:
                 file,
                 self.bucket_name,
                 s3_filename,
-                ExtraArgs={'ContentType': f'image/{filename.rsplit(".", 1)[1].lower()}'}
+                ExtraArgs={'ContentType': f'image/{filename.rsplit(".", 1)[1].lower()}'},
+                Config=self.transfer_config
             )
             
             return s3_filename
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             raise ValueError(f"Erro ao fazer upload da imagem: {str(e)}")
     
+    def upload_variante(self, key, conteudo, content_type):
+        """
+        Grava no S3 uma variante redimensionada de imagem
+        :param key: Chave da variante no bucket
+        :param conteudo: Bytes da imagem
+        :param content_type: Content-Type da variante
+        """
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=conteudo,
+                ContentType=content_type
+            )
+        except (ClientError, BotoCoreError) as e:
+            raise ValueError(f"Erro ao fazer upload da variante da imagem: {str(e)}")
+    
+    def gerar_upload_imagem(self, filename):
+        """
+        Gera uma política de POST pré-assinado para o navegador enviar a imagem direto ao S3
+        :param filename: Nome original do arquivo (usado só para validar a extensão)
+        :return: URL, campos do formulário e a chave onde a imagem será gravada
+        """
+        filename = secure_filename(filename or '')
+        ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+        if ext not in EXTENSOES_PERMITIDAS:
+            raise ValueError("Formato de arquivo não permitido. Use apenas JPG, JPEG ou PNG")
+        
+        key = self._gerar_nome_arquivo(filename)
+        content_type = f'image/{ext}'
+        try:
+            post = self.presign_client.generate_presigned_post(
+                Bucket=self.bucket_name,
+                Key=key,
+                Fields={'Content-Type': content_type},
+                Conditions=[
+                    {'Content-Type': content_type},
+                    ['content-length-range', 1, self.MAX_FILE_SIZE]
+                ],
+                ExpiresIn=self.presigned_url_expires
+            )
+        except (ClientError, BotoCoreError) as e:
+            raise ValueError(f"Erro ao gerar upload da imagem: {str(e)}")
+        
+        return {
+            'url': post['url'],
+            'fields': post['fields'],
+            'key': key
+        }
+    
+    def confirmar_upload_imagem(self, key):
+        """
+        Confere se a imagem enviada via POST pré-assinado existe e respeita as regras de upload
+        :param key: Chave devolvida por gerar_upload_imagem
+        """
+        if not key or not CHAVE_IMAGEM_REGEX.match(key):
+            raise ValueError("Chave de imagem inválida")
+        
+        try:
+            objeto = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError:
+            raise ValueError(f"Imagem não encontrada no S3: {key}")
+        except BotoCoreError as e:
+            raise ValueError(f"Erro ao consultar a imagem no S3: {str(e)}")
+        
+        if objeto['ContentLength'] > self.MAX_FILE_SIZE or not objeto.get('ContentType', '').startswith('image/'):
+            self.deletar_imagem(key)
+            raise ValueError("Imagem enviada não respeita o tamanho ou formato permitidos")
+    
     def get_url_imagem(self, filename):
-        """Retorna a URL pública da imagem"""
+        """
+        Retorna uma URL pré-assinada da imagem, reaproveitando a URL já gerada
+        até pouco antes (S3_PRESIGNED_URL_MARGEM segundos) de ela expirar
+        :param filename: Chave da imagem no bucket
+        :return: Tupla com a URL e os segundos de validade restantes
+        """
+        agora = time.monotonic()
+        with self._presigned_lock:
+            cache = self._presigned_urls.get(filename)
+            if cache and cache[1] - agora > self.presigned_url_margem:
+                self._presigned_urls.move_to_end(filename)
+                return cache[0], int(cache[1] - agora)
+        
         try:
-            url = self.s3_client.generate_presigned_url(
+            url = self.presign_client.generate_presigned_url(
                 'get_object',
                 Params={
                     'Bucket': self.bucket_name,
                     'Key': filename
                 },
-                ExpiresIn=3600
+                ExpiresIn=self.presigned_url_expires
             )
-            return url
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             raise ValueError(f"Erro ao gerar URL da imagem: {str(e)}")
         
-    def download_imagem(self, filename):
-        """Faz o download de uma imagem do S3"""
+        with self._presigned_lock:
+            self._presigned_urls[filename] = (url, agora + self.presigned_url_expires)
+            self._presigned_urls.move_to_end(filename)
+            while len(self._presigned_urls) > self.presigned_url_max_itens:
+                self._presigned_urls.popitem(last=False)
+        
+        return url, self.presigned_url_expires
+        
+    def abrir_imagem(self, filename, range_bytes=None, if_none_match=None, if_modified_since=None):
+        """
+        Abre a imagem no S3 para leitura em streaming, com uma única chamada get_object
+        :param filename: Chave da imagem no bucket
+        :param range_bytes: Valor do header HTTP Range (ex: 'bytes=0-1023'), opcional
+        :param if_none_match: ETag conhecida; o S3 responde 304 (ClientError) se não mudou
+        :param if_modified_since: Data conhecida; o S3 responde 304 (ClientError) se não mudou
+        :return: Resposta do get_object, com o Body ainda não lido
+        """
+        params = {
+            'Bucket': self.bucket_name,
+            'Key': filename
+        }
+        if range_bytes:
+            params['Range'] = range_bytes
+        if if_none_match:
+            params['IfNoneMatch'] = if_none_match
+        if if_modified_since:
+            params['IfModifiedSince'] = if_modified_since
+        
+        return self.s3_client.get_object(**params)
+
+    def deletar_imagens(self, chaves):
+        """
+        Deleta várias chaves com uma única chamada delete_objects (até 1000 por chamada)
+        :param chaves: Lista de chaves no bucket
+        :return: Dicionário {chave: mensagem de erro} com as chaves que não foram deletadas
+        """
         try:
-            temp_dir = 'temp'
-            if not os.path.exists(temp_dir):
-                os.makedirs(temp_dir)
-                
-            local_path = os.path.join(temp_dir, filename)
-            
-            self.s3_client.download_file(
+            resposta = self.s3_client.delete_objects(
                 Bucket=self.bucket_name,
-                Key=filename,
-                Filename=local_path
+                Delete={
+                    'Objects': [{'Key': chave} for chave in chaves],
+                    'Quiet': True
+                }
             )
-            
-            return local_path
-        except ClientError as e:
-            raise ValueError(f"Erro ao fazer download da imagem: {str(e)}")
-
+        except (ClientError, BotoCoreError) as e:
+            raise ValueError(f"Erro ao deletar imagens: {str(e)}")
+        
+        return {erro['Key']: f"{erro.get('Code')}: {erro.get('Message')}" for erro in resposta.get('Errors', [])}
+    
     def deletar_imagem(self, filename):
         """Deleta uma imagem do S3"""
         try:
@@ -156,5 +284,5 @@ class S3Service:
                 Bucket=self.bucket_name,
                 Key=filename
             )
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             raise ValueError(f"Erro ao deletar imagem: {str(e)}") 
\ No newline at end of file
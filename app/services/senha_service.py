@@ -0,0 +1,63 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app import db
+from app.config.senha import contexto_senha
+from app.repositories.usuario_repository import UsuarioRepository
+
+class SenhaService:
+    """
+    Executa o hash e a verificação de senhas em um pool limitado de threads. As
+    implementações do passlib (hashlib, argon2-cffi, bcrypt) liberam o GIL durante o
+    cálculo, então o pool limita quantos núcleos o login pode ocupar sem bloquear as
+    demais rotas, e a fila de espera é limitada para não acumular requisições.
+    """
+    def __init__(self):
+        self.usuario_repository = UsuarioRepository()
+        workers = int(os.getenv('SENHA_WORKERS', max((os.cpu_count() or 1) // 2, 1)))
+        self.timeout = float(os.getenv('SENHA_FILA_TIMEOUT', 5))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='senha')
+        self._vagas = threading.BoundedSemaphore(workers + int(os.getenv('SENHA_FILA_MAX', 64)))
+    
+    def _executar(self, funcao, *args, esperar=True):
+        if not self._vagas.acquire(timeout=self.timeout if esperar else 0):
+            raise TimeoutError("Servidor ocupado verificando senhas, tente novamente")
+        try:
+            futuro = self.executor.submit(funcao, *args)
+        except Exception:
+            self._vagas.release()
+            raise
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        return futuro
+    
+    def verificar(self, usuario, senha):
+        """
+        Verifica a senha do usuário no pool. Se o hash usar um esquema ou custo
+        diferente do configurado, agenda a troca do hash em segundo plano.
+        :param usuario: Usuario carregado do banco
+        :param senha: Senha em texto puro
+        :return: True se a senha confere
+        """
+        senha_hash = usuario.senha_hash
+        if not self._executar(contexto_senha.verify, senha, senha_hash).result():
+            return False
+        
+        if contexto_senha.needs_update(senha_hash):
+            try:
+                app = current_app._get_current_object()
+                self._executar(self._refazer_hash, app, usuario.id, senha, senha_hash, esperar=False)
+            except TimeoutError:
+                pass  # Pool cheio: o hash é refeito em um próximo login
+        return True
+    
+    def _refazer_hash(self, app, usuario_id, senha, senha_hash_antigo):
+        try:
+            novo_hash = contexto_senha.hash(senha)
+            with app.app_context():
+                try:
+                    self.usuario_repository.atualizar_senha_hash(usuario_id, senha_hash_antigo, novo_hash)
+                finally:
+                    db.session.remove()
+        except Exception as e:
+            print(f"Erro ao atualizar hash da senha do usuário {usuario_id}: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+Configuração do Gunicorn para produção.
+
+Cada worker importa a aplicação depois do fork (preload_app desligado), então os serviços
+criados no import dos controllers (auth_service, produto_service, s3_service, ...) e o pool de
+conexões do SQLAlchemy são próprios de cada processo. Dentro de um worker esses objetos são
+compartilhados entre threads: os serviços não guardam estado por requisição, a sessão do
+Flask-SQLAlchemy é por thread e o cliente boto3 é thread-safe.
+
+Conexões abertas por instância: workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+
+Os índices em memória (autocomplete) também são por worker: post_worker_init os monta logo depois
+que o worker importa a aplicação, antes de aceitar conexões, e não dentro da primeira requisição.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+preload_app = False
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+def post_worker_init(worker):
+    from app import db
+    from app.controllers.produto_controller import produto_service
+    
+    app = worker.wsgi
+    with app.app_context():
+        try:
+            produto_service.autocomplete_service.iniciar(app)
+        except Exception as e:
+            # O worker sobe assim mesmo: o índice é montado na primeira busca
+            worker.log.error(f"Erro ao carregar o índice de autocomplete: {str(e)}")
+        finally:
+            db.session.remove()
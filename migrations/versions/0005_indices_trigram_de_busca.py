@@ -0,0 +1,42 @@
+"""indices trigram de busca
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:02:17.318204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# Índices GIN do pg_trgm usados pelo ILIKE '%termo%' e pelo word_similarity da busca textual.
+# Só existem no PostgreSQL; o env.py os ignora no autogenerate, já que não estão nos modelos.
+INDICES_TRGM = [
+    ('ix_produtos_nome_trgm', 'produtos', 'nome'),
+    ('ix_produtos_descricao_trgm', 'produtos', 'descricao'),
+    ('ix_clientes_nome_trgm', 'clientes', 'nome'),
+    ('ix_clientes_email_trgm', 'clientes', 'email'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nome, tabela, coluna in INDICES_TRGM:
+        op.create_index(nome, tabela, [coluna], unique=False,
+                        postgresql_using='gin', postgresql_ops={coluna: 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for nome, tabela, _ in INDICES_TRGM:
+        op.drop_index(nome, table_name=tabela)
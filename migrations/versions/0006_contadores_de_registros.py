@@ -0,0 +1,124 @@
+"""contadores de registros
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:41:08.927154
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# Tabelas com total mantido por triggers na tabela contadores (lido pelos endpoints /contar).
+# No SQLite, migrations que recriam uma dessas tabelas (batch_alter_table) descartam os triggers
+# e precisam recriá-los.
+TABELAS_CONTADAS = ['produtos', 'clientes', 'pedidos']
+
+# No PostgreSQL os triggers são por comando (com as linhas afetadas em uma tabela de transição), então
+# uma importação em lote atualiza o contador uma vez só. Cada conexão soma na fatia do seu pid, o que
+# evita que inserções concorrentes esperem o lock da mesma linha até o commit.
+FATIAS_POSTGRESQL = 16
+
+FUNCOES_POSTGRESQL = {
+    'contador_insercao': f"""
+        INSERT INTO contadores (tabela, fatia, total)
+        SELECT TG_TABLE_NAME, pg_backend_pid() % {FATIAS_POSTGRESQL}, count(*) FROM linhas_inseridas
+        ON CONFLICT (tabela, fatia) DO UPDATE SET total = contadores.total + EXCLUDED.total;
+    """,
+    'contador_remocao': f"""
+        INSERT INTO contadores (tabela, fatia, total)
+        SELECT TG_TABLE_NAME, pg_backend_pid() % {FATIAS_POSTGRESQL}, -count(*) FROM linhas_removidas
+        ON CONFLICT (tabela, fatia) DO UPDATE SET total = contadores.total + EXCLUDED.total;
+    """,
+    'contador_truncate': """
+        DELETE FROM contadores WHERE tabela = TG_TABLE_NAME;
+        INSERT INTO contadores (tabela, fatia, total) VALUES (TG_TABLE_NAME, 0, 0);
+    """,
+}
+
+
+def criar_triggers_postgresql():
+    for funcao, corpo in FUNCOES_POSTGRESQL.items():
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {funcao}() RETURNS trigger AS $$
+            BEGIN
+                {corpo}
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+    for tabela in TABELAS_CONTADAS:
+        op.execute(f"""
+            CREATE TRIGGER {tabela}_contador_insercao AFTER INSERT ON {tabela}
+            REFERENCING NEW TABLE AS linhas_inseridas
+            FOR EACH STATEMENT EXECUTE PROCEDURE contador_insercao()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {tabela}_contador_remocao AFTER DELETE ON {tabela}
+            REFERENCING OLD TABLE AS linhas_removidas
+            FOR EACH STATEMENT EXECUTE PROCEDURE contador_remocao()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {tabela}_contador_truncate AFTER TRUNCATE ON {tabela}
+            FOR EACH STATEMENT EXECUTE PROCEDURE contador_truncate()
+        """)
+
+
+def criar_triggers_sqlite():
+    for tabela in TABELAS_CONTADAS:
+        for evento, delta in (('insercao', '+ 1'), ('remocao', '- 1')):
+            op.execute(f"""
+                CREATE TRIGGER {tabela}_contador_{evento} AFTER {'INSERT' if evento == 'insercao' else 'DELETE'} ON {tabela}
+                BEGIN
+                    UPDATE contadores SET total = total {delta} WHERE tabela = '{tabela}' AND fatia = 0;
+                END
+            """)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('contadores',
+    sa.Column('tabela', sa.String(length=50), nullable=False),
+    sa.Column('fatia', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('total', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('tabela', 'fatia')
+    )
+    # ### end Alembic commands ###
+
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'postgresql':
+        criar_triggers_postgresql()
+    elif dialeto == 'sqlite':
+        criar_triggers_sqlite()
+    else:
+        # Sem triggers e sem contadores, os endpoints /contar continuam usando COUNT(*)
+        return
+
+    # Os triggers já estão criados (no PostgreSQL, com lock nas tabelas até o commit): o total inicial
+    # contado aqui não perde inserções nem remoções concorrentes
+    for tabela in TABELAS_CONTADAS:
+        op.execute(f"INSERT INTO contadores (tabela, fatia, total) SELECT '{tabela}', 0, count(*) FROM {tabela}")
+
+
+def downgrade():
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'postgresql':
+        for tabela in TABELAS_CONTADAS:
+            for evento in ('insercao', 'remocao', 'truncate'):
+                op.execute(f"DROP TRIGGER IF EXISTS {tabela}_contador_{evento} ON {tabela}")
+        for funcao in FUNCOES_POSTGRESQL:
+            op.execute(f"DROP FUNCTION IF EXISTS {funcao}()")
+    elif dialeto == 'sqlite':
+        for tabela in TABELAS_CONTADAS:
+            for evento in ('insercao', 'remocao'):
+                op.execute(f"DROP TRIGGER IF EXISTS {tabela}_contador_{evento}")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('contadores')
+    # ### end Alembic commands ###
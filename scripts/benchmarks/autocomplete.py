@@ -0,0 +1,62 @@
+"""
+Benchmark do índice de autocomplete de produtos.
+
+Monta o índice em memória com BENCH_PRODUTOS nomes sintéticos (categoria, uma de BENCH_MARCAS
+marcas, modelo e código), sem banco, e mede a latência de BENCH_CONSULTAS buscas por prefixo,
+simulando as teclas digitadas em nomes existentes, além da memória ocupada pelo índice.
+
+Uso (a partir da raiz do projeto):
+    BENCH_PRODUTOS=1000000 python scripts/benchmarks/autocomplete.py
+"""
+import os
+import sys
+import time
+import random
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.services.autocomplete_service import AutocompleteService
+
+PRODUTOS = int(os.getenv('BENCH_PRODUTOS', 1000000))
+CONSULTAS = int(os.getenv('BENCH_CONSULTAS', 20000))
+MARCAS = int(os.getenv('BENCH_MARCAS', 500))
+PALAVRAS = ['cadeira', 'mesa', 'notebook', 'monitor', 'teclado', 'mouse', 'headset', 'webcam',
+            'impressora', 'roteador', 'cabo', 'carregador', 'luminária', 'estante', 'gaveteiro']
+MODELOS = ['gamer', 'escritório', 'pro', 'ultra', 'slim', 'max', 'mini', 'plus', 'sem fio', 'usb-c']
+
+SILABAS = ['ka', 'lo', 'mi', 'tex', 'ron', 'vi', 'sa', 'zen', 'pha', 'dor', 'bel', 'qu', 'tri', 'nox', 'al']
+
+random.seed(42)
+marcas = list({''.join(random.choices(SILABAS, k=random.randint(2, 3))) for _ in range(MARCAS * 2)})[:MARCAS]
+nomes = [
+    f'{random.choice(PALAVRAS)} {random.choice(marcas)} {random.choice(MODELOS)} {random.randrange(16 ** 6):06x}'
+    for _ in range(PRODUTOS)
+]
+
+autocomplete_service = AutocompleteService()
+tracemalloc.start()
+inicio = time.perf_counter()
+autocomplete_service.carregar((id, nome, None) for id, nome in enumerate(nomes, start=1))
+duracao = time.perf_counter() - inicio
+memoria = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+
+print(f"Índice com {PRODUTOS} produtos montado em {duracao:.1f}s ({memoria / 1024 / 1024:.0f}MB)")
+
+# Cada consulta é um prefixo de um nome existente, com 1 a 3 palavras e a última incompleta
+consultas = []
+for _ in range(CONSULTAS):
+    palavras = random.choice(nomes).split()[:random.randint(1, 3)]
+    palavras[-1] = palavras[-1][:random.randint(1, len(palavras[-1]))]
+    consultas.append(' '.join(palavras))
+
+amostras = []
+for consulta in consultas:
+    inicio = time.perf_counter_ns()
+    autocomplete_service.buscar(consulta)
+    amostras.append((time.perf_counter_ns() - inicio) / 1000)
+
+percentis = statistics.quantiles(amostras, n=100)
+print(f"{CONSULTAS} consultas: p50={percentis[49]:.0f}µs p95={percentis[94]:.0f}µs p99={percentis[98]:.0f}µs")
@@ -0,0 +1,99 @@
+"""
+Benchmark da busca textual de produtos.
+
+Popula a tabela de produtos até BENCH_PRODUTOS linhas (reaproveitando as de execuções
+anteriores) e mede o p50/p95 de GET /produtos/nome/{nome} em dois cenários:
+    antes:  ILIKE '%termo%' em nome/descricao sem índices trigram, trazendo todas as linhas
+    depois: índices GIN do pg_trgm + ordenação por relevância com limit (buscar_por_nome)
+
+Uso (a partir da raiz do projeto, com DATABASE_URL apontando para o PostgreSQL e as migrations aplicadas):
+    BENCH_PRODUTOS=1000000 python scripts/benchmarks/busca_produtos.py
+"""
+import os
+import sys
+import time
+import random
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from sqlalchemy import or_, text
+from app import create_app, db
+from app.models.produto import Produto
+from app.repositories.produto_repository import ProdutoRepository
+
+PRODUTOS = int(os.getenv('BENCH_PRODUTOS', 1000000))
+CONSULTAS = int(os.getenv('BENCH_CONSULTAS', 200))
+MARCADOR = 'benchmark-busca'
+PALAVRAS = ['cadeira', 'mesa', 'notebook', 'monitor', 'teclado', 'mouse', 'headset', 'webcam',
+            'impressora', 'roteador', 'cabo', 'carregador', 'luminaria', 'estante', 'gaveteiro']
+INDICES = {
+    'ix_produtos_nome_trgm': 'nome',
+    'ix_produtos_descricao_trgm': 'descricao',
+}
+
+def p95(amostras):
+    return statistics.quantiles(amostras, n=20)[-1]
+
+def medir(nome, buscar, termos):
+    amostras, linhas = [], 0
+    for termo in termos:
+        inicio = time.perf_counter()
+        linhas += len(buscar(termo))
+        amostras.append((time.perf_counter() - inicio) * 1000)
+    print(f"{nome:<8} p50={statistics.median(amostras):8.2f}ms p95={p95(amostras):8.2f}ms "
+          f"({linhas / len(termos):.0f} linhas/consulta)")
+    return p95(amostras)
+
+def busca_antiga(termo):
+    return Produto.query.filter(or_(Produto.nome.ilike(f'%{termo}%'), Produto.descricao.ilike(f'%{termo}%'))).all()
+
+def busca_indexada(termo):
+    itens, _ = repository.buscar_por_nome(termo, limit=20)
+    return itens
+
+app = create_app()
+repository = ProdutoRepository()
+
+with app.app_context():
+    if db.engine.dialect.name != 'postgresql':
+        print("❌ Este benchmark usa pg_trgm e precisa de DATABASE_URL apontando para o PostgreSQL")
+        exit(1)
+
+    existentes = db.session.execute(
+        text("SELECT count(*) FROM produtos WHERE descricao LIKE :marcador"), {'marcador': f'{MARCADOR}%'}
+    ).scalar()
+    if existentes < PRODUTOS:
+        print(f"Inserindo {PRODUTOS - existentes} produtos...")
+        db.session.execute(text("""
+            INSERT INTO produtos (nome, descricao, preco, quantidade_estoque, created_at, updated_at)
+            SELECT (:palavras)[1 + i % cardinality(:palavras)] || ' ' || substr(md5(i::text), 1, 8),
+                   :marcador || ' ' || md5((i * 7)::text),
+                   10 + i % 1000, 100, now(), now()
+            FROM generate_series(:inicio, :fim) AS i
+        """), {'palavras': PALAVRAS, 'marcador': MARCADOR, 'inicio': existentes + 1, 'fim': PRODUTOS})
+        db.session.commit()
+
+    # Termos seletivos (trecho de um hash) e amplos (palavra comum a 1/15 das linhas)
+    amostra = [nome for (nome,) in db.session.execute(
+        text("SELECT nome FROM produtos WHERE descricao LIKE :marcador ORDER BY random() LIMIT :n"),
+        {'marcador': f'{MARCADOR}%', 'n': CONSULTAS}
+    )]
+    termos = [nome.split()[1][:6] if i % 4 else nome.split()[0] for i, nome in enumerate(amostra)]
+    random.shuffle(termos)
+
+    for indice in INDICES:
+        db.session.execute(text(f"DROP INDEX IF EXISTS {indice}"))
+    db.session.execute(text("ANALYZE produtos"))
+    db.session.commit()
+    p95_antes = medir('antes', busca_antiga, termos)
+
+    print("Recriando os índices trigram...")
+    db.session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for indice, coluna in INDICES.items():
+        db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {indice} ON produtos USING gin ({coluna} gin_trgm_ops)"))
+    db.session.execute(text("ANALYZE produtos"))
+    db.session.commit()
+    p95_depois = medir('depois', busca_indexada, termos)
+
+    print(f"Redução do p95: {p95_antes / p95_depois:.1f}x")
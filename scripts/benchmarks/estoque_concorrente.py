@@ -0,0 +1,87 @@
+"""
+Benchmark de contenção na reserva de estoque.
+
+Várias threads tentam comprar, ao mesmo tempo, unidades do mesmo produto ("SKU quente")
+até o estoque acabar. Ao final, confere que não houve venda acima do estoque e mostra
+a vazão de pedidos por segundo.
+
+Uso (a partir da raiz do projeto, com DATABASE_URL apontando para o PostgreSQL):
+    python scripts/benchmarks/estoque_concorrente.py
+"""
+import os
+import sys
+import time
+import uuid
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import create_app, db
+from app.repositories.cliente_repository import ClienteRepository
+from app.repositories.pedido_repository import PedidoRepository
+from app.repositories.produto_repository import ProdutoRepository
+
+THREADS = int(os.getenv('BENCH_THREADS', 32))
+ESTOQUE = int(os.getenv('BENCH_ESTOQUE', 2000))
+QUANTIDADE_POR_PEDIDO = int(os.getenv('BENCH_QUANTIDADE', 1))
+
+app = create_app()
+
+with app.app_context():
+    produto = ProdutoRepository().create(
+        nome='SKU quente',
+        descricao='Produto do benchmark de contenção',
+        preco=10.0,
+        quantidade_estoque=ESTOQUE
+    )
+    cliente = ClienteRepository().create(nome='Benchmark', email=f'bench_{uuid.uuid4().hex[:8]}@test.com')
+    produto_id, cliente_id = produto.id, cliente.id
+
+resultados = {'sucesso': 0, 'sem_estoque': 0, 'erros': 0}
+trava = threading.Lock()
+inicio_barreira = threading.Barrier(THREADS)
+
+def comprar():
+    with app.app_context():
+        repository = PedidoRepository()
+        inicio_barreira.wait()
+        while True:
+            try:
+                repository.criar_pedido_com_itens(
+                    cliente_id,
+                    [{'produto_id': produto_id, 'quantidade': QUANTIDADE_POR_PEDIDO}]
+                )
+                chave = 'sucesso'
+            except ValueError:
+                chave = 'sem_estoque'
+            except Exception as e:
+                print(f"Erro inesperado: {str(e)}")
+                chave = 'erros'
+
+            with trava:
+                resultados[chave] += 1
+            if chave != 'sucesso':
+                break
+        db.session.remove()
+
+print(f"Iniciando {THREADS} threads contra o produto {produto_id} com estoque {ESTOQUE}...")
+threads = [threading.Thread(target=comprar) for _ in range(THREADS)]
+inicio = time.perf_counter()
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+duracao = time.perf_counter() - inicio
+
+with app.app_context():
+    estoque_final = ProdutoRepository().get_by_id(produto_id).quantidade_estoque
+
+vendidos = resultados['sucesso'] * QUANTIDADE_POR_PEDIDO
+print(f"Pedidos criados: {resultados['sucesso']} em {duracao:.2f}s ({resultados['sucesso'] / duracao:.1f} pedidos/s)")
+print(f"Tentativas sem estoque: {resultados['sem_estoque']} | Erros: {resultados['erros']}")
+print(f"Unidades vendidas: {vendidos} | Estoque final: {estoque_final}")
+
+if resultados['erros'] or vendidos + estoque_final != ESTOQUE or estoque_final < 0:
+    print("❌ Inconsistência no estoque ou erros durante a reserva")
+    exit(1)
+print("✅ Estoque consistente")
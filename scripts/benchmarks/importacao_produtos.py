@@ -0,0 +1,67 @@
+"""
+Benchmark da importação de produtos em lote.
+
+Gera um CSV temporário com BENCH_PRODUTOS linhas (sem montá-lo em memória) e mede:
+    antes:  um ProdutoRepository.create (um INSERT e um commit) por produto, em BENCH_AMOSTRA linhas,
+            com o tempo extrapolado para o arquivo inteiro
+    depois: ImportacaoProdutosService.importar no arquivo inteiro, em lotes de IMPORTACAO_LOTE
+            (COPY no PostgreSQL, executemany nos demais bancos)
+além do pico de memória do processo. Os produtos criados são removidos ao final.
+
+Uso (a partir da raiz do projeto, com DATABASE_URL apontando para o banco e as migrations aplicadas):
+    BENCH_PRODUTOS=1000000 python scripts/benchmarks/importacao_produtos.py
+"""
+import os
+import sys
+import time
+import random
+import resource
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import create_app, db
+from app.models.produto import Produto
+from app.repositories.produto_repository import ProdutoRepository
+from app.services.importacao_produtos_service import ImportacaoProdutosService
+
+PRODUTOS = int(os.getenv('BENCH_PRODUTOS', 1000000))
+AMOSTRA = int(os.getenv('BENCH_AMOSTRA', 2000))
+MARCADOR = 'benchmark-importacao'
+PALAVRAS = ['cadeira', 'mesa', 'notebook', 'monitor', 'teclado', 'mouse', 'headset', 'webcam',
+            'impressora', 'roteador', 'cabo', 'carregador', 'luminaria', 'estante', 'gaveteiro']
+
+def memoria_mb():
+    # ru_maxrss é em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+app = create_app()
+
+with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as arquivo:
+    arquivo.write('nome,descricao,preco,quantidade_estoque\n')
+    for i in range(PRODUTOS):
+        arquivo.write(f'{random.choice(PALAVRAS)} {i:08x},{MARCADOR},{random.randint(100, 99999) / 100},{random.randint(0, 500)}\n')
+print(f"CSV com {PRODUTOS} produtos: {os.path.getsize(arquivo.name) / 1024 / 1024:.0f}MB "
+      f"(memória do processo: {memoria_mb():.0f}MB)")
+
+with app.app_context():
+    repository = ProdutoRepository()
+    inicio = time.perf_counter()
+    for i in range(AMOSTRA):
+        repository.create(nome=f'amostra {i}', descricao=MARCADOR, preco=1.0, quantidade_estoque=1)
+    por_linha = (time.perf_counter() - inicio) / AMOSTRA
+    print(f"antes:  {1 / por_linha:8.0f} produtos/s ({AMOSTRA} linhas) -> {PRODUTOS * por_linha / 60:.1f} min estimados")
+    
+    inicio = time.perf_counter()
+    with open(arquivo.name, 'rb') as entrada:
+        resultado = ImportacaoProdutosService().importar(entrada, 'csv')
+    duracao = time.perf_counter() - inicio
+    print(f"depois: {resultado['importados'] / duracao:8.0f} produtos/s ({resultado['importados']} linhas, "
+          f"{resultado['total_erros']} erros) em {duracao / 60:.1f} min")
+    print(f"Pico de memória do processo: {memoria_mb():.0f}MB")
+    print(f"Aceleração: {PRODUTOS * por_linha / duracao:.0f}x")
+    
+    Produto.query.filter(Produto.descricao == MARCADOR).delete(synchronize_session=False)
+    db.session.commit()
+
+os.unlink(arquivo.name)
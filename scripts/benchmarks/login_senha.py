@@ -0,0 +1,40 @@
+"""
+Benchmark da verificação de senha usada no login.
+
+Verifica a mesma senha repetidas vezes com o esquema e o custo configurados
+(SENHA_ESQUEMA, SENHA_PBKDF2_ROUNDS, SENHA_BCRYPT_ROUNDS, SENHA_ARGON2_*), com 1 até
+BENCH_THREADS threads, e mostra logins/s no total e por thread. Use para escolher
+o custo do hash e o tamanho do pool (SENHA_WORKERS).
+
+Uso (a partir da raiz do projeto):
+    SENHA_ESQUEMA=argon2 python scripts/benchmarks/login_senha.py
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.config.senha import contexto_senha
+
+VERIFICACOES = int(os.getenv('BENCH_VERIFICACOES', 200))
+THREADS = int(os.getenv('BENCH_THREADS', os.cpu_count() or 1))
+
+senha_hash = contexto_senha.hash('senha-do-benchmark')
+print(f"Hash: {senha_hash[:40]}... | {VERIFICACOES} verificações por rodada | {os.cpu_count()} núcleos")
+
+threads = 1
+while True:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        inicio = time.perf_counter()
+        resultados = list(executor.map(lambda _: contexto_senha.verify('senha-do-benchmark', senha_hash), range(VERIFICACOES)))
+        duracao = time.perf_counter() - inicio
+    
+    assert all(resultados)
+    vazao = VERIFICACOES / duracao
+    print(f"{threads:>3} threads: {vazao:7.1f} logins/s ({vazao / threads:6.1f} logins/s por thread, {duracao / VERIFICACOES * threads * 1000:.1f}ms por verificação)")
+    
+    if threads == THREADS:
+        break
+    threads = min(threads * 2, THREADS)
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+Benchmark da geração de variantes de imagem (thumb, medium, webp).
+
+Gera as variantes da mesma imagem repetidas vezes, em memória e sem S3, com 1 até
+BENCH_THREADS threads, e mostra a vazão total e a vazão por thread. Como o Pillow
+libera o GIL durante o processamento, a vazão deve crescer com o número de núcleos.
+
+Uso (a partir da raiz do projeto):
+    python scripts/benchmarks/variantes_imagem.py
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.services.imagem_variantes_service import gerar_variantes
+
+IMAGEM = os.getenv('BENCH_IMAGEM', os.path.join(os.path.dirname(__file__), '..', '..', 'images', 'Mago Negro.png'))
+IMAGENS = int(os.getenv('BENCH_IMAGENS', 40))
+THREADS = int(os.getenv('BENCH_THREADS', os.cpu_count() or 1))
+
+with open(IMAGEM, 'rb') as arquivo:
+    conteudo = arquivo.read()
+ext = IMAGEM.rsplit('.', 1)[1]
+
+# Aquecimento: carrega os plugins do Pillow antes de medir
+gerar_variantes(conteudo, ext)
+
+print(f"Imagem: {os.path.basename(IMAGEM)} ({len(conteudo) / 1024:.0f}KB) | {IMAGENS} imagens por rodada | {os.cpu_count()} núcleos")
+
+threads = 1
+while threads <= THREADS:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        inicio = time.perf_counter()
+        list(executor.map(lambda _: gerar_variantes(conteudo, ext), range(IMAGENS)))
+        duracao = time.perf_counter() - inicio
+
+    vazao = IMAGENS / duracao
+    print(f"{threads:>3} threads: {vazao:6.1f} imagens/s ({vazao / threads:5.1f} imagens/s por thread)")
+    if threads == THREADS:
+        break
+    threads = min(threads * 2, THREADS)
\ No newline at end of file
@@ -13,6 +13,19 @@ load_dotenv()
 
 BASE_URL = os.getenv('API_URL', 'http://localhost:5000')
 
+def listar_todos(url, token):
+    """Percorre todas as páginas de uma listagem seguindo o next_cursor"""
+    itens = []
+    params = {'limit': 100}
+    while True:
+        response = requests.get(url, headers={'Authorization': f'Bearer {token}'}, params=params)
+        assert response.status_code == 200
+        pagina = response.json()
+        itens.extend(pagina['itens'])
+        if not pagina['next_cursor']:
+            return itens
+        params['cursor'] = pagina['next_cursor']
+
 @pytest.fixture
 def app():
     """Cria uma instância da aplicação para testes"""
@@ -38,6 +38,56 @@ def test_login_sucesso(usuario_aleatorio):
     assert response.status_code == 200
     assert 'access_token' in response.json()
 
+def test_refresh_token_rotacao(usuario_aleatorio):
+    """Testa a renovação dos tokens com refresh token e a rejeição do refresh token já usado"""
+    response = requests.post(f'{BASE_URL}/auth/login', json={
+        'email': usuario_aleatorio['email'],
+        'senha': usuario_aleatorio['senha']
+    })
+    refresh_token = response.json()['refresh_token']
+    
+    response = requests.post(f'{BASE_URL}/auth/refresh', headers={'Authorization': f'Bearer {refresh_token}'})
+    
+    assert response.status_code == 200
+    tokens = response.json()
+    assert tokens['refresh_token'] != refresh_token
+    
+    response = requests.get(f'{BASE_URL}/auth/me', headers={'Authorization': f'Bearer {tokens["access_token"]}'})
+    assert response.status_code == 200
+    assert response.json()['email'] == usuario_aleatorio['email']
+    
+    # O refresh token anterior foi revogado na rotação
+    response = requests.post(f'{BASE_URL}/auth/refresh', headers={'Authorization': f'Bearer {refresh_token}'})
+    assert response.status_code == 401
+
+def test_refresh_com_access_token(usuario_aleatorio):
+    """Testa que o access token não pode ser usado para renovar a sessão"""
+    response = requests.post(f'{BASE_URL}/auth/login', json={
+        'email': usuario_aleatorio['email'],
+        'senha': usuario_aleatorio['senha']
+    })
+    
+    response = requests.post(
+        f'{BASE_URL}/auth/refresh',
+        headers={'Authorization': f'Bearer {response.json()["access_token"]}'}
+    )
+    
+    assert response.status_code == 422
+
+def test_logout_revoga_refresh_token(usuario_aleatorio):
+    """Testa que o refresh token encerrado no logout não renova mais a sessão"""
+    response = requests.post(f'{BASE_URL}/auth/login', json={
+        'email': usuario_aleatorio['email'],
+        'senha': usuario_aleatorio['senha']
+    })
+    headers = {'Authorization': f'Bearer {response.json()["refresh_token"]}'}
+    
+    response = requests.post(f'{BASE_URL}/auth/logout', headers=headers)
+    assert response.status_code == 200
+    
+    response = requests.post(f'{BASE_URL}/auth/refresh', headers=headers)
+    assert response.status_code == 401
+
 def test_login_credenciais_invalidas():
     """Testa login com credenciais inválidas"""
     response = requests.post(f'{BASE_URL}/auth/login', json={
@@ -82,4 +132,102 @@ def test_rota_protegida_token_valido(admin_token):
         headers={'Authorization': f'Bearer {admin_token}'}
     )
     
-    assert response.status_code == 200 
\ No newline at end of file
+    assert response.status_code == 200 
+
+def capturar_queries(funcao):
+    """Executa a função e retorna as instruções SQL emitidas"""
+    from sqlalchemy import event
+    from app import db
+    
+    statements = []
+    
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    db.session.remove()
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    try:
+        funcao()
+    except ValueError:
+        pass
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', registrar)
+    return statements
+
+def test_login_e_registro_sem_queries_duplicadas(app):
+    """Testa que o login faz uma única busca do usuário e o registro não faz SELECT antes do INSERT"""
+    from app.services.auth_service import AuthService
+    
+    auth_service = AuthService()
+    email = f"test_{uuid.uuid4().hex[:8]}@test.com"
+    
+    with app.app_context():
+        statements = capturar_queries(lambda: auth_service.registrar_usuario('Teste', email, 'test123'))
+        assert statements[0].upper().startswith('INSERT')
+        assert not any('usuarios.email =' in s for s in statements)
+        
+        statements = capturar_queries(lambda: auth_service.autenticar_usuario(email, 'test123'))
+        assert len(statements) == 1
+        
+        # Email duplicado é detectado pela constraint UNIQUE: só o INSERT, que falha
+        statements = capturar_queries(lambda: auth_service.registrar_usuario('Teste', email, 'test123'))
+        assert [s.split()[0].upper() for s in statements] == ['INSERT']
+
+def test_usuario_atual_em_cache(app):
+    """Testa que /auth/me reaproveita o cache do usuário e que alterações no usuário invalidam a entrada"""
+    from app import db
+    from app.models.usuario import Usuario
+    from app.services.auth_service import AuthService
+    
+    # O listener de invalidação é registrado uma vez no módulo, e não a cada instância do serviço
+    ouvintes = len(Usuario.__mapper__.dispatch.after_update)
+    auth_service = AuthService()
+    assert len(Usuario.__mapper__.dispatch.after_update) == ouvintes
+    email = f"test_{uuid.uuid4().hex[:8]}@test.com"
+    
+    with app.app_context():
+        usuario_id = auth_service.registrar_usuario('Teste', email, 'test123')['usuario']['id']
+        
+        assert len(capturar_queries(lambda: auth_service.get_usuario_atual(usuario_id))) == 1
+        assert capturar_queries(lambda: auth_service.get_usuario_atual(usuario_id)) == []
+        
+        # A entrada só é descartada no commit: até lá, quem ler o banco ainda vê o nome antigo
+        usuario = auth_service.usuario_repository.get_by_id(usuario_id)
+        usuario.nome = 'Nome Pendente'
+        db.session.flush()
+        assert auth_service.cache_usuarios.get(usuario_id)['nome'] == 'Teste'
+        db.session.rollback()
+        assert auth_service.cache_usuarios.get(usuario_id)['nome'] == 'Teste'
+        
+        usuario = auth_service.usuario_repository.get_by_id(usuario_id)
+        auth_service.usuario_repository.update(usuario, nome='Nome Alterado')
+        
+        assert auth_service.get_usuario_atual(usuario_id)['nome'] == 'Nome Alterado'
+        db.session.remove()
+
+def test_refresh_usa_perfil_atual_do_usuario(app):
+    """Testa que a renovação reflete a mudança de perfil e recusa usuários removidos"""
+    from flask_jwt_extended import decode_token
+    from app import db
+    from app.models.usuario import PerfilUsuario
+    from app.services.auth_service import AuthService
+    
+    auth_service = AuthService()
+    email = f"test_{uuid.uuid4().hex[:8]}@test.com"
+    
+    with app.app_context():
+        usuario_id = auth_service.registrar_usuario('Teste', email, 'test123')['usuario']['id']
+        tokens = auth_service.autenticar_usuario(email, 'test123')
+        
+        usuario = auth_service.usuario_repository.get_by_id(usuario_id)
+        auth_service.usuario_repository.update(usuario, perfil=PerfilUsuario.ADMIN)
+        
+        payload = decode_token(tokens['refresh_token'])
+        tokens = auth_service.renovar_tokens(payload['sub'], payload)
+        assert decode_token(tokens['access_token'])['sub']['perfil'] == PerfilUsuario.ADMIN.value
+        
+        auth_service.usuario_repository.delete(auth_service.usuario_repository.get_by_id(usuario_id))
+        payload = decode_token(tokens['refresh_token'])
+        with pytest.raises(ValueError):
+            auth_service.renovar_tokens(payload['sub'], payload)
+        db.session.remove()
\ No newline at end of file
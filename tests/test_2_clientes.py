@@ -1,7 +1,6 @@
-import pytest
 import requests
 import uuid
-from conftest import BASE_URL
+from conftest import BASE_URL, listar_todos
 
 def test_criar_cliente_sucesso(cliente_token):
     """Testa criação de cliente com sucesso"""
@@ -88,13 +87,8 @@ def test_criar_cliente_email_duplicado(cliente_token):
 
 def test_listar_clientes(admin_token, cliente_exemplo):
     """Testa listagem de clientes"""
-    response = requests.get(
-        f'{BASE_URL}/clientes',
-        headers={'Authorization': f'Bearer {admin_token}'}
-    )
+    clientes = listar_todos(f'{BASE_URL}/clientes', admin_token)
     
-    assert response.status_code == 200
-    clientes = response.json()
     assert len(clientes) > 0
     assert any(c['id'] == cliente_exemplo['id'] for c in clientes)
 
@@ -110,6 +104,24 @@ def test_obter_cliente(cliente_token, cliente_exemplo):
     assert cliente['id'] == cliente_exemplo['id']
     assert cliente['nome'] == cliente_exemplo['nome']
 
+def test_obter_cliente_nao_modificado(cliente_token, cliente_exemplo):
+    """Testa o GET condicional do cliente (ETag/If-None-Match)"""
+    url = f'{BASE_URL}/clientes/{cliente_exemplo["id"]}'
+    headers = {'Authorization': f'Bearer {cliente_token}'}
+    response = requests.get(url, headers=headers)
+    etag = response.headers['ETag']
+    
+    response = requests.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['ETag'] == etag
+    
+    requests.put(url, headers=headers, json={'telefone': '11977777777'})
+    response = requests.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json()['telefone'] == '11977777777'
+    assert response.headers['ETag'] != etag
+
 def test_atualizar_cliente(cliente_token, cliente_exemplo):
     """Testa atualização de cliente"""
     data = {
@@ -152,6 +164,6 @@ def test_buscar_cliente_por_nome(admin_token, cliente_exemplo):
     )
     
     assert response.status_code == 200
-    clientes = response.json()
+    clientes = response.json()['itens']
     assert len(clientes) > 0
     assert any(c['nome'] == cliente_exemplo['nome'] for c in clientes) 
\ No newline at end of file
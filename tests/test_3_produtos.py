@@ -1,6 +1,11 @@
 import pytest
+import base64
+import json
 import requests
-from conftest import BASE_URL
+import os
+import time
+import uuid
+from conftest import BASE_URL, listar_todos
 
 def test_criar_produto_sucesso(admin_token):
     """Testa criação de produto com sucesso"""
@@ -90,13 +95,8 @@ def test_criar_produto_sem_preco(admin_token):
 
 def test_listar_produtos(admin_token, produto_exemplo):
     """Testa listagem de produtos"""
-    response = requests.get(
-        f'{BASE_URL}/produtos',
-        headers={'Authorization': f'Bearer {admin_token}'}
-    )
+    produtos = listar_todos(f'{BASE_URL}/produtos', admin_token)
     
-    assert response.status_code == 200
-    produtos = response.json()
     assert len(produtos) > 0
     assert any(p['id'] == produto_exemplo['id'] for p in produtos)
 
@@ -112,6 +112,47 @@ def test_obter_produto(admin_token, produto_exemplo):
     assert produto['id'] == produto_exemplo['id']
     assert produto['nome'] == produto_exemplo['nome']
 
+def test_obter_produto_nao_modificado(admin_token, produto_exemplo):
+    """Testa o GET condicional do produto (ETag/If-None-Match)"""
+    url = f'{BASE_URL}/produtos/{produto_exemplo["id"]}'
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    response = requests.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    etag = response.headers['ETag']
+    
+    response = requests.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+    
+    response = requests.get(url, headers={**headers, 'If-None-Match': '"desatualizada"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == etag
+
+def test_obter_produto_versao_do_banco(app):
+    """Testa que a versão da ETag vem do banco e descarta a entrada do cache alterada por outro worker"""
+    from datetime import timedelta
+    from app import db
+    from app.models.produto import Produto
+    from app.services.produto_service import ProdutoService
+    
+    produto_service = ProdutoService()
+    
+    with app.app_context():
+        produto = produto_service.produto_repository.create(nome=f'versao{uuid.uuid4().hex[:8]}', descricao=None, preco=1.0)
+        assert produto_service.obter_produto(produto.id)['preco'] == 1.0
+        
+        # Escrita sem os eventos do ORM deste processo, como a de outro worker
+        tabela = Produto.__table__
+        atualizado_em = produto.updated_at + timedelta(seconds=1)
+        db.session.execute(tabela.update().where(tabela.c.id == produto.id).values(preco=2.0, updated_at=atualizado_em))
+        db.session.commit()
+        
+        versao = produto_service.obter_versao_produto(produto.id)
+        assert versao == atualizado_em.isoformat()
+        assert produto_service.obter_produto(produto.id, versao=versao)['preco'] == 2.0
+        db.session.remove()
+
 def test_atualizar_produto(admin_token, produto_exemplo):
     """Testa atualização de produto"""
     data = {
@@ -158,10 +199,367 @@ def test_buscar_produto_por_nome(admin_token, produto_exemplo):
     )
     
     assert response.status_code == 200
-    produtos = response.json()
+    produtos = response.json()['itens']
     assert len(produtos) > 0
     assert any(p['nome'] == produto_exemplo['nome'] for p in produtos)
 
+def test_buscar_produto_por_nome_relevancia_e_paginacao(admin_token):
+    """Testa ordenação por relevância, paginação e curingas na busca de produtos"""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    termo = f'busca{uuid.uuid4().hex[:8]}'
+    parcial = requests.post(f'{BASE_URL}/produtos', headers=headers, data={
+        'nome': 'Produto Parcial', 'descricao': f'Referência {termo}xyzw', 'preco': '1.0'
+    }).json()
+    exato = requests.post(f'{BASE_URL}/produtos', headers=headers, data={
+        'nome': f'Produto {termo}', 'preco': '1.0'
+    }).json()
+    
+    response = requests.get(f'{BASE_URL}/produtos/nome/{termo}', headers=headers, params={'limit': 1})
+    
+    assert response.status_code == 200
+    pagina = response.json()
+    assert [p['id'] for p in pagina['itens']] == [exato['id']]
+    assert pagina['next_cursor']
+    
+    response = requests.get(
+        f'{BASE_URL}/produtos/nome/{termo}',
+        headers=headers,
+        params={'limit': 1, 'cursor': pagina['next_cursor']}
+    )
+    
+    assert response.status_code == 200
+    proxima = response.json()
+    assert [p['id'] for p in proxima['itens']] == [parcial['id']]
+    assert proxima['next_cursor'] is None
+    
+    response = requests.get(f'{BASE_URL}/produtos/nome/{termo[:-2]}%25', headers=headers)
+    assert response.status_code == 200
+    assert response.json()['itens'] == []
+
+def aguardar_autocomplete(token, params, condicao, timeout=40):
+    """
+    Repete a consulta ao autocomplete até a condição valer. Com vários workers, o índice do worker que
+    atende só recebe as escritas feitas em outro na atualização periódica (AUTOCOMPLETE_INTERVALO).
+    :return: Itens da última resposta
+    """
+    limite = time.monotonic() + timeout
+    while True:
+        response = requests.get(f'{BASE_URL}/produtos/autocomplete', headers={'Authorization': f'Bearer {token}'}, params=params)
+        assert response.status_code == 200
+        itens = response.json()['itens']
+        if condicao(itens) or time.monotonic() > limite:
+            return itens
+        time.sleep(0.5)
+
+def test_autocomplete_produtos(admin_token):
+    """Testa sugestões do autocomplete após criar, renomear e remover um produto"""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    prefixo = f'auto{uuid.uuid4().hex[:8]}'
+    outro = requests.post(f'{BASE_URL}/produtos', headers=headers, data={'nome': f'Suporte para {prefixo}', 'preco': '1.0'}).json()
+    produto = requests.post(f'{BASE_URL}/produtos', headers=headers, data={'nome': f'{prefixo} Gamer', 'preco': '1.0'}).json()
+    
+    itens = aguardar_autocomplete(admin_token, {'q': prefixo[:-2]}, lambda itens: len(itens) == 2)
+    assert [p['id'] for p in itens] == [produto['id'], outro['id']]
+    
+    itens = aguardar_autocomplete(admin_token, {'q': f'gam {prefixo}', 'limit': 1}, bool)
+    assert itens == [{'id': produto['id'], 'nome': f'{prefixo} Gamer'}]
+    
+    requests.put(f'{BASE_URL}/produtos/{produto["id"]}', headers=headers, json={'nome': f'{prefixo} Escritório'})
+    requests.delete(f'{BASE_URL}/produtos/{outro["id"]}', headers=headers)
+    
+    itens = aguardar_autocomplete(admin_token, {'q': f'{prefixo} escritorio'}, bool)
+    assert [p['id'] for p in itens] == [produto['id']]
+    assert aguardar_autocomplete(admin_token, {'q': f'{prefixo} gamer'}, lambda itens: not itens) == []
+
+def test_autocomplete_limit_invalido(admin_token):
+    """Testa autocomplete com limit inválido"""
+    response = requests.get(
+        f'{BASE_URL}/produtos/autocomplete',
+        headers={'Authorization': f'Bearer {admin_token}'},
+        params={'q': 'produto', 'limit': 0}
+    )
+    
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+def test_autocomplete_atualizacao_incremental(app):
+    """Testa que a atualização periódica traz produtos criados e removidos por outros workers"""
+    from app import db
+    from app.services.autocomplete_service import AutocompleteService
+    
+    autocomplete_service = AutocompleteService()
+    repository = autocomplete_service.produto_repository
+    nome = f'incremental{uuid.uuid4().hex[:8]}'
+    
+    with app.app_context():
+        autocomplete_service.carregar()
+        produto = repository.create(nome=nome, descricao=None, preco=1.0)
+        assert autocomplete_service.buscar(nome) == []
+        
+        autocomplete_service.atualizar()
+        assert autocomplete_service.buscar(nome) == [{'id': produto.id, 'nome': nome}]
+        
+        repository.delete(produto)
+        autocomplete_service.atualizar()
+        assert autocomplete_service.buscar(nome) == []
+        
+        # Acima de max_incremental alterações, a atualização reconstrói o índice em vez de indexar uma a uma
+        autocomplete_service.max_incremental = 1
+        recargas = []
+        carregar = autocomplete_service.carregar
+        autocomplete_service.carregar = lambda: recargas.append(True) or carregar()
+        repository.bulk_create([{'nome': f'{nome} lote {i}', 'descricao': None, 'preco': 1.0} for i in range(2)])
+        autocomplete_service.atualizar()
+        assert recargas
+        assert len(autocomplete_service.buscar(f'{nome} lote')) == 2
+        db.session.remove()
+
+
+def test_autocomplete_ordena_alem_do_limite_de_candidatos():
+    """Testa que nomes que começam com o texto e nomes curtos vêm primeiro mesmo com mais correspondências que max_candidatos"""
+    from app.services.autocomplete_service import AutocompleteService
+    
+    autocomplete_service = AutocompleteService()
+    autocomplete_service.carregar(
+        [(id, f'Suporte para cafe modelo {id}', None) for id in range(1, 301)] + [(1001, 'Cafeteira', None)]
+    )
+    autocomplete_service.indexar(1002, 'Mini cafe')
+    autocomplete_service.indexar(1000, 'Café')
+    assert autocomplete_service.max_candidatos < 300
+    
+    esperado = [1000, 1001, 1002, 1, 2]
+    assert [p['id'] for p in autocomplete_service.buscar('cafe', limit=5)] == esperado
+    assert [p['id'] for p in autocomplete_service.buscar('caf', limit=5)] == esperado
+    assert [p['id'] for p in autocomplete_service.buscar('cafeteira')] == [1001]
+    
+    autocomplete_service.remover(1000)
+    assert [p['id'] for p in autocomplete_service.buscar('caf', limit=3)] == [1001, 1002, 1]
+
+def test_contar_produtos(admin_token, app):
+    """Testa que o contador acompanha a criação e a remoção de produtos"""
+    from app import db
+    
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    response = requests.get(f'{BASE_URL}/produtos/contar', headers=headers)
+    assert response.status_code == 200
+    assert response.json()['modo'] == 'exato'
+    total = response.json()['total']
+    assert total == len(listar_todos(f'{BASE_URL}/produtos', admin_token))
+    
+    produto = requests.post(f'{BASE_URL}/produtos', headers=headers, data={'nome': 'Contado', 'preco': '1.0'}).json()
+    assert requests.get(f'{BASE_URL}/produtos/contar', headers=headers).json()['total'] == total + 1
+    
+    requests.delete(f'{BASE_URL}/produtos/{produto["id"]}', headers=headers)
+    assert requests.get(f'{BASE_URL}/produtos/contar', headers=headers).json()['total'] == total
+    
+    response = requests.get(f'{BASE_URL}/produtos/contar', headers=headers, params={'modo': 'estimado'})
+    assert response.status_code == 200
+    resultado = response.json()
+    assert isinstance(resultado['total'], int) and resultado['total'] >= 0
+    
+    with app.app_context():
+        postgresql = db.engine.dialect.name == 'postgresql'
+    # Só o PostgreSQL tem estatísticas do planejador; nos demais bancos (ex: SQLite) o modo cai no total exato
+    if resultado['modo'] == 'estimado':
+        assert postgresql
+    else:
+        assert resultado == {'total': total, 'modo': 'exato'}
+    if not postgresql:
+        assert resultado['modo'] == 'exato'
+
+def test_contar_produtos_modo_invalido(admin_token):
+    response = requests.get(
+        f'{BASE_URL}/produtos/contar',
+        headers={'Authorization': f'Bearer {admin_token}'},
+        params={'modo': 'aproximado'}
+    )
+    
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+def test_importar_produtos_csv(admin_token):
+    """Testa a importação em lote de um CSV, com relatório das linhas recusadas"""
+    sufixo = uuid.uuid4().hex[:8]
+    conteudo = (
+        'nome,descricao,preco,quantidade_estoque\n'
+        f'Importado A {sufixo},"Com vírgula, na descrição",10.5,3\n'
+        ',Sem nome,1,1\n'
+        f'Importado B {sufixo},,abc,1\n'
+        f'Importado C {sufixo},,7,\n'
+        f'Importado D {sufixo},,2,-1\n'
+    )
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    total = requests.get(f'{BASE_URL}/produtos/contar', headers=headers).json()['total']
+    
+    response = requests.post(
+        f'{BASE_URL}/produtos/importar',
+        headers=headers,
+        params={'lote': 1},
+        files={'arquivo': ('produtos.csv', conteudo.encode(), 'text/csv')}
+    )
+    
+    assert response.status_code == 200
+    resultado = response.json()
+    assert resultado['importados'] == 2
+    assert resultado['total_erros'] == 3
+    assert [erro['linha'] for erro in resultado['erros']] == [3, 4, 6]
+    assert requests.get(f'{BASE_URL}/produtos/contar', headers=headers).json()['total'] == total + 2
+    
+    itens = requests.get(f'{BASE_URL}/produtos/nome/{sufixo}', headers=headers).json()['itens']
+    importados = {item['nome']: item for item in itens}
+    assert importados[f'Importado A {sufixo}']['descricao'] == 'Com vírgula, na descrição'
+    assert importados[f'Importado C {sufixo}']['quantidade_estoque'] == 0
+
+def test_importacao_limita_lote_e_reindexa_autocomplete(app):
+    """Testa o teto do lote pedido pelo cliente e a atualização do autocomplete ao fim da importação"""
+    from io import BytesIO
+    from app import db
+    from app.services.autocomplete_service import AutocompleteService
+    from app.services.importacao_produtos_service import ImportacaoProdutosService
+    
+    autocomplete_service = AutocompleteService()
+    importacao_service = ImportacaoProdutosService(autocomplete_service)
+    importacao_service.tamanho_lote_max = 2
+    lotes = []
+    inserir_em_lote = importacao_service.produto_repository.inserir_em_lote
+    importacao_service.produto_repository.inserir_em_lote = lambda linhas: lotes.append(len(linhas)) or inserir_em_lote(linhas)
+    sufixo = uuid.uuid4().hex[:8]
+    conteudo = ''.join(f'{{"nome": "Reindexado {sufixo} {i}", "preco": 1}}\n' for i in range(5))
+    
+    recargas = []
+    carregar = autocomplete_service.carregar
+    autocomplete_service.carregar = lambda: recargas.append(True) or carregar()
+    
+    with app.app_context():
+        carregar()
+        resultado = importacao_service.importar(BytesIO(conteudo.encode()), 'jsonl', tamanho_lote=1000000)
+        assert resultado['importados'] == 5
+        assert lotes == [2, 2, 1]
+        assert len(autocomplete_service.buscar(f'reindexado {sufixo}')) == 5
+        # Importações pequenas só indexam os produtos novos; acima de max_incremental o índice é reconstruído
+        assert not recargas
+        
+        autocomplete_service.max_incremental = 1
+        conteudo = ''.join(f'{{"nome": "Reconstruido {sufixo} {i}", "preco": 1}}\n' for i in range(2))
+        importacao_service.importar(BytesIO(conteudo.encode()), 'jsonl')
+        assert recargas == [True]
+        assert len(autocomplete_service.buscar(f'reconstruido {sufixo}')) == 2
+        db.session.remove()
+
+def test_importar_produtos_jsonl_no_corpo(admin_token):
+    """Testa a importação de JSON Lines enviado como corpo da requisição"""
+    sufixo = uuid.uuid4().hex[:8]
+    conteudo = f'{{"nome": "Jsonl {sufixo}", "preco": 5}}\nnão é json\n\n{{"preco": 1}}\n'
+    
+    response = requests.post(
+        f'{BASE_URL}/produtos/importar',
+        headers={'Authorization': f'Bearer {admin_token}', 'Content-Type': 'application/x-ndjson'},
+        data=conteudo.encode()
+    )
+    
+    assert response.status_code == 200
+    resultado = response.json()
+    assert resultado['importados'] == 1
+    assert resultado['erros'] == [
+        {'linha': 2, 'erro': 'Linha não é um objeto JSON válido'},
+        {'linha': 4, 'erro': 'Nome é obrigatório'}
+    ]
+
+def test_importar_produtos_invalido(admin_token, cliente_token):
+    """Testa a importação sem permissão, sem formato conhecido e com cabeçalho incompleto"""
+    url = f'{BASE_URL}/produtos/importar'
+    
+    response = requests.post(url, headers={'Authorization': f'Bearer {cliente_token}'}, data=b'nome,preco\n')
+    assert response.status_code == 403
+    
+    response = requests.post(url, headers={'Authorization': f'Bearer {admin_token}'}, files={'arquivo': ('produtos.xml', b'<produtos/>')})
+    assert response.status_code == 400
+    
+    response = requests.post(url, headers={'Authorization': f'Bearer {admin_token}', 'Content-Type': 'text/csv'}, data=b'nome,valor\nA,1\n')
+    assert response.status_code == 400
+    assert 'preco' in response.json()['error']
+
+def test_unidade_de_trabalho(app):
+    """Testa que a unidade de trabalho faz um único commit e que o savepoint desfaz só o bloco interno"""
+    from sqlalchemy import event
+    from app import db
+    from app.repositories.produto_repository import ProdutoRepository
+    from app.repositories.unidade_de_trabalho import unidade_de_trabalho
+    
+    repository = ProdutoRepository()
+    sufixo = uuid.uuid4().hex[:8]
+    commits = []
+    
+    def contar_commit(sessao):
+        commits.append(sessao)
+    
+    with app.app_context():
+        event.listen(db.session, 'after_commit', contar_commit)
+        try:
+            with unidade_de_trabalho():
+                repository.create(nome=f'uow A {sufixo}', descricao=None, preco=1.0)
+                repository.create(nome=f'uow B {sufixo}', descricao=None, preco=1.0)
+                try:
+                    with unidade_de_trabalho(savepoint=True):
+                        repository.create(nome=f'uow C {sufixo}', descricao=None, preco=1.0)
+                        raise ValueError('desfaz só o savepoint')
+                except ValueError:
+                    pass
+            assert len(commits) == 1
+            
+            with pytest.raises(ValueError):
+                with unidade_de_trabalho():
+                    repository.create(nome=f'uow D {sufixo}', descricao=None, preco=1.0)
+                    raise ValueError('desfaz tudo')
+            assert len(commits) == 1
+        finally:
+            event.remove(db.session, 'after_commit', contar_commit)
+        
+        db.session.remove()
+        produtos, _ = repository.buscar_por_nome(sufixo, limit=10)
+        assert sorted(produto.nome for produto in produtos) == [f'uow A {sufixo}', f'uow B {sufixo}']
+        db.session.remove()
+
+def test_metodos_em_lote(app):
+    """Testa bulk_create, bulk_update e delete_where, inclusive a invalidação do cache do catálogo"""
+    from app import db
+    from app.models.produto import Produto
+    from app.repositories.produto_repository import ProdutoRepository
+    from app.services.catalogo_cache_service import catalogo_cache
+    
+    repository = ProdutoRepository()
+    marcador = f'lote {uuid.uuid4().hex[:8]}'
+    
+    with app.app_context():
+        total = repository.contar_total()
+        assert repository.bulk_create([
+            {'nome': f'{marcador} {i}', 'descricao': marcador, 'preco': 1.0, 'quantidade_estoque': i}
+            for i in range(5)
+        ]) == 5
+        assert repository.contar_total() == total + 5
+        
+        ids = sorted(produto.id for produto in repository.filter_by(descricao=marcador))
+        assert catalogo_cache.obter_produto(ids[0])['preco'] == 1.0
+        assert repository.bulk_update(
+            [{'id': id, 'preco': 2.0} for id in ids[:3]] + [{'id': ids[3], 'quantidade_estoque': 40}]
+        ) == 4
+        assert catalogo_cache.obter_produto(ids[0])['preco'] == 2.0
+        assert catalogo_cache.obter_produto(ids[3])['quantidade_estoque'] == 40
+        assert catalogo_cache.obter_produto(ids[4])['preco'] == 1.0
+        
+        with pytest.raises(ValueError):
+            repository.bulk_update([{'id': ids[0], 'inexistente': 1}])
+        with pytest.raises(ValueError):
+            repository.delete_where()
+        with pytest.raises(ValueError):
+            repository.delete_where(inexistente=marcador)
+        
+        assert repository.delete_where(Produto.preco > 1.5, descricao=marcador) == 3
+        assert catalogo_cache.obter_produto(ids[0]) is None
+        assert repository.delete_where(descricao=marcador) == 2
+        assert repository.contar_total() == total
+        db.session.remove()
+
 def test_atualizar_estoque_produto(admin_token, produto_exemplo):
     """Testa atualização do estoque de um produto"""
 
@@ -214,4 +612,421 @@ def test_atualizar_estoque_produto_negativo(admin_token, produto_exemplo):
     )
     
     assert response.status_code == 400
-    assert 'error' in response.json() 
\ No newline at end of file
+    assert 'error' in response.json() 
+
+def test_listar_produtos_paginado(admin_token, produto_exemplo):
+    """Testa paginação por cursor na listagem de produtos"""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    requests.post(f'{BASE_URL}/produtos', headers=headers, data={'nome': 'Produto Página', 'preco': '1.0'})
+    
+    response = requests.get(f'{BASE_URL}/produtos', headers=headers, params={'limit': 1})
+    
+    assert response.status_code == 200
+    pagina = response.json()
+    assert len(pagina['itens']) == 1
+    assert pagina['next_cursor']
+    
+    response = requests.get(
+        f'{BASE_URL}/produtos',
+        headers=headers,
+        params={'limit': 1, 'cursor': pagina['next_cursor']}
+    )
+    
+    assert response.status_code == 200
+    proxima = response.json()
+    assert len(proxima['itens']) == 1
+    assert proxima['itens'][0]['id'] > pagina['itens'][0]['id']
+
+def test_listar_produtos_cursor_invalido(admin_token):
+    """Testa listagem de produtos com cursor inválido"""
+    response = requests.get(
+        f'{BASE_URL}/produtos',
+        headers={'Authorization': f'Bearer {admin_token}'},
+        params={'cursor': 'invalido'}
+    )
+    
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+def test_listar_produtos_cursor_adulterado(admin_token):
+    """Testa cursores bem formados mas com uma chave primária que não é inteira"""
+    for valores in (['x', 'abc'], [1, {'id': 1}], [1, True], [[1], 1]):
+        cursor = base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip('=')
+        response = requests.get(
+            f'{BASE_URL}/produtos',
+            headers={'Authorization': f'Bearer {admin_token}'},
+            params={'cursor': cursor}
+        )
+        
+        assert response.status_code == 400
+        assert response.json()['error'] == 'Cursor inválido'
+
+IMAGEM_PATH = os.path.join(os.path.dirname(__file__), '..', 'images', 'Mago Negro.png')
+
+@pytest.fixture
+def produto_com_imagem(admin_token):
+    """Cria um produto com imagem via API"""
+    with open(IMAGEM_PATH, 'rb') as imagem:
+        response = requests.post(
+            f'{BASE_URL}/produtos',
+            headers={'Authorization': f'Bearer {admin_token}'},
+            data={'nome': 'Produto Com Imagem', 'preco': '10.0'},
+            files={'imagem': ('mago.png', imagem, 'image/png')}
+        )
+    
+    if response.status_code != 201:
+        raise Exception(f"Erro ao criar produto com imagem: {response.json()}")
+    
+    return response.json()
+
+def test_buscar_imagem_produto(admin_token, produto_com_imagem):
+    """Testa o download em streaming da imagem do produto"""
+    response = requests.get(
+        f'{BASE_URL}/produtos/imagem/{produto_com_imagem["imagem_url"]}',
+        headers={'Authorization': f'Bearer {admin_token}'}
+    )
+    
+    with open(IMAGEM_PATH, 'rb') as imagem:
+        conteudo = imagem.read()
+    
+    assert response.status_code == 200
+    assert response.content == conteudo
+    assert response.headers['Content-Type'] == 'image/png'
+    assert response.headers['Content-Length'] == str(len(conteudo))
+    assert response.headers['ETag']
+    assert response.headers['Last-Modified']
+
+def test_buscar_imagem_produto_range(admin_token, produto_com_imagem):
+    """Testa a leitura parcial da imagem com o header Range"""
+    response = requests.get(
+        f'{BASE_URL}/produtos/imagem/{produto_com_imagem["imagem_url"]}',
+        headers={'Authorization': f'Bearer {admin_token}', 'Range': 'bytes=0-9'}
+    )
+    
+    with open(IMAGEM_PATH, 'rb') as imagem:
+        conteudo = imagem.read()
+    
+    assert response.status_code == 206
+    assert response.content == conteudo[:10]
+    assert response.headers['Content-Range'] == f'bytes 0-9/{len(conteudo)}'
+
+def test_buscar_imagem_inexistente(admin_token):
+    """Testa busca de imagem que não existe no S3"""
+    response = requests.get(
+        f'{BASE_URL}/produtos/imagem/inexistente.png',
+        headers={'Authorization': f'Bearer {admin_token}'}
+    )
+    
+    assert response.status_code == 404
+    assert 'error' in response.json()
+
+def test_buscar_imagem_produto_nao_modificada(admin_token, produto_com_imagem):
+    """Testa GET condicional da imagem com If-None-Match"""
+    url = f'{BASE_URL}/produtos/imagem/{produto_com_imagem["imagem_url"]}'
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    
+    response = requests.get(url, headers=headers)
+    assert response.status_code == 200
+    assert 'max-age' in response.headers['Cache-Control']
+    
+    response = requests.get(url, headers={**headers, 'If-None-Match': response.headers['ETag']})
+    
+    assert response.status_code == 304
+    assert response.content == b''
+
+def test_estatisticas_cache_imagens(admin_token, produto_com_imagem):
+    """Testa os contadores do cache de imagens"""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    requests.get(f'{BASE_URL}/produtos/imagem/{produto_com_imagem["imagem_url"]}', headers=headers)
+    requests.get(f'{BASE_URL}/produtos/imagem/{produto_com_imagem["imagem_url"]}', headers=headers)
+    
+    response = requests.get(f'{BASE_URL}/produtos/imagem/cache', headers=headers)
+    
+    # Os contadores são do worker que atendeu: com vários workers, as leituras acima podem ter ido para outros
+    assert response.status_code == 200
+    estatisticas = response.json()
+    for contador in ('hits', 'misses', 'revalidacoes', 'evictions', 'itens', 'bytes'):
+        assert isinstance(estatisticas[contador], int) and estatisticas[contador] >= 0
+    assert estatisticas['bytes'] <= estatisticas['max_bytes']
+    assert 0 <= estatisticas['hit_ratio'] <= 1
+
+def test_exclusao_de_imagem_invalida_o_cache(app):
+    """Testa que a imagem enfileirada para exclusão deixa de ser servida pelo cache do processo"""
+    from datetime import datetime
+    from io import BytesIO
+    from app import db
+    from app.services.produto_service import ProdutoService
+    
+    produto_service = ProdutoService()
+    cache = produto_service.imagem_cache_service
+    chave = f'{uuid.uuid4()}.png'
+    cache.put(chave, {'Body': BytesIO(b'png'), 'ETag': '"v1"', 'LastModified': datetime.now(), 'ContentType': 'image/png'})
+    assert cache.get(chave) is not None
+    
+    with app.app_context():
+        produto_service.exclusao_s3_service.enfileirar([chave])
+        db.session.rollback()
+    
+    assert cache.get(chave) is None
+
+def test_estatisticas_cache_imagens_sem_permissao(cliente_token):
+    """Testa acesso às estatísticas do cache sem perfil admin"""
+    response = requests.get(
+        f'{BASE_URL}/produtos/imagem/cache',
+        headers={'Authorization': f'Bearer {cliente_token}'}
+    )
+    
+    assert response.status_code == 403
+
+def test_cache_catalogo_invalidado_por_pedido(admin_token, cliente_exemplo, produto_exemplo):
+    """Testa que a baixa de estoque de um pedido aparece no produto e na listagem já em cache"""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    url = f'{BASE_URL}/produtos/{produto_exemplo["id"]}'
+    assert requests.get(url, headers=headers).json()['quantidade_estoque'] == 10
+    
+    response = requests.post(
+        f'{BASE_URL}/pedidos',
+        headers=headers,
+        json={'cliente_id': cliente_exemplo['id'], 'itens': [{'produto_id': produto_exemplo['id'], 'quantidade': 3}]}
+    )
+    assert response.status_code == 201
+    
+    # O worker que registrou o pedido invalida na hora; os demais, sem backend compartilhado, em até o TTL local
+    ttl = requests.get(f'{BASE_URL}/produtos/cache', headers=headers).json()['local']['ttl']
+    limite = time.monotonic() + ttl + 1
+    while True:
+        estoque = requests.get(url, headers=headers).json()['quantidade_estoque']
+        produtos = {produto['id']: produto for produto in listar_todos(f'{BASE_URL}/produtos', admin_token)}
+        if (estoque, produtos[produto_exemplo['id']]['quantidade_estoque']) == (7, 7) or time.monotonic() > limite:
+            break
+        time.sleep(0.2)
+    
+    assert estoque == 7
+    assert produtos[produto_exemplo['id']]['quantidade_estoque'] == 7
+
+def test_estatisticas_cache_catalogo(admin_token, produto_exemplo):
+    """Testa os contadores do cache do catálogo de produtos"""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    requests.get(f'{BASE_URL}/produtos/{produto_exemplo["id"]}', headers=headers)
+    requests.get(f'{BASE_URL}/produtos/{produto_exemplo["id"]}', headers=headers)
+    
+    response = requests.get(f'{BASE_URL}/produtos/cache', headers=headers)
+    
+    # Os contadores locais são do worker que atendeu, que pode não ser o que serviu as leituras acima
+    assert response.status_code == 200
+    estatisticas = response.json()
+    for nivel in ('local', 'compartilhado'):
+        assert estatisticas[nivel]['hits'] >= 0 and estatisticas[nivel]['misses'] >= 0
+        assert 0 <= estatisticas[nivel]['hit_ratio'] <= 1
+    assert estatisticas['local']['itens'] <= estatisticas['local']['max_itens']
+    if estatisticas['compartilhado']['backend'] is not None:
+        assert estatisticas['local']['ttl'] == 0
+
+def test_estatisticas_cache_catalogo_sem_permissao(cliente_token):
+    """Testa acesso às estatísticas do cache do catálogo sem perfil admin"""
+    response = requests.get(
+        f'{BASE_URL}/produtos/cache',
+        headers={'Authorization': f'Bearer {cliente_token}'}
+    )
+    
+    assert response.status_code == 403
+
+def test_cache_catalogo_compartilhado(app):
+    """Testa que dois workers compartilham o backend e que alterações feitas por um aparecem no outro"""
+    from app import db
+    from app.services.cache_service import BackendCacheMemoria
+    from app.services.catalogo_cache_service import CatalogoCacheService
+    
+    backend = BackendCacheMemoria()
+    worker_a = CatalogoCacheService(compartilhado=backend)
+    worker_b = CatalogoCacheService(compartilhado=backend)
+    repository = worker_a.produto_repository
+    
+    with app.app_context():
+        produto = repository.create(nome=f'compartilhado{uuid.uuid4().hex[:8]}', descricao=None, preco=1.0)
+        # O nível local fica desligado: as invalidações de um worker não chegariam ao dos outros
+        assert not worker_a.local.ativo
+        assert worker_a.obter_produto(produto.id)['preco'] == 1.0
+        assert worker_b.obter_produto(produto.id)['preco'] == 1.0
+        assert worker_b.estatisticas()['compartilhado']['hits'] == 1
+        
+        repository.update(produto, preco=2.0)
+        assert worker_a.obter_produto(produto.id)['preco'] == 2.0
+        assert worker_b.obter_produto(produto.id)['preco'] == 2.0
+        
+        repository.delete(produto)
+        assert worker_a.obter_produto(produto.id) is None
+        db.session.remove()
+
+def test_buscar_imagem_produto_redirect(admin_token, produto_com_imagem):
+    """Testa a entrega da imagem via redirect para URL pré-assinada"""
+    url = f'{BASE_URL}/produtos/imagem/{produto_com_imagem["imagem_url"]}'
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    
+    response = requests.get(url, headers=headers, params={'entrega': 'redirect'}, allow_redirects=False)
+    
+    assert response.status_code == 302
+    location = response.headers['Location']
+    assert produto_com_imagem['imagem_url'] in location
+    
+    # A URL assinada é reaproveitada enquanto estiver válida
+    response = requests.get(url, headers=headers, params={'entrega': 'redirect'}, allow_redirects=False)
+    assert response.headers['Location'] == location
+    
+    with open(IMAGEM_PATH, 'rb') as imagem:
+        assert requests.get(location).content == imagem.read()
+
+def test_buscar_imagem_entrega_invalida(admin_token, produto_com_imagem):
+    """Testa modo de entrega de imagem inválido"""
+    response = requests.get(
+        f'{BASE_URL}/produtos/imagem/{produto_com_imagem["imagem_url"]}',
+        headers={'Authorization': f'Bearer {admin_token}'},
+        params={'entrega': 'invalido'}
+    )
+    
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+def test_upload_imagem_direto_s3(admin_token, produto_com_imagem):
+    """Testa upload direto ao S3 via POST pré-assinado e a confirmação no produto"""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    
+    response = requests.post(f'{BASE_URL}/produtos/imagem/upload-url', headers=headers, json={'filename': 'mago.png'})
+    
+    assert response.status_code == 201
+    upload = response.json()
+    assert upload['key'].endswith('.png')
+    
+    with open(IMAGEM_PATH, 'rb') as imagem:
+        response = requests.post(upload['url'], data=upload['fields'], files={'file': ('mago.png', imagem)})
+    assert response.status_code in (200, 201, 204)
+    
+    response = requests.put(
+        f'{BASE_URL}/produtos/{produto_com_imagem["id"]}/imagem',
+        headers=headers,
+        json={'key': upload['key']}
+    )
+    
+    assert response.status_code == 200
+    assert response.json()['imagem_url'] == upload['key']
+    
+    response = requests.get(f'{BASE_URL}/produtos/imagem/{upload["key"]}', headers=headers)
+    assert response.status_code == 200
+
+def test_upload_imagem_formato_invalido(admin_token):
+    """Testa geração de upload para arquivo com formato não permitido"""
+    response = requests.post(
+        f'{BASE_URL}/produtos/imagem/upload-url',
+        headers={'Authorization': f'Bearer {admin_token}'},
+        json={'filename': 'documento.pdf'}
+    )
+    
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+def test_falha_de_conexao_s3_vira_value_error(monkeypatch):
+    """Testa que erros do botocore sem resposta HTTP (conexão, timeout) seguem o tratamento do ClientError"""
+    from botocore.exceptions import EndpointConnectionError
+    from app.services.s3_service import S3Service
+    
+    s3_service = S3Service()
+    
+    def falhar(**kwargs):
+        raise EndpointConnectionError(endpoint_url='http://s3.invalido')
+    
+    for operacao in ('put_object', 'delete_object', 'head_object'):
+        monkeypatch.setattr(s3_service.s3_client, operacao, falhar)
+    
+    with pytest.raises(ValueError):
+        s3_service.upload_variante('variante.png', b'', 'image/png')
+    with pytest.raises(ValueError):
+        s3_service.deletar_imagem('imagem.png')
+    with pytest.raises(ValueError, match='Erro ao consultar'):
+        s3_service.confirmar_upload_imagem(f'{uuid.uuid4()}.png')
+
+def test_confirmar_upload_imagem_inexistente(admin_token, produto_exemplo):
+    """Testa confirmação de upload de imagem que não foi enviada ao S3"""
+    response = requests.put(
+        f'{BASE_URL}/produtos/{produto_exemplo["id"]}/imagem',
+        headers={'Authorization': f'Bearer {admin_token}'},
+        json={'key': '00000000-0000-0000-0000-000000000000.png'}
+    )
+    
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+def aguardar_variantes(token, produto_id, timeout=15):
+    """Aguarda o pipeline em segundo plano gravar as variantes da imagem no produto"""
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        produto = requests.get(
+            f'{BASE_URL}/produtos/{produto_id}',
+            headers={'Authorization': f'Bearer {token}'}
+        ).json()
+        if produto['imagem_variantes']:
+            return produto
+        time.sleep(0.2)
+    raise Exception(f"Variantes da imagem do produto {produto_id} não foram geradas")
+
+def test_variantes_imagem_produto(admin_token, produto_com_imagem):
+    """Testa a geração das variantes da imagem e a busca por tamanho"""
+    produto = aguardar_variantes(admin_token, produto_com_imagem['id'])
+    base = produto['imagem_url'].rsplit('.', 1)[0]
+    
+    assert produto['imagem_variantes'] == {
+        'thumb': f'{base}_thumb.png',
+        'medium': f'{base}_medium.png',
+        'webp': f'{base}_webp.webp'
+    }
+    
+    url = f'{BASE_URL}/produtos/imagem/{produto["imagem_url"]}'
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    original = requests.get(url, headers=headers).content
+    
+    thumb = requests.get(url, headers=headers, params={'size': 'thumb'})
+    assert thumb.status_code == 200
+    assert thumb.headers['Content-Type'] == 'image/png'
+    assert len(thumb.content) < len(original)
+    
+    webp = requests.get(url, headers=headers, params={'size': 'webp'})
+    assert webp.status_code == 200
+    assert webp.headers['Content-Type'] == 'image/webp'
+    assert webp.content[8:12] == b'WEBP'
+
+def test_buscar_imagem_tamanho_invalido(admin_token, produto_com_imagem):
+    """Testa busca de imagem com tamanho inválido"""
+    response = requests.get(
+        f'{BASE_URL}/produtos/imagem/{produto_com_imagem["imagem_url"]}',
+        headers={'Authorization': f'Bearer {admin_token}'},
+        params={'size': 'gigante'}
+    )
+    
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+def test_atualizar_imagem_exclui_antiga_em_segundo_plano(admin_token, produto_com_imagem):
+    """Testa que a imagem substituída e suas variantes são excluídas do S3 pela fila de exclusão"""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    produto = aguardar_variantes(admin_token, produto_com_imagem['id'])
+    chaves_antigas = [produto['imagem_url']] + list(produto['imagem_variantes'].values())
+    
+    with open(IMAGEM_PATH, 'rb') as imagem:
+        response = requests.put(
+            f'{BASE_URL}/produtos/{produto["id"]}',
+            headers=headers,
+            files={'imagem': ('mago.png', imagem, 'image/png')}
+        )
+    
+    assert response.status_code == 200
+    assert response.json()['imagem_url'] != produto['imagem_url']
+    assert response.json()['imagem_variantes'] is None
+    
+    limite = time.monotonic() + 15
+    while chaves_antigas and time.monotonic() < limite:
+        chaves_antigas = [
+            chave for chave in chaves_antigas
+            if requests.get(f'{BASE_URL}/produtos/imagem/{chave}', headers=headers).status_code != 404
+        ]
+        time.sleep(0.2)
+    
+    assert chaves_antigas == []
\ No newline at end of file
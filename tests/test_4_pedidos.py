@@ -1,6 +1,7 @@
 import pytest
 import requests
-from conftest import BASE_URL
+import uuid
+from conftest import BASE_URL, listar_todos
 
 @pytest.fixture
 def pedido_exemplo(admin_token, cliente_exemplo, produto_exemplo):
@@ -139,15 +140,47 @@ def test_criar_pedido_sem_estoque(admin_token, cliente_exemplo, produto_exemplo)
     assert response.status_code == 400
     assert 'error' in response.json()
 
-def test_listar_pedidos(admin_token, pedido_exemplo):
-    """Testa listagem de pedidos"""
-    response = requests.get(
+def test_criar_pedido_estoque_insuficiente_somando_itens(admin_token, cliente_exemplo, produto_exemplo):
+    """Testa que itens repetidos do mesmo produto somam no estoque e nada é reservado se falhar"""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    estoque = produto_exemplo['quantidade_estoque']
+    
+    response = requests.post(
         f'{BASE_URL}/pedidos',
-        headers={'Authorization': f'Bearer {admin_token}'}
+        headers=headers,
+        json={
+            'cliente_id': cliente_exemplo['id'],
+            'itens': [
+                {'produto_id': produto_exemplo['id'], 'quantidade': estoque},
+                {'produto_id': produto_exemplo['id'], 'quantidade': 1}
+            ]
+        }
     )
     
-    assert response.status_code == 200
-    pedidos = response.json()
+    assert response.status_code == 400
+    assert 'error' in response.json()
+    
+    response = requests.get(f'{BASE_URL}/produtos/{produto_exemplo["id"]}', headers=headers)
+    assert response.json()['quantidade_estoque'] == estoque
+
+def test_criar_pedido_quantidade_booleana(admin_token, cliente_exemplo, produto_exemplo):
+    """Testa que true/false do JSON não são aceitos como quantidade"""
+    response = requests.post(
+        f'{BASE_URL}/pedidos',
+        headers={'Authorization': f'Bearer {admin_token}'},
+        json={
+            'cliente_id': cliente_exemplo['id'],
+            'itens': [{'produto_id': produto_exemplo['id'], 'quantidade': True}]
+        }
+    )
+    
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+def test_listar_pedidos(admin_token, pedido_exemplo):
+    """Testa listagem de pedidos"""
+    pedidos = listar_todos(f'{BASE_URL}/pedidos', admin_token)
+    
     assert len(pedidos) > 0
     assert any(p['id'] == pedido_exemplo['id'] for p in pedidos)
 
@@ -165,6 +198,23 @@ def test_obter_pedido(cliente_token, pedido_exemplo):
     assert len(pedido['itens']) == len(pedido_exemplo['itens'])
     assert pedido['status'] == 'PENDENTE'
 
+def test_obter_pedido_nao_modificado(admin_token, pedido_exemplo):
+    """Testa o GET condicional do pedido (ETag pelo hash do corpo)"""
+    url = f'{BASE_URL}/pedidos/{pedido_exemplo["id"]}'
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    etag = requests.get(url, headers=headers).headers['ETag']
+    
+    response = requests.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    
+    response = requests.get(url, headers={**headers, 'If-None-Match': etag}, params={'include': 'itens,cliente'})
+    assert response.status_code == 200
+    
+    requests.put(f'{url}/status', headers=headers, json={'status': 'EM_PREPARO'})
+    response = requests.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json()['status'] == 'EM_PREPARO'
+
 def test_buscar_pedidos_por_cliente(admin_token, pedido_exemplo):
     """Testa busca de pedidos por cliente"""
     response = requests.get(
@@ -204,6 +254,16 @@ def test_atualizar_status_pedido_sem_permissao(cliente_token, pedido_exemplo):
     assert response.status_code == 403
     assert 'error' in response.json()
 
+def test_contar_pedidos(admin_token, pedido_exemplo):
+    """Testa que o contador de pedidos acompanha a remoção"""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    total = requests.get(f'{BASE_URL}/pedidos/contar', headers=headers).json()['total']
+    assert total >= 1
+    
+    requests.delete(f'{BASE_URL}/pedidos/{pedido_exemplo["id"]}', headers=headers)
+    
+    assert requests.get(f'{BASE_URL}/pedidos/contar', headers=headers).json()['total'] == total - 1
+
 def test_deletar_pedido(admin_token, pedido_exemplo):
     """Testa deleção de pedido"""
     response = requests.delete(
@@ -219,4 +279,85 @@ def test_deletar_pedido(admin_token, pedido_exemplo):
         f'{BASE_URL}/pedidos/{pedido_exemplo["id"]}',
         headers={'Authorization': f'Bearer {admin_token}'}
     )
-    assert response.status_code == 404 
\ No newline at end of file
+    assert response.status_code == 404 
+
+def test_buscar_pedidos_por_cliente_include(admin_token, pedido_exemplo):
+    """Testa expansão das relações do pedido via include"""
+    response = requests.get(
+        f'{BASE_URL}/pedidos/cliente/{pedido_exemplo["cliente_id"]}',
+        headers={'Authorization': f'Bearer {admin_token}'},
+        params={'include': 'cliente,produto'}
+    )
+    
+    assert response.status_code == 200
+    pedido = next(p for p in response.json() if p['id'] == pedido_exemplo['id'])
+    assert pedido['cliente']['id'] == pedido_exemplo['cliente_id']
+    assert pedido['itens'][0]['produto']['id'] == pedido_exemplo['itens'][0]['produto_id']
+
+def test_obter_pedido_include_invalido(admin_token, pedido_exemplo):
+    """Testa obtenção de pedido com relação inválida no include"""
+    response = requests.get(
+        f'{BASE_URL}/pedidos/{pedido_exemplo["id"]}',
+        headers={'Authorization': f'Bearer {admin_token}'},
+        params={'include': 'inexistente'}
+    )
+    
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+def test_listar_pedidos_quantidade_fixa_de_queries(app):
+    """Testa que listar N pedidos executa um número fixo de queries (sem N+1)"""
+    from sqlalchemy import event
+    from app import db
+    from app.repositories.cliente_repository import ClienteRepository
+    from app.repositories.produto_repository import ProdutoRepository
+    from app.repositories.pedido_repository import PedidoRepository
+    
+    def contar_queries(cliente_id):
+        statements = []
+        
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        db.session.remove()
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            pedidos = [
+                pedido.to_dict(('itens', 'cliente', 'produto'))
+                for pedido in PedidoRepository().buscar_por_cliente(cliente_id, include=('itens', 'cliente', 'produto'))
+            ]
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        return len(pedidos), len(statements)
+    
+    with app.app_context():
+        produto = ProdutoRepository().create(nome='Produto N+1', descricao='', preco=5.0, quantidade_estoque=100)
+        clientes = []
+        for quantidade_pedidos in (1, 5):
+            cliente = ClienteRepository().create(nome='Cliente N+1', email=f'n1_{uuid.uuid4().hex[:8]}@test.com')
+            for _ in range(quantidade_pedidos):
+                PedidoRepository().criar_pedido_com_itens(cliente.id, [{'produto_id': produto.id, 'quantidade': 1}])
+            clientes.append(cliente.id)
+        
+        total_um, queries_um = contar_queries(clientes[0])
+        total_cinco, queries_cinco = contar_queries(clientes[1])
+    
+    assert (total_um, total_cinco) == (1, 5)
+    assert queries_um == queries_cinco
+
+def test_reserva_de_estoque_invalida_o_cache_do_catalogo(app):
+    """Testa que a baixa de estoque pelo repositório invalida o produto no cache do catálogo após o commit"""
+    from app import db
+    from app.repositories.cliente_repository import ClienteRepository
+    from app.repositories.produto_repository import ProdutoRepository
+    from app.repositories.pedido_repository import PedidoRepository
+    from app.services.catalogo_cache_service import catalogo_cache
+    
+    with app.app_context():
+        produto = ProdutoRepository().create(nome='Produto reservado', descricao='', preco=5.0, quantidade_estoque=10)
+        cliente = ClienteRepository().create(nome='Cliente reserva', email=f'reserva_{uuid.uuid4().hex[:8]}@test.com')
+        assert catalogo_cache.obter_produto(produto.id)['quantidade_estoque'] == 10
+        
+        PedidoRepository().criar_pedido_com_itens(cliente.id, [{'produto_id': produto.id, 'quantidade': 3}])
+        assert catalogo_cache.obter_produto(produto.id)['quantidade_estoque'] == 7
+        db.session.remove()
\ No newline at end of file
@@ -0,0 +1,29 @@
+import requests
+from conftest import BASE_URL
+
+def test_health_db():
+    """Testa o health check do banco com estatísticas do pool"""
+    response = requests.get(f'{BASE_URL}/health/db')
+    
+    assert response.status_code == 200
+    result = response.json()
+    assert result['status'] == 'ok'
+    assert 'latencia_ms' in result
+    assert 'pool' in result['pool']
+
+def test_health_db_indisponivel_sem_detalhes(app, monkeypatch):
+    """Testa que a falha do banco não expõe a mensagem do driver na rota pública"""
+    from app import db
+    from app.controllers.health_controller import health_service
+    
+    def falhar(*args, **kwargs):
+        raise Exception('could not connect to server: host "db-interno" user "postgres_user"')
+    
+    with app.app_context():
+        monkeypatch.setattr(db.session, 'execute', falhar)
+        result = health_service.verificar_banco()
+        db.session.remove()
+    
+    assert result['status'] == 'indisponivel'
+    assert result['error'] == 'Banco de dados indisponível'
+    assert 'pool' in result
\ No newline at end of file